@@ -0,0 +1,67 @@
+import os
+import sys
+
+import numpy
+import pytest
+
+# the modules of anemos_data import each other by their flat names
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "windatlas", "anemos_data"))
+
+from anemosData import WindDataKind
+from lambertGrid import lambert_grid_coords
+from syntheticData import (
+                write_power_curves,
+                write_statistics_files,
+                write_tsnc_files,
+                )
+
+# a few 10 min time steps per year keep the full 225 x 310 grid of the synthetic files small
+TEST_STEPS_PER_YEAR = 12
+TEST_YEARS = (2009, 2010)
+
+
+@pytest.fixture(scope="session")
+def synthetic_root(tmp_path_factory) -> str:
+    """Root of synthetic TSNC-Format files of two short years, holding wind speed, air density, wind direction and the
+    inputs of the derived air density, of the Statistics means and of the power curves, see `benchmark.data_root`.
+    """
+    root = str(tmp_path_factory.mktemp("anemos"))
+    write_tsnc_files(
+        root,
+        years=TEST_YEARS,
+        steps_per_year=TEST_STEPS_PER_YEAR,
+        kinds=(
+            WindDataKind.WINDSPEED,
+            WindDataKind.AIRDENSITY,
+            WindDataKind.WINDDIRECTION,
+            WindDataKind.AIRPRESSURE,
+            WindDataKind.RELATIVEAIRHUMIDITY,
+            WindDataKind.TEMPERATURE,
+            ),
+        )
+    write_statistics_files(root)
+    write_power_curves(os.path.join(root, "powercurves", "single_netcdfs"))
+
+    return root
+
+
+@pytest.fixture(scope="session")
+def targets():
+    """Target x, y and hub heights spread over the grid, with some outside of the grid and the levels.
+    """
+    grid_x, grid_y = lambert_grid_coords()
+    rng = numpy.random.default_rng(0)
+    size = 60
+
+    xs = rng.uniform(grid_x.min(), grid_x.max(), size)
+    ys = rng.uniform(grid_y.min(), grid_y.max(), size)
+    levels = rng.uniform(40, 300, size)
+
+    # outside of the grid in x, in y and below the lowest level
+    xs[0] = grid_x.min() - 1000
+    ys[1] = grid_y.max() + 1000
+    levels[2] = 20
+    # exactly on a grid cell and level
+    xs[3], ys[3], levels[3] = grid_x[10], grid_y[20], 100
+
+    return xs, ys, levels
@@ -0,0 +1,118 @@
+import os
+
+import numpy
+import pytest
+import xarray
+from scipy.integrate import trapezoid
+
+from aepRaster import (
+                nearest_power_kernel,
+                rayleigh_aep_raster,
+                timeseries_aep_raster,
+                weibull_aep_raster,
+                write_aep_raster,
+                )
+from anemosData import (
+                Mean3km10aWindData,
+                TsNcWindData,
+                WindDataKind,
+                )
+from energyProduction import HOURS_PER_YEAR
+from lambertGrid import lambert_grid_coords
+
+HUB_HEIGHT = 110
+
+
+@pytest.fixture(scope="module")
+def power_curve(synthetic_root) -> xarray.DataArray:
+    path = os.path.join(synthetic_root, "powercurves", "single_netcdfs", "wea_synthetic_3MW.nc")
+    with xarray.open_dataset(path) as data:
+        return data.power.load()
+
+
+@pytest.fixture(scope="module")
+def extent():
+    x, y = lambert_grid_coords()
+    return [x[20], y[30], x[26], y[34]]
+
+
+def _hub_height_grids(synthetic_root, extent, kinds):
+    return [
+        Mean3km10aWindData(kind, _wind_data_path=synthetic_root, extent=extent).winddata[kind.value].interp(level=HUB_HEIGHT)
+        for kind in kinds
+        ]
+
+
+def _weibull_aep(A, k, rho, power_curve):
+    """Integrates the power curve over the Weibull density of every cell on a ten times finer wind speed grid.
+    """
+    wspd = numpy.linspace(0, power_curve.wspd.values[-1], 10 * power_curve.wspd.size)
+    aep = numpy.full(A.shape, numpy.nan)
+    for cell in numpy.ndindex(A.shape):
+        power = numpy.interp(wspd, power_curve.wspd.values, power_curve.interp(rho=rho[cell]).values)
+        density = k[cell] / A[cell] * (wspd / A[cell]) ** (k[cell] - 1) * numpy.exp(-(wspd / A[cell]) ** k[cell])
+        aep[cell] = HOURS_PER_YEAR * trapezoid(power * density, wspd)
+
+    return aep
+
+
+def test_nearest_power_kernel_looks_up_the_nearest_node():
+    wspd = numpy.array([0.0, 1.0, 2.0, 3.0])
+    rho_grid = numpy.array([1.0, 1.1, 1.2])
+    power = numpy.arange(12.0).reshape(4, 3)
+
+    result = nearest_power_kernel(
+        numpy.array([[0.4, 2.6], [7.0, numpy.nan]]),
+        numpy.array([[1.16, 1.01], [0.5, 1.1]]),
+        wspd,
+        rho_grid,
+        power,
+        )
+
+    numpy.testing.assert_array_equal(result, [[power[0, 2], power[3, 0]], [power[3, 0], numpy.nan]])
+
+
+def test_weibull_raster_integrates_the_weibull_distribution(synthetic_root, power_curve, extent):
+    raster = weibull_aep_raster(power_curve, HUB_HEIGHT, _wind_data_path=synthetic_root, extent=extent, cell_chunk=3)
+    A, k, rho = [
+        grid.to_numpy()
+        for grid in _hub_height_grids(synthetic_root, extent, [WindDataKind.WEIBULLA, WindDataKind.WEIBULLK, WindDataKind.AIRDENSITY])
+        ]
+
+    assert raster.aep.chunks is not None
+    assert raster.aep.dims == ("y", "x")
+    assert raster.attrs["calculation_method"] == "weibull"
+    numpy.testing.assert_allclose(raster.aep.to_numpy(), _weibull_aep(A, k, rho, power_curve), rtol=2e-3)
+    numpy.testing.assert_allclose(raster.capacity_factor.to_numpy(), raster.aep.to_numpy() / (HOURS_PER_YEAR * float(power_curve.max())))
+
+
+def test_rayleigh_raster_is_the_weibull_raster_of_the_mean(synthetic_root, power_curve, extent):
+    raster = rayleigh_aep_raster(power_curve, HUB_HEIGHT, s=0.9, _wind_data_path=synthetic_root, extent=extent, cell_chunk=3)
+    v_mean, rho = [grid.to_numpy() for grid in _hub_height_grids(synthetic_root, extent, [WindDataKind.WINDSPEED, WindDataKind.AIRDENSITY])]
+
+    expected = 0.9 * _weibull_aep(2 * v_mean / numpy.sqrt(numpy.pi), numpy.full(v_mean.shape, 2.0), rho, power_curve)
+    numpy.testing.assert_allclose(raster.aep.to_numpy(), expected, rtol=2e-3)
+
+
+def test_timeseries_raster_averages_the_nearest_power(synthetic_root, power_curve, extent):
+    raster = timeseries_aep_raster(power_curve, HUB_HEIGHT, _wind_data_path=synthetic_root, extent=extent, cell_chunk=4, time_chunk=7)
+
+    series = [
+        TsNcWindData(kind, _wind_data_path=synthetic_root, extent=extent).winddata[kind.value].interp(level=HUB_HEIGHT)
+        for kind in [WindDataKind.WINDSPEED, WindDataKind.AIRDENSITY]
+        ]
+    wspd, rho = [data.transpose("y", "x", "time").to_numpy().astype("float64") for data in series]
+    wspd_nodes = numpy.abs(wspd[..., None] - power_curve.wspd.values).argmin(axis=-1)
+    rho_nodes = numpy.abs(rho[..., None] - power_curve.rho.values).argmin(axis=-1)
+    expected = power_curve.transpose("wspd", "rho").values[wspd_nodes, rho_nodes].mean(axis=-1) * HOURS_PER_YEAR
+
+    numpy.testing.assert_allclose(raster.aep.transpose("y", "x").to_numpy(), expected, rtol=1e-6)
+
+
+def test_written_raster_keeps_the_grid(synthetic_root, power_curve, extent, tmp_path):
+    raster = weibull_aep_raster(power_curve, HUB_HEIGHT, _wind_data_path=synthetic_root, extent=extent)
+    path = write_aep_raster(raster, str(tmp_path / "aep.nc"))
+
+    with xarray.open_dataset(path) as written:
+        xarray.testing.assert_allclose(written[["aep", "capacity_factor"]], raster[["aep", "capacity_factor"]].compute())
+        assert written.attrs["hub_height"] == HUB_HEIGHT
@@ -0,0 +1,116 @@
+import numpy
+import pytest
+import xarray
+
+import pointInterpolation
+from airDensity import (
+                DERIVED_SERIES_CACHE,
+                R_DRY_AIR,
+                air_density,
+                saturation_vapour_pressure,
+                to_si_units,
+                )
+from anemosData import (
+                DerivedAirDensity,
+                TsNcWindData,
+                WindDataKind,
+                )
+
+INPUT_KINDS = (WindDataKind.AIRPRESSURE, WindDataKind.RELATIVEAIRHUMIDITY, WindDataKind.TEMPERATURE)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    DERIVED_SERIES_CACHE.clear()
+    yield
+    DERIVED_SERIES_CACHE.clear()
+
+
+@pytest.fixture
+def points(synthetic_root):
+    grid = TsNcWindData(WindDataKind.AIRPRESSURE, _wind_data_path=synthetic_root).winddata
+
+    return grid.x.to_numpy()[[5, 60, 61]], grid.y.to_numpy()[[9, 30, 100]], numpy.array([100, 85, 210])
+
+
+@pytest.fixture
+def no_reads(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("the cached series are read again")
+
+    return lambda: monkeypatch.setattr(pointInterpolation, "interp_points", fail)
+
+
+def test_air_density_of_standard_and_humid_air():
+    numpy.testing.assert_allclose(air_density(101325.0, 0.0, 288.15), 101325 / (R_DRY_AIR * 288.15))
+    numpy.testing.assert_allclose(air_density(101325.0, 0.0, 288.15), 1.225, atol=1e-3)
+    # water vapour is lighter than dry air
+    assert air_density(101325.0, 1.0, 298.15) < air_density(101325.0, 0.0, 298.15)
+    numpy.testing.assert_allclose(saturation_vapour_pressure(273.15), 611.2)
+
+    pres = xarray.DataArray([1000.0, 950.0], dims="time", name="pres", attrs={"units": "hPa"})
+    rhum = xarray.DataArray([50.0, 80.0], dims="time", name="rhum", attrs={"units": "%"})
+    temp = xarray.DataArray([15.0, 5.0], dims="time", name="temp", attrs={"units": "degC"})
+    numpy.testing.assert_allclose(
+        air_density(to_si_units(pres), to_si_units(rhum), to_si_units(temp)),
+        air_density(numpy.array([1e5, 95e3]), numpy.array([0.5, 0.8]), numpy.array([288.15, 278.15])),
+        )
+
+    with pytest.raises(ValueError):
+        to_si_units(pres.assign_attrs(units="psi"))
+
+
+def test_derived_air_density_of_the_interpolated_inputs(synthetic_root, points):
+    derived = DerivedAirDensity(_wind_data_path=synthetic_root).interp_points(*points)
+
+    inputs = [
+        to_si_units(TsNcWindData(kind, _wind_data_path=synthetic_root).interp_points(*points)[kind.value]).astype("float64")
+        for kind in INPUT_KINDS
+        ]
+    numpy.testing.assert_allclose(derived.rho.transpose("point", "time"), air_density(*inputs).transpose("point", "time"))
+    assert numpy.all((derived.rho > 0.9) & (derived.rho < 1.4))
+
+
+def test_cached_series_are_reused_as_copies(synthetic_root, points, no_reads):
+    first = DerivedAirDensity(_wind_data_path=synthetic_root).interp_points(*points)
+    expected = first.rho.to_numpy().copy()
+    first.rho[:] = 0
+
+    no_reads()
+    second = DerivedAirDensity(_wind_data_path=synthetic_root).interp_points(*points)
+    second.rho[:] = 1
+    third = DerivedAirDensity(_wind_data_path=synthetic_root).interp_points(*points)
+
+    assert len(DERIVED_SERIES_CACHE) == 1
+    numpy.testing.assert_array_equal(third.rho, expected)
+
+
+def test_other_targets_and_time_frames_miss_the_cache(synthetic_root, points):
+    xs, ys, levels = points
+    DerivedAirDensity(_wind_data_path=synthetic_root).interp_points(xs, ys, levels)
+    DerivedAirDensity(_wind_data_path=synthetic_root).interp_points(xs, ys, levels + 1)
+    DerivedAirDensity(time_frame=[2010, 2010], _wind_data_path=synthetic_root).interp_points(xs, ys, levels)
+    DerivedAirDensity(_wind_data_path=synthetic_root, cache=False).interp_points(xs, ys, levels)
+
+    assert len(DERIVED_SERIES_CACHE) == 3
+
+
+def _scenario(synthetic_root, offset):
+    source = TsNcWindData(WindDataKind.TEMPERATURE, _wind_data_path=synthetic_root)
+    source.winddata = source.winddata + offset
+
+    return {WindDataKind.TEMPERATURE: source}
+
+
+def test_in_memory_sources_do_not_share_series(synthetic_root, points, no_reads):
+    warm = DerivedAirDensity(_wind_data_path=synthetic_root, sources=_scenario(synthetic_root, 10)).interp_points(*points)
+    cold = DerivedAirDensity(_wind_data_path=synthetic_root, sources=_scenario(synthetic_root, -10)).interp_points(*points)
+
+    assert len(DERIVED_SERIES_CACHE) == 2
+    assert numpy.all(warm.rho < cold.rho)
+
+    # a token identifies equal scenarios across instances
+    DerivedAirDensity(_wind_data_path=synthetic_root, sources=_scenario(synthetic_root, 10), cache_token="warm").interp_points(*points)
+    no_reads()
+    cached = DerivedAirDensity(_wind_data_path=synthetic_root, sources=_scenario(synthetic_root, 10), cache_token="warm").interp_points(*points)
+    numpy.testing.assert_array_equal(cached.rho, warm.rho)
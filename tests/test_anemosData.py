@@ -0,0 +1,223 @@
+import numpy
+import pytest
+import xarray
+
+from anemosData import (
+                InterpolationMethod,
+                Mean3km10aWindData,
+                Mean90mWindData,
+                TsNcWindData,
+                WindDataKind,
+                )
+from lambertGrid import lambert_grid_coords
+from syntheticData import write_mean90m_files
+from zarrStore import convert_tsnc_to_zarr
+
+METHODS = [InterpolationMethod.LINEAR, InterpolationMethod.NEAREST]
+# keyword arguments of TsNcWindData selecting the extraction backend
+BACKENDS = {
+    "xarray": {},
+    "fast_reader": {"fast_reader": True},
+    "parallel": {"mfdataset": False, "processes": 2, "point_chunk": 16},
+    # the store path is added from the zarr_store fixture
+    "zarr": {},
+    }
+# a 6 x 6 arcminutes box keeps the 3 arcsecond grid at 120 x 120 cells
+MEAN90M_EXTENT = [9.0, 50.5, 9.1, 50.6]
+
+
+def _reference(
+    root: str,
+    xs: numpy.ndarray,
+    ys: numpy.ndarray,
+    levels: numpy.ndarray,
+    method: InterpolationMethod,
+    ) -> numpy.ndarray:
+    """The targets interpolated with `.interp` of the whole loaded data, with the dimensions (point, time).
+    """
+    data = TsNcWindData(WindDataKind.WINDSPEED, _wind_data_path=root).winddata.load()
+    interp_data = data.interp(
+        x=xarray.DataArray(xs, dims="point"),
+        y=xarray.DataArray(ys, dims="point"),
+        level=xarray.DataArray(levels, dims="point"),
+        method=method.value,
+        )
+
+    return interp_data.wspd.transpose("point", "time").to_numpy()
+
+
+@pytest.fixture(scope="module")
+def zarr_store(synthetic_root, tmp_path_factory) -> str:
+    store_path = str(tmp_path_factory.mktemp("zarr"))
+    # large tiles keep the conversion of the test data fast
+    convert_tsnc_to_zarr(WindDataKind.WINDSPEED, store_path, _wind_data_path=synthetic_root, tile_size=16)
+
+    return store_path
+
+
+@pytest.mark.parametrize("method", METHODS)
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_interp_points_matches_interp(synthetic_root, targets, request, backend, method):
+    xs, ys, levels = targets
+    options = dict(BACKENDS[backend])
+    if backend == "zarr":
+        options["zarr_store_path"] = request.getfixturevalue("zarr_store")
+
+    wind_data = TsNcWindData(WindDataKind.WINDSPEED, _wind_data_path=synthetic_root, **options)
+    result = wind_data.interp_points(xs, ys, levels, method=method).wspd.transpose("point", "time").to_numpy()
+    expected = _reference(synthetic_root, xs, ys, levels, method)
+
+    assert result.shape == expected.shape
+    numpy.testing.assert_array_equal(numpy.isnan(result), numpy.isnan(expected))
+    numpy.testing.assert_allclose(result, expected, rtol=0, atol=1e-10)
+    # the targets outside of the grid or the levels are NaN, the others are not
+    assert numpy.isnan(result[:3]).all()
+    assert not numpy.isnan(result[3:]).any()
+
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_statistics_interp_points_matches_interp(synthetic_root, targets, method):
+    xs, ys, levels = targets
+    wind_data = Mean3km10aWindData(WindDataKind.WEIBULLA, _wind_data_path=synthetic_root)
+    result = wind_data.interp_points(xs, ys, levels, method=method)
+    expected = wind_data.winddata.interp(
+        x=xarray.DataArray(xs, dims="point"),
+        y=xarray.DataArray(ys, dims="point"),
+        level=xarray.DataArray(levels, dims="point"),
+        method=method.value,
+        )
+
+    numpy.testing.assert_allclose(result.wbA.to_numpy(), expected.wbA.to_numpy(), rtol=0, atol=1e-10)
+    assert numpy.isnan(result.wbA.to_numpy()[:3]).all()
+
+
+def test_extent_crop_keeps_the_interpolation(synthetic_root, targets):
+    xs, ys, levels = targets
+    # the targets inside of the grid
+    xs, ys, levels = xs[3:], ys[3:], levels[3:]
+    extent = [xs.min(), ys.min(), xs.max(), ys.max()]
+
+    wind_data = TsNcWindData(WindDataKind.WINDSPEED, _wind_data_path=synthetic_root, extent=extent)
+    result = wind_data.interp_points(xs, ys, levels).wspd.transpose("point", "time").to_numpy()
+
+    assert wind_data.winddata.x.size < 225 or wind_data.winddata.y.size < 310
+    numpy.testing.assert_allclose(result, _reference(synthetic_root, xs, ys, levels, InterpolationMethod.LINEAR), rtol=0, atol=1e-10)
+
+
+@pytest.mark.parametrize("outside", ["x", "y", "both"])
+def test_extent_outside_of_the_grid_gives_nan(synthetic_root, targets, outside):
+    grid_x, grid_y = lambert_grid_coords()
+    xs, ys, levels = (values[3:8].copy() for values in targets)
+    if outside in ("x", "both"):
+        xs = grid_x.max() + numpy.linspace(50000, 90000, xs.size)
+    if outside in ("y", "both"):
+        ys = grid_y.min() - numpy.linspace(50000, 90000, ys.size)
+    extent = [xs.min(), ys.min(), xs.max(), ys.max()]
+
+    for wind_data in (
+        TsNcWindData(WindDataKind.WINDSPEED, _wind_data_path=synthetic_root, extent=extent),
+        Mean3km10aWindData(WindDataKind.WEIBULLA, _wind_data_path=synthetic_root, extent=extent),
+        ):
+        # the crop keeps the cells at the nearest edge of the grid
+        assert wind_data.winddata.x.size > 0 and wind_data.winddata.y.size > 0
+        result = wind_data.interp_points(xs, ys, levels)
+        assert result.point.size == xs.size
+        assert all(numpy.isnan(variable).all() for variable in result.data_vars.values())
+
+
+def test_interp_points_keeps_time_frame(synthetic_root, targets):
+    xs, ys, levels = targets
+    wind_data = TsNcWindData(WindDataKind.WINDSPEED, time_frame=[2010, 2010], _wind_data_path=synthetic_root, mfdataset=False, processes=2)
+    result = wind_data.interp_points(xs, ys, levels)
+
+    assert (result.time.dt.year == 2010).all()
+    numpy.testing.assert_allclose(
+        result.wspd.transpose("point", "time").to_numpy(),
+        _reference(synthetic_root, xs, ys, levels, InterpolationMethod.LINEAR)[:, -result.time.size:],
+        rtol=0,
+        atol=1e-10,
+        )
+
+
+@pytest.mark.parametrize("mfdataset", [True, False])
+def test_exact_time_frame_selects_the_time_steps(synthetic_root, mfdataset):
+    start, end = numpy.datetime64("2009-01-01T00:30"), numpy.datetime64("2010-01-01T01:00")
+    wind_data = TsNcWindData(WindDataKind.WINDSPEED, time_frame=[start, end], _wind_data_path=synthetic_root, mfdataset=mfdataset)
+
+    winddata = wind_data.winddata if mfdataset else xarray.concat(wind_data.winddata, dim="time")
+    time = winddata.time.to_numpy()
+    assert time[0] == start and time[-1] == end
+    # 10 min steps of the first two hours of every year
+    assert time.size == 9 + 7
+
+
+def test_missing_year_files_are_named(synthetic_root):
+    with pytest.raises(FileNotFoundError, match="2011"):
+        TsNcWindData(WindDataKind.WINDSPEED, time_frame=[2009, 2011], _wind_data_path=synthetic_root)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_float32_mode(synthetic_root, targets, request, backend):
+    xs, ys, levels = targets
+    options = dict(BACKENDS[backend])
+    if backend == "zarr":
+        options["zarr_store_path"] = request.getfixturevalue("zarr_store")
+
+    wind_data = TsNcWindData(WindDataKind.WINDSPEED, _wind_data_path=synthetic_root, dtype="float32", **options)
+    result = wind_data.interp_points(xs, ys, levels).wspd
+
+    assert result.dtype == "float32"
+    numpy.testing.assert_allclose(
+        result.transpose("point", "time").to_numpy(),
+        _reference(synthetic_root, xs, ys, levels, InterpolationMethod.LINEAR),
+        rtol=0,
+        atol=1e-5,
+        )
+
+
+@pytest.fixture(scope="module")
+def mean90m_root(tmp_path_factory) -> str:
+    root = str(tmp_path_factory.mktemp("mean90m"))
+    write_mean90m_files(root, extent=MEAN90M_EXTENT, kinds=(WindDataKind.WINDSPEED,))
+
+    return root
+
+
+@pytest.fixture(scope="module")
+def lon_lat_targets():
+    rng = numpy.random.default_rng(6)
+    lons = rng.uniform(MEAN90M_EXTENT[0] + 0.001, MEAN90M_EXTENT[2] - 0.001, 50)
+    lats = rng.uniform(MEAN90M_EXTENT[1] + 0.001, MEAN90M_EXTENT[3] - 0.001, 50)
+    levels = rng.uniform(40, 300, 50)
+    levels[:3] = [40, 166, 300]
+
+    return lons, lats, levels
+
+
+@pytest.mark.parametrize("chunks", [None, {}])
+@pytest.mark.parametrize("method", METHODS)
+def test_mean90m_interp_points_matches_interp(mean90m_root, lon_lat_targets, chunks, method):
+    lons, lats, levels = lon_lat_targets
+    wind_data = Mean90mWindData(WindDataKind.WINDSPEED, _wind_data_path=mean90m_root, chunks=chunks)
+
+    result = wind_data.interp_points(lons, lats, levels, method=method).wspd
+    expected = wind_data.winddata.wspd.interp(
+        x=xarray.DataArray(lons, dims="point"),
+        y=xarray.DataArray(lats, dims="point"),
+        level=xarray.DataArray(levels, dims="point"),
+        method=method.value,
+        )
+
+    assert result.dims == ("point",)
+    numpy.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-10)
+
+
+def test_mean90m_interp_point_takes_lat_lon(mean90m_root, lon_lat_targets):
+    lons, lats, levels = lon_lat_targets
+    wind_data = Mean90mWindData(WindDataKind.WINDSPEED, _wind_data_path=mean90m_root)
+
+    result = wind_data.interp_point([lats[5], lons[5]], levels[5])
+    expected = wind_data.interp_points(lons, lats, levels)
+
+    numpy.testing.assert_allclose(float(result.wspd), float(expected.wspd[5]))
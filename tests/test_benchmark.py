@@ -0,0 +1,43 @@
+import numpy
+
+from anemosData import _WindData
+from benchmark import (
+                data_root,
+                random_fleet,
+                run_benchmarks,
+                )
+from syntheticData import (
+                MEAN90M_EXTENT,
+                write_synthetic_anemos_data,
+                )
+from weaPoints import WeaPoints
+
+
+def test_random_fleet_lies_inside_of_the_extent():
+    lat_lon, levels, types = random_fleet(200, seed=1)
+    lats, lons = numpy.array(lat_lon).T
+
+    assert numpy.all((lons >= MEAN90M_EXTENT[0]) & (lons <= MEAN90M_EXTENT[2]))
+    assert numpy.all((lats >= MEAN90M_EXTENT[1]) & (lats <= MEAN90M_EXTENT[3]))
+    assert len(levels) == len(types) == 200
+    assert random_fleet(200, seed=1) == (lat_lon, levels, types)
+
+
+def test_data_root_is_restored(tmp_path):
+    wind_data_path, power_curves_path = _WindData._wind_data_path, WeaPoints._power_curves_path
+    with data_root(str(tmp_path)):
+        assert _WindData._wind_data_path == str(tmp_path)
+
+    assert (_WindData._wind_data_path, WeaPoints._power_curves_path) == (wind_data_path, power_curves_path)
+
+
+def test_every_case_is_timed(tmp_path):
+    write_synthetic_anemos_data(str(tmp_path), steps_per_year=12, mean90m_extent=[9.0, 50.5, 9.1, 50.6])
+
+    timings = run_benchmarks(str(tmp_path), fleet_sizes=(3, 5), repeats=2)
+
+    assert len(timings) == 2 * 7
+    assert list(timings.columns) == ["case", "fleet_size", "years", "first", "best"]
+    assert timings.case.str.startswith("TsNcWindData").sum() == 4
+    assert timings.years.isna().sum() == 2 * 4
+    assert numpy.all(timings.best <= timings.first)
@@ -0,0 +1,93 @@
+from typing import (
+                Callable,
+                List,
+                )
+
+import numpy
+import xarray
+
+from anemosData import (
+                TsNcWindData,
+                WindDataKind,
+                )
+from datasetPool import (
+                DATASET_POOL,
+                DatasetPool,
+                )
+
+
+def _recording_opener(
+    opened: List[str],
+    closed: List[str],
+    ) -> Callable:
+    """Returns an opener of small in-memory datasets recording which of them are opened and closed.
+    """
+    def open_dataset(
+        path: str,
+        **open_kwargs,
+        ) -> xarray.Dataset:
+        opened.append(path)
+        dataset = xarray.Dataset({"value": ("x", numpy.arange(3))})
+        dataset.set_close(lambda: closed.append(path))
+
+        return dataset
+
+    return open_dataset
+
+
+def test_acquire_shares_datasets_of_the_same_open_call():
+    opened, closed = [], []
+    opener = _recording_opener(opened, closed)
+    pool = DatasetPool(max_size=4)
+
+    key, dataset = pool.acquire(opener, "a.nc", engine="h5netcdf", chunks={"time": 1})
+    same_key, same_dataset = pool.acquire(opener, "a.nc", engine="h5netcdf", chunks={"time": 1})
+    other_key, other_dataset = pool.acquire(opener, "a.nc", engine="h5netcdf", chunks={"time": 2})
+
+    assert same_key == key and same_dataset is dataset
+    assert other_key != key and other_dataset is not dataset
+    assert opened == ["a.nc", "a.nc"]
+    assert len(pool) == 2
+
+
+def test_only_surplus_unreferenced_datasets_are_closed_least_recently_used_first():
+    opened, closed = [], []
+    opener = _recording_opener(opened, closed)
+    pool = DatasetPool(max_size=2)
+
+    keys = {path: pool.acquire(opener, path)[0] for path in ("a.nc", "b.nc", "c.nc")}
+    # all datasets are referenced, so the pool grows past max_size
+    assert len(pool) == 3 and closed == []
+
+    pool.release([keys["a.nc"], keys["b.nc"]])
+    assert closed == ["a.nc"]
+    assert len(pool) == 2
+
+    # acquiring b again makes c the least recently used one
+    pool.acquire(opener, "b.nc")
+    pool.release([keys["b.nc"], keys["c.nc"]])
+    pool.acquire(opener, "d.nc")
+    assert closed == ["a.nc", "c.nc"]
+
+    pool.release([keys["b.nc"]])
+    pool.clear()
+    assert closed == ["a.nc", "c.nc", "b.nc"]
+    assert len(pool) == 1
+
+
+def test_wind_data_instances_share_and_release_pooled_datasets(synthetic_root):
+    first = TsNcWindData(WindDataKind.WINDSPEED, _wind_data_path=synthetic_root, mfdataset=False)
+    second = TsNcWindData(WindDataKind.WINDSPEED, _wind_data_path=synthetic_root, mfdataset=False)
+
+    key = first._pool_keys[0]
+    assert second._pool_keys[0] == key
+    assert DATASET_POOL._references[key] == 2
+
+    first.close()
+    assert DATASET_POOL._references[key] == 1
+    # closing twice releases the references only once
+    first.close()
+    assert DATASET_POOL._references[key] == 1
+
+    del second
+    assert DATASET_POOL._references.get(key, 0) == 0
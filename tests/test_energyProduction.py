@@ -0,0 +1,70 @@
+import numpy
+import pytest
+
+from energyProduction import (
+                HOURS_PER_YEAR,
+                annual_energy_production,
+                weibull_aep_kernel,
+                )
+
+
+def _aep_loop(F, P, s=0.85):
+    """The former bin by bin integration of `calPower.Get_power_weibull.aep`.
+    """
+    AEP_list = list()
+    for i, _ in enumerate(F):
+        if i == 0:
+            AEP_i = 8760 * F[i] * P[i]
+        else:
+            AEP_i = 8760 * (F[i] - F[i-1]) * ((P[i] + P[i-1])/2)
+        AEP_list.append(AEP_i)
+
+    return sum(AEP_list) * s
+
+
+def _power_curve():
+    wspd = numpy.round(numpy.arange(0, 30.005, 0.01), 2)
+    rho_grid = numpy.round(numpy.arange(1.0, 1.31, 0.01), 2)
+    power = numpy.clip((wspd[:, None] - 3) ** 3 * rho_grid * 2, 0, 3000)
+    power[wspd > 25] = 0
+
+    return wspd, rho_grid, power
+
+
+@pytest.mark.parametrize("s", [0.85, 1])
+def test_annual_energy_production_matches_loop(s):
+    wspd, _, power = _power_curve()
+    F = 1 - numpy.exp(-(wspd / 7.5) ** 2.1)
+    P = power[:, 10]
+
+    assert annual_energy_production(F, P, s=s) == pytest.approx(_aep_loop(F, P, s=s), rel=1e-12)
+
+
+def test_annual_energy_production_per_column():
+    wspd, _, power = _power_curve()
+    A = numpy.array([5.0, 7.5, 10.0])
+    F = 1 - numpy.exp(-(wspd[:, None] / A) ** 2)
+
+    # one power curve for all columns and one power curve per column
+    expected = [_aep_loop(F[:, num], power[:, 10]) for num in range(A.size)]
+    numpy.testing.assert_allclose(annual_energy_production(F, power[:, 10]), expected, rtol=1e-12)
+    numpy.testing.assert_allclose(annual_energy_production(F, power[:, [10, 10, 10]]), expected, rtol=1e-12)
+
+
+def test_weibull_aep_kernel_matches_loop():
+    wspd, rho_grid, power = _power_curve()
+    A = numpy.array([[5.0, 7.5], [10.0, 6.0]])
+    k = numpy.array([[1.8, 2.0], [2.4, 2.2]])
+    rho = numpy.array([[1.125, 1.2], [0.9, 1.3]])
+
+    aep = weibull_aep_kernel(A, k, rho, wspd, rho_grid, power)
+
+    for num in numpy.ndindex(A.shape):
+        if not rho_grid[0] <= rho[num] <= rho_grid[-1]:
+            assert numpy.isnan(aep[num])
+            continue
+        F = 1 - numpy.exp(-(wspd / A[num]) ** k[num])
+        P = numpy.array([numpy.interp(rho[num], rho_grid, row) for row in power])
+        assert aep[num] == pytest.approx(_aep_loop(F, P, s=1), rel=1e-12)
+
+    assert numpy.nanmax(aep) <= HOURS_PER_YEAR * power.max()
@@ -0,0 +1,76 @@
+import numpy
+import pytest
+import xarray
+
+from anemosData import (
+                InterpolationMethod,
+                TsNcWindData,
+                WindDataKind,
+                )
+from extractionOperator import ExtractionOperator
+
+METHODS = [InterpolationMethod.LINEAR, InterpolationMethod.NEAREST]
+
+
+def _reference(
+    data: xarray.Dataset,
+    xs: numpy.ndarray,
+    ys: numpy.ndarray,
+    levels: numpy.ndarray,
+    method: InterpolationMethod,
+    ) -> numpy.ndarray:
+    interp_data = data.load().interp(
+        x=xarray.DataArray(xs, dims="point"),
+        y=xarray.DataArray(ys, dims="point"),
+        level=xarray.DataArray(levels, dims="point"),
+        method=method.value,
+        )
+
+    return interp_data.wspd.transpose("point", "time").to_numpy()
+
+
+@pytest.mark.parametrize("method", METHODS)
+@pytest.mark.parametrize("mfdataset", [True, False])
+def test_apply_matches_interp(synthetic_root, targets, mfdataset, method):
+    xs, ys, levels = targets
+    # a dask backed mfdataset and a lazily opened year file, which is gathered by chunk tile
+    winddata = TsNcWindData(WindDataKind.WINDSPEED, _wind_data_path=synthetic_root, mfdataset=mfdataset).winddata
+    data = winddata if mfdataset else winddata[0]
+
+    operator = ExtractionOperator.from_wind_data(data, xs, ys, levels, method=method)
+    result = operator.apply(data.wspd)
+    expected = _reference(data, xs, ys, levels, method)
+
+    assert result.dims == ("point", "time")
+    numpy.testing.assert_array_equal(result.time, data.time)
+    # the targets outside of the grid or the levels are NaN, the others are not
+    assert numpy.isnan(result[:3]).all()
+    numpy.testing.assert_allclose(result[3:], expected[3:], rtol=1e-6)
+
+
+def test_apply_time_blocks(synthetic_root, targets):
+    xs, ys, levels = targets
+    data = TsNcWindData(WindDataKind.WINDSPEED, _wind_data_path=synthetic_root).winddata
+    operator = ExtractionOperator.from_wind_data(data, xs, ys, levels)
+
+    numpy.testing.assert_array_equal(operator.apply(data.wspd, time_block=5), operator.apply(data.wspd))
+
+
+def test_apply_without_targets_inside_of_the_grid(synthetic_root):
+    data = TsNcWindData(WindDataKind.WINDSPEED, _wind_data_path=synthetic_root).winddata
+    operator = ExtractionOperator.from_wind_data(data, numpy.array([-1e7, numpy.nan]), numpy.zeros(2), numpy.full(2, 100.0))
+
+    assert operator.weights.nnz == 0
+    assert numpy.isnan(operator.apply(data.wspd)).all()
+
+
+def test_cached_operator_is_loaded(synthetic_root, targets, tmp_path):
+    xs, ys, levels = targets
+    data = TsNcWindData(WindDataKind.WINDSPEED, _wind_data_path=synthetic_root).winddata
+
+    operator = ExtractionOperator.from_wind_data(data, xs, ys, levels, cache_dir=str(tmp_path))
+    cached = ExtractionOperator.from_wind_data(data, xs, ys, levels, cache_dir=str(tmp_path))
+
+    assert len(list(tmp_path.iterdir())) == 1
+    assert (operator.weights != cached.weights).nnz == 0
+    numpy.testing.assert_array_equal(operator.level, cached.level)
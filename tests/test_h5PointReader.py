@@ -0,0 +1,56 @@
+import os
+
+import h5netcdf
+import numpy
+import pytest
+import xarray
+
+from h5PointReader import H5PointReader
+from lambertGrid import lambert_grid_coords
+
+METHODS = ["linear", "nearest"]
+
+
+@pytest.fixture(scope="module")
+def packed_path(synthetic_root, tmp_path_factory) -> str:
+    """A year file packed to int16 with scale_factor, add_offset and missing values.
+    """
+    path = str(tmp_path_factory.mktemp("packed") / "wspd.10L.2009.ts.nc")
+    with xarray.open_dataset(os.path.join(synthetic_root, "TSNC-Format", "wspd.10L.2009.ts.nc"), engine="h5netcdf") as data:
+        data = data.load()
+
+    data["wspd"][20:60, 10:50, :, 3] = numpy.nan
+    data.to_netcdf(path, engine="h5netcdf", encoding={"wspd": {
+        "dtype": "int16",
+        "scale_factor": 0.001,
+        "add_offset": 15.0,
+        "_FillValue": -32768,
+        "chunksizes": (31, 45, 1, 4),
+        }})
+
+    return path
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_read_points_decodes_like_xarray(packed_path, targets, method):
+    xs, ys, levels = targets
+    grid_x, grid_y = lambert_grid_coords()
+
+    with xarray.open_dataset(packed_path, engine="h5netcdf") as data:
+        expected = data.assign_coords(x=grid_x, y=grid_y).load().interp(
+            x=xarray.DataArray(xs, dims="point"),
+            y=xarray.DataArray(ys, dims="point"),
+            level=xarray.DataArray(levels, dims="point"),
+            method=method,
+            ).wspd.transpose("point", "time").to_numpy()
+
+    with h5netcdf.File(packed_path, "r") as h5file:
+        reader = H5PointReader(h5file, "wspd", grid_x, grid_y)
+        result = reader.read_points(xs, ys, levels, method=method)
+        sliced = reader.read_points(xs, ys, levels, method=method, time_slice=slice(1, None, 3))
+
+    # the missing values of the 4th time step reach some of the targets
+    assert numpy.isnan(result[3:, 3]).any() and not numpy.isnan(result[3:, 2]).any()
+    numpy.testing.assert_array_equal(numpy.isnan(result), numpy.isnan(expected))
+    numpy.testing.assert_allclose(result, expected, rtol=0, atol=1e-6)
+    numpy.testing.assert_array_equal(sliced, result[:, 1::3])
@@ -0,0 +1,58 @@
+import os
+
+import numpy
+import pytest
+from pyproj import (
+                CRS,
+                Transformer,
+                )
+
+from lambertGrid import (
+                LAMBERT_PROJ4,
+                geo_to_lambert,
+                lambert_grid_coords,
+                )
+
+# the coordinates the grid definition replaces, read from the working directory before
+XY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "windatlas", "anemos_data", "lambert_projection", "xy_lamber_projection_values")
+
+
+def test_grid_definition_matches_the_coordinate_file():
+    x, y = lambert_grid_coords()
+    file_x, file_y = lambert_grid_coords(XY_PATH)
+
+    numpy.testing.assert_array_equal(x, file_x)
+    numpy.testing.assert_array_equal(y, file_y)
+
+
+def test_coordinates_are_build_once_and_read_only():
+    x, y = lambert_grid_coords()
+
+    assert lambert_grid_coords()[0] is x
+    with pytest.raises(ValueError):
+        x[0] = 0
+
+
+def test_geo_to_lambert_matches_a_transformer_per_point():
+    rng = numpy.random.default_rng(5)
+    lat = rng.uniform(47.3, 55, 50)
+    lon = rng.uniform(5.9, 15, 50)
+
+    x, y = geo_to_lambert(lat, lon)
+
+    for num in range(lat.size):
+        # like the transformation of every single point before
+        transformer = Transformer.from_crs(CRS.from_epsg(4326), CRS.from_proj4(LAMBERT_PROJ4))
+        assert transformer.transform(lat[num], lon[num]) == (x[num], y[num])
+
+
+def test_grid_cells_round_trip():
+    x, y = lambert_grid_coords()
+    grid_x, grid_y = numpy.meshgrid(x, y)
+    lon, lat = Transformer.from_crs(LAMBERT_PROJ4, "EPSG:4326", always_xy=True).transform(grid_x, grid_y)
+
+    round_trip_x, round_trip_y = geo_to_lambert(lat, lon)
+
+    assert round_trip_x.shape == grid_x.shape
+    numpy.testing.assert_allclose(round_trip_x, grid_x, rtol=0, atol=1e-6)
+    numpy.testing.assert_allclose(round_trip_y, grid_y, rtol=0, atol=1e-6)
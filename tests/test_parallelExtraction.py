@@ -0,0 +1,63 @@
+import glob
+import os
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy
+import pytest
+
+import parallelExtraction
+from lambertGrid import lambert_grid_coords
+from parallelExtraction import (
+                _extract_batch,
+                _init_worker,
+                extract_points,
+                )
+
+
+@pytest.fixture()
+def worker_pool():
+    """The DatasetPool of a worker process, set up in this process to inspect it.
+    """
+    _init_worker(max_datasets=1)
+    yield parallelExtraction._worker_pool
+    parallelExtraction._worker_pool.clear()
+    parallelExtraction._worker_pool = None
+
+
+def test_worker_keeps_at_most_max_datasets_open(synthetic_root, targets, worker_pool):
+    xs, ys, levels = targets
+    grid_x, grid_y = lambert_grid_coords()
+    paths = sorted(glob.glob(os.path.join(synthetic_root, "TSNC-Format", "wspd.10L.*.ts.nc")))
+    expected = extract_points(paths, "wspd", grid_x, grid_y, xs, ys, levels, processes=1)
+
+    shared = SharedMemory(create=True, size=expected.nbytes)
+    try:
+        time_offsets = numpy.linspace(0, expected.shape[1], len(paths) + 1).astype(int)
+        for num, path in enumerate(paths):
+            _extract_batch({
+                "path": path,
+                "variable": "wspd",
+                "grid_x": grid_x,
+                "grid_y": grid_y,
+                "xs": xs,
+                "ys": ys,
+                "levels": levels,
+                "method": "linear",
+                "time_slice": slice(None),
+                "shared_name": shared.name,
+                "shape": expected.shape,
+                "dtype": "float64",
+                "point_start": 0,
+                "point_stop": xs.size,
+                "time_start": int(time_offsets[num]),
+                "time_stop": int(time_offsets[num + 1]),
+                })
+            # the dataset of the previous file is closed once the batch released it
+            assert len(worker_pool) == 1
+
+        output = numpy.ndarray(expected.shape, dtype="float64", buffer=shared.buf).copy()
+    finally:
+        shared.close()
+        shared.unlink()
+
+    numpy.testing.assert_array_equal(output, expected)
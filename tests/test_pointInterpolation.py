@@ -0,0 +1,103 @@
+import numpy
+import pytest
+import xarray
+
+from pointInterpolation import (
+                bracketing_levels,
+                interp_points,
+                interp_points_regular,
+                )
+
+METHODS = ["linear", "nearest"]
+
+
+@pytest.fixture(scope="module")
+def grid_data() -> xarray.Dataset:
+    """Random data on a small regular grid with a descending y axis, like the 3arcsecs data, and irregular levels.
+    """
+    rng = numpy.random.default_rng(2)
+    level = numpy.array([40.0, 60.0, 100.0, 170.0, 300.0])
+    y = 500.0 - 10.0 * numpy.arange(40)
+    x = 100.0 + 10.0 * numpy.arange(50)
+
+    return xarray.Dataset(
+        data_vars={"wspd": (["time", "level", "y", "x"], rng.uniform(0, 20, (6, level.size, y.size, x.size)))},
+        coords={"time": numpy.arange(6), "level": level, "y": y, "x": x},
+        )
+
+
+def _targets(
+    data: xarray.Dataset,
+    size: int = 200,
+    ):
+    rng = numpy.random.default_rng(3)
+    xs = rng.uniform(data.x.min() - 20, data.x.max() + 20, size)
+    ys = rng.uniform(data.y.min() - 20, data.y.max() + 20, size)
+    levels = rng.uniform(20, 320, size)
+    # on grid lines and levels
+    xs[:3], ys[:3], levels[:3] = data.x[[0, 7, -1]], data.y[[0, 11, -1]], data.level[[0, 2, -1]]
+
+    return xs, ys, levels
+
+
+def _reference(
+    data: xarray.Dataset,
+    xs: numpy.ndarray,
+    ys: numpy.ndarray,
+    levels: numpy.ndarray,
+    method: str,
+    ) -> numpy.ndarray:
+    return data.interp(
+        x=xarray.DataArray(xs, dims="point"),
+        y=xarray.DataArray(ys, dims="point"),
+        level=xarray.DataArray(levels, dims="point"),
+        method=method,
+        ).wspd.transpose("point", "time").to_numpy()
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_bracketing_levels_match_the_level_interpolation(method):
+    grid_levels = numpy.array([40.0, 60.0, 100.0, 170.0, 300.0])
+    values = numpy.random.default_rng(4).uniform(size=grid_levels.size)
+    targets = numpy.array([20.0, 40.0, 50.0, 60.0, 80.0, 135.0, 299.0, 300.0, 301.0])
+
+    lower, upper, weight = bracketing_levels(grid_levels, targets, method=method)
+    expected = xarray.DataArray(values, coords={"level": grid_levels}).interp(level=targets, method=method).to_numpy()
+
+    numpy.testing.assert_allclose(values[lower] * (1 - weight) + values[upper] * weight, expected)
+    # targets exactly on a level only need that level
+    assert (lower[[1, 3]] == upper[[1, 3]]).all()
+    assert numpy.isnan(bracketing_levels(grid_levels, numpy.array([numpy.nan]), method=method)[2]).all()
+
+
+@pytest.mark.parametrize("method", METHODS)
+@pytest.mark.parametrize("backing", ["numpy", "dask"])
+def test_interp_points_regular_matches_interp(grid_data, backing, method):
+    data = grid_data.chunk({"time": 2, "x": 16}) if backing == "dask" else grid_data
+    xs, ys, levels = _targets(grid_data)
+
+    result = interp_points_regular(data, xs, ys, levels, method=method).wspd.transpose("point", "time").to_numpy()
+
+    numpy.testing.assert_allclose(result, _reference(grid_data, xs, ys, levels, method), rtol=0, atol=1e-10)
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_lazily_opened_files_are_gathered_by_chunk_tile(grid_data, tmp_path, method):
+    path = tmp_path / "data.nc"
+    grid_data.to_netcdf(path, engine="h5netcdf", encoding={"wspd": {"chunksizes": (6, 1, 7, 9)}})
+    xs, ys, levels = _targets(grid_data)
+
+    with xarray.open_dataset(path, engine="h5netcdf") as data:
+        assert data.wspd.chunks is None
+        result = interp_points(data, xs, ys, levels, method=method).wspd.transpose("point", "time").to_numpy()
+
+    numpy.testing.assert_allclose(result, _reference(grid_data, xs, ys, levels, method), rtol=0, atol=1e-10)
+
+
+def test_irregular_grids_read_only_the_bracketing_levels(grid_data):
+    data = grid_data.assign_coords(x=grid_data.x + numpy.linspace(0, 5, grid_data.x.size) ** 2)
+    xs, ys, levels = _targets(data)
+
+    result = interp_points(data, xs, ys, levels).wspd.transpose("point", "time").to_numpy()
+
+    numpy.testing.assert_allclose(result, _reference(data, xs, ys, levels, "linear"), rtol=0, atol=1e-10)
@@ -0,0 +1,67 @@
+import numpy
+import pytest
+import xarray
+
+from wea_data.power_curve import (
+                lookup_power,
+                nearest_indices,
+                )
+
+AXES = {
+    # the regular 0.001 m/s and 0.0001 kg/m³ axes of `create_lkl_from_xls`
+    "wspd": numpy.round(numpy.arange(0, 30.0005, 0.001), 3),
+    "rho": numpy.round(numpy.arange(1.0, 1.3, 0.0001), 4),
+    "irregular": numpy.array([0.0, 0.5, 1.5, 1.75, 3.0, 10.0]),
+    }
+
+
+def _sel_nearest(
+    targets: numpy.ndarray,
+    coords: numpy.ndarray,
+    ) -> numpy.ndarray:
+    axis = xarray.DataArray(numpy.arange(coords.size), coords={"c": coords}, dims="c")
+
+    return axis.sel(c=xarray.DataArray(targets.ravel()), method="nearest").to_numpy().reshape(targets.shape)
+
+
+@pytest.mark.parametrize("axis", AXES)
+def test_nearest_indices_matches_sel_nearest(axis):
+    coords = AXES[axis]
+    rng = numpy.random.default_rng(1)
+    span = coords[-1] - coords[0]
+
+    targets = numpy.concatenate([
+        rng.uniform(coords[0] - 0.1 * span, coords[-1] + 0.1 * span, 5000),
+        # on the coordinates and halfway between them, where the ties go to the upper coordinate
+        coords[::7],
+        ((coords[1:] + coords[:-1]) / 2)[::7],
+        ])
+
+    numpy.testing.assert_array_equal(nearest_indices(targets, coords), _sel_nearest(targets, coords))
+
+
+def test_nearest_indices_keeps_shape():
+    targets = numpy.linspace(-1, 31, 24).reshape(2, 3, 4)
+
+    assert nearest_indices(targets, AXES["wspd"]).shape == (2, 3, 4)
+
+
+def test_lookup_power_matches_sel_nearest():
+    rng = numpy.random.default_rng(2)
+    wspd_coords, rho_coords = AXES["wspd"][::100], AXES["rho"][::10]
+    curve = xarray.DataArray(
+        rng.uniform(0, 3000, (wspd_coords.size, rho_coords.size)),
+        coords={"wspd": wspd_coords, "rho": rho_coords},
+        dims=("wspd", "rho"),
+        )
+    wspd = rng.uniform(-1, 32, (4, 50))
+    rho = rng.uniform(0.95, 1.35, (4, 50))
+    # pandas decides about missing values
+    wspd[1, 3] = numpy.nan
+
+    expected = curve.sel(
+        wspd=xarray.DataArray(wspd, dims=("a", "b")),
+        rho=xarray.DataArray(rho, dims=("a", "b")),
+        method="nearest",
+        )
+    numpy.testing.assert_array_equal(lookup_power(curve.to_numpy(), wspd_coords, rho_coords, wspd, rho), expected)
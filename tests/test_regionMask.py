@@ -0,0 +1,124 @@
+import numpy
+import pytest
+import xarray
+
+from regionMask import RegionMask
+
+
+X = numpy.arange(10) * 1000.0
+Y = numpy.arange(8) * 1000.0
+
+
+def _rectangle(x_min, y_min, x_max, y_max):
+    return [[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max], [x_min, y_min]]
+
+
+def _polygon(*rings):
+    return {"type": "Polygon", "coordinates": list(rings)}
+
+
+@pytest.fixture
+def mask():
+    # region 0 covers whole cells only, region 1 half cells, region 2 a ring around a hole
+    # and region 3 two separate polygons
+    geometries = [
+        _polygon(_rectangle(-500, -500, 2500, 1500)),
+        _polygon(_rectangle(4000, 2500, 6000, 3500)),
+        _polygon(_rectangle(6500, 3500, 9500, 6500), _rectangle(7500, 4500, 8500, 5500)),
+        {
+            "type": "MultiPolygon",
+            "coordinates": [
+                [_rectangle(-500, 5500, 500, 6500)],
+                [_rectangle(2500, 6500, 3500, 7500)],
+                ],
+            },
+        ]
+    return RegionMask.from_geometries(geometries, X, Y, names=["a", "b", "c", "d"])
+
+
+def _cells(mask, num):
+    weights = mask.weights[num].toarray().reshape(Y.size, X.size)
+    return {(int(y), int(x)): weights[y, x] for y, x in zip(*numpy.nonzero(weights))}
+
+
+def test_covered_cell_fractions(mask):
+    assert _cells(mask, 0) == {(y, x): 1.0 for y in range(2) for x in range(3)}
+    assert _cells(mask, 1) == {(3, 4): 0.5, (3, 5): 1.0, (3, 6): 0.5}
+    assert _cells(mask, 2) == {(y, x): 1.0 for y in range(4, 7) for x in range(7, 10) if (y, x) != (5, 8)}
+    assert _cells(mask, 3) == {(6, 0): 1.0, (7, 3): 1.0}
+
+
+def test_reductions_match_the_covered_cells(mask):
+    values = numpy.random.default_rng(0).random((3, Y.size, X.size))
+    values[0, 0, 0] = numpy.nan
+
+    result = {method: mask.reduce(values, method) for method in ("mean", "median", "max", "min")}
+
+    for num in range(mask.num_regions):
+        weights = mask.weights[num].toarray().reshape(Y.size, X.size)
+        for step in range(values.shape[0]):
+            cells = (weights > 0) & ~numpy.isnan(values[step])
+            numpy.testing.assert_allclose(
+                result["mean"][step, num],
+                numpy.sum(values[step][cells] * weights[cells]) / numpy.sum(weights[cells]),
+                )
+            numpy.testing.assert_allclose(result["median"][step, num], numpy.median(values[step][cells]))
+            numpy.testing.assert_allclose(result["max"][step, num], numpy.max(values[step][cells]))
+            numpy.testing.assert_allclose(result["min"][step, num], numpy.min(values[step][cells]))
+
+
+def test_regions_without_valid_cells_are_nan(mask):
+    values = numpy.ones((Y.size, X.size))
+    values[:2, :3] = numpy.nan
+
+    for method in ("mean", "median"):
+        result = mask.reduce(values, method)
+        assert numpy.isnan(result[0])
+        numpy.testing.assert_array_equal(result[1:], 1.0)
+
+    with pytest.raises(NotImplementedError):
+        mask.reduce(values, "sum")
+
+
+def test_apply_keeps_dask_data_lazy(mask):
+    data = xarray.Dataset(
+        {
+            "wspd": (("time", "y", "x"), numpy.random.default_rng(1).random((6, Y.size, X.size))),
+            "level": ("time", numpy.arange(6.0)),
+            },
+        coords={"x": X, "y": Y},
+        )
+
+    expected = mask.apply(data)
+    result = mask.apply(data.chunk({"time": 2, "y": 4}))
+
+    assert list(result.data_vars) == ["wspd"]
+    assert result.wspd.chunks is not None
+    assert list(result.region.to_numpy()) == ["a", "b", "c", "d"]
+    numpy.testing.assert_allclose(result.wspd.to_numpy(), expected.wspd.to_numpy())
+    numpy.testing.assert_allclose(expected.wspd.to_numpy(), mask.reduce(data.wspd.to_numpy()))
+
+
+def test_cached_masks_are_not_rasterized_again(mask, tmp_path, monkeypatch):
+    geometries = [_polygon(_rectangle(-500, -500, 2500, 1500)), _polygon(_rectangle(4000, 2500, 6000, 3500))]
+    cached = RegionMask.from_geometries(geometries, X, Y, cache_dir=str(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the cached mask is rasterized again")
+
+    monkeypatch.setattr(RegionMask, "_rasterize_polygon", fail)
+    loaded = RegionMask.from_geometries(geometries, X, Y, names=["a", "b"], cache_dir=str(tmp_path))
+
+    assert loaded.names == ["a", "b"]
+    assert (loaded.weights != cached.weights).nnz == 0
+    assert (loaded.weights != mask.weights[:2]).nnz == 0
+
+    # other subsamples are another mask
+    with pytest.raises(AssertionError):
+        RegionMask.from_geometries(geometries, X, Y, subsamples=2, cache_dir=str(tmp_path))
+
+
+def test_only_polygons_are_rasterized():
+    with pytest.raises(ValueError):
+        RegionMask.from_geometries([{"type": "Point", "coordinates": [0, 0]}], X, Y)
@@ -0,0 +1,72 @@
+import os
+
+import numpy
+import pandas
+import xarray
+
+from anemosData import (
+                Mean3km10aWindData,
+                Mean90mWindData,
+                TsNcWindData,
+                WindDataKind,
+                WindDataType,
+                )
+from lambertGrid import lambert_grid_coords
+from syntheticData import (
+                ANEMOS_LEVELS,
+                TSNC_FILE_CHUNKS,
+                write_synthetic_anemos_data,
+                write_tsnc_files,
+                )
+
+MEAN90M_TEST_EXTENT = [9.0, 50.5, 9.1, 50.6]
+
+
+def test_tsnc_files_have_the_anemos_layout(synthetic_root):
+    path = os.path.join(synthetic_root, WindDataType.TSNETCDF.value, "wspd.10L.2010.ts.nc")
+
+    with xarray.open_dataset(path, engine="h5netcdf") as data:
+        x, y = lambert_grid_coords()
+        assert data.wspd.dims == ("y", "x", "level", "time")
+        assert data.wspd.shape == (y.size, x.size, ANEMOS_LEVELS.size, 12)
+        assert data.wspd.encoding["chunksizes"] == TSNC_FILE_CHUNKS[:3] + (12,)
+        assert data.level.dtype == "float32"
+        numpy.testing.assert_array_equal(data.level, ANEMOS_LEVELS)
+        numpy.testing.assert_array_equal(data.time, pandas.date_range("2010-01-01", periods=12, freq="10min"))
+        assert {"lat", "lon"} <= set(data.coords)
+
+        values = data.wspd.to_numpy()
+        assert values.dtype == "float32"
+        assert numpy.all(values >= 0) and numpy.all(values < 60)
+
+
+def test_tsnc_values_only_depend_on_the_seed(tmp_path):
+    kinds = (WindDataKind.WINDDIRECTION,)
+    first = write_tsnc_files(str(tmp_path / "first"), years=(2009,), steps_per_year=12, kinds=kinds)
+    second = write_tsnc_files(str(tmp_path / "second"), years=(2009,), steps_per_year=12, kinds=kinds)
+    other = write_tsnc_files(str(tmp_path / "other"), years=(2009,), steps_per_year=12, kinds=kinds, seed=1)
+
+    with xarray.open_dataset(first[0]) as a, xarray.open_dataset(second[0]) as b, xarray.open_dataset(other[0]) as c:
+        xarray.testing.assert_identical(a, b)
+        assert not numpy.array_equal(a.wdir, c.wdir)
+        assert float(a.wdir.min()) >= 0 and float(a.wdir.max()) < 360
+
+
+def test_complete_root_loads_with_every_wind_data_class(tmp_path):
+    root = str(tmp_path)
+    paths = write_synthetic_anemos_data(root, steps_per_year=12, mean90m_extent=MEAN90M_TEST_EXTENT)
+    assert all(os.path.exists(path) for path in paths)
+
+    for kind in [WindDataKind.WINDSPEED, WindDataKind.AIRDENSITY, WindDataKind.WINDDIRECTION, WindDataKind.AIRPRESSURE]:
+        assert TsNcWindData(kind, _wind_data_path=root).winddata.time.size == 12
+
+    means = Mean3km10aWindData(WindDataKind.WEIBULLA, _wind_data_path=root).winddata
+    numpy.testing.assert_array_equal(means.level, ANEMOS_LEVELS)
+
+    mean90m = Mean90mWindData(WindDataKind.WEIBULLK, _wind_data_path=root).winddata
+    assert MEAN90M_TEST_EXTENT[0] < float(mean90m.x.min()) < float(mean90m.x.max()) < MEAN90M_TEST_EXTENT[2]
+    assert mean90m.y[0] > mean90m.y[-1]
+
+    with xarray.open_mfdataset(os.path.join(root, "powercurves", "single_netcdfs", "wea_*.nc"), combine="nested", concat_dim="wea_type") as curves:
+        assert curves.power.dims == ("wea_type", "wspd", "rho")
+        assert float(curves.power.sel(wspd=30).max()) == 0
@@ -0,0 +1,160 @@
+import numpy
+import pytest
+import xarray
+
+from anemosData import (
+                TsNcWindData,
+                WindDataKind,
+                )
+from benchmark import (
+                data_root,
+                random_fleet,
+                )
+from lambertGrid import geo_to_lambert
+from weaPoints import (
+                InterpolationMethod,
+                WeaPoints,
+                WindDataType,
+                )
+
+
+def test_interp_wind_data_extracts_every_method_at_once(synthetic_root):
+    lat_lon, levels, types = random_fleet(20, seed=1)
+    methods = [InterpolationMethod.LINEAR, InterpolationMethod.NEAREST] * 10
+    points = WeaPoints(lat_lon, levels, types, interpolation_method=methods)
+    wind_data = TsNcWindData(WindDataKind.WINDSPEED, _wind_data_path=synthetic_root)
+
+    result = points._interp_wind_data({"wspd": wind_data})["wspd"].wspd.transpose("point", "time").to_numpy()
+
+    for method in (InterpolationMethod.LINEAR, InterpolationMethod.NEAREST):
+        idx = numpy.flatnonzero(points.interpolation_methods == method.value)
+        expected = wind_data.interp_points(points.x[idx], points.y[idx], points.level[idx], method=method)
+        numpy.testing.assert_array_equal(result[idx], expected.wspd.transpose("point", "time").to_numpy())
+
+
+def test_float32_power_matches_float64(synthetic_root):
+    lat_lon, levels, types = random_fleet(20, seed=2)
+
+    power = {}
+    with data_root(synthetic_root):
+        for dtype in (None, "float32"):
+            points = WeaPoints(lat_lon, levels, types, dtype=dtype)
+            power_curves = points._load_power_curves()
+            assert power_curves.power.dtype == (dtype or "float64")
+            # the coordinates stay float64 for the nearest lookup
+            assert power_curves.wspd.dtype == power_curves.rho.dtype == "float64"
+
+            points.get_windpower_out(WindDataType.TSNETCDF, time_frame=[2009, 2010])
+            power[dtype] = points.power
+
+    assert power["float32"].dtype == "float32"
+    numpy.testing.assert_allclose(power["float32"], power[None], rtol=1e-6, atol=1e-3)
+
+
+@pytest.mark.parametrize("block_freq", ["YS", "QS"])
+def test_power_blocks_match_the_power_of_the_time_frame(synthetic_root, monkeypatch, block_freq):
+    lat_lon, levels, types = random_fleet(20, seed=3)
+    opened, closed = [], []
+    init, close = TsNcWindData.__init__, TsNcWindData.close
+    monkeypatch.setattr(TsNcWindData, "__init__", lambda self, *args, **kwargs: (opened.append(self), init(self, *args, **kwargs))[1])
+    monkeypatch.setattr(TsNcWindData, "close", lambda self: (closed.append(self), close(self)))
+
+    with data_root(synthetic_root):
+        points = WeaPoints(lat_lon, levels, types)
+        blocks = list(points.iter_tsnetcdf_power(time_frame=[2009, 2010], block_freq=block_freq))
+        # the wind speed and air density of every block are closed, also those of the empty blocks
+        assert len(opened) >= 2 * len(blocks)
+        assert closed == opened
+
+        points.get_windpower_out(WindDataType.TSNETCDF, time_frame=[2009, 2010])
+
+    power = xarray.concat(blocks, dim="time")
+    assert numpy.all(numpy.diff(power.time.to_numpy()) > numpy.timedelta64(0))
+    numpy.testing.assert_allclose(power.to_numpy(), points.power)
+
+
+def test_all_points_are_transformed_at_once():
+    lat_lon, levels, types = random_fleet(30, seed=4)
+    points = WeaPoints(lat_lon, levels, types)
+
+    x, y = geo_to_lambert(*numpy.array(lat_lon).T)
+    numpy.testing.assert_array_equal(points.x, x)
+    numpy.testing.assert_array_equal(points.y, y)
+    for point, point_x, point_y in zip(points.point_list, x, y):
+        assert point.x_y_coor == [point_x, point_y]
+
+
+def test_point_list_writes_through_to_the_columns():
+    lat_lon, levels, types = random_fleet(5, seed=1)
+    points = WeaPoints(lat_lon, levels, types)
+
+    assert points.point_list is points.point_list
+    assert points.point(2) is points.point_list[2]
+
+    point = points.point_list[0]
+    point.level = 133.0
+    point.wea_type = "new type"
+    point.interpolation_method = InterpolationMethod.NEAREST
+    point.EinheitMastrNummer = "SEE123456789"
+    point.Hauptwindrichtung = 270.0
+    point.power_time_series = numpy.arange(3.0)
+
+    assert points.level[0] == 133.0
+    assert points.wea_types[0] == "new type"
+    assert points.interpolation_methods[0] == "nearest"
+    assert points.mastr_ids[0] == "SEE123456789"
+    assert points.Hauptwindrichtung[0] == 270.0
+    assert points.power.shape == (5, 3)
+    numpy.testing.assert_array_equal(points.power[0], [0.0, 1.0, 2.0])
+    assert numpy.isnan(points.power[1:]).all()
+
+    # and the views read the columns
+    points.level[1] = 99.0
+    assert points.point_list[1].level == 99.0
+
+
+def test_power_of_another_length_is_not_dropped():
+    lat_lon, levels, types = random_fleet(5, seed=1)
+    points = WeaPoints(lat_lon, levels, types)
+
+    # an empty power block is reallocated
+    points.point_list[0].power_time_series = numpy.arange(3.0)
+    points.point_list[0].power_time_series = None
+    points.point_list[1].power_time_series = numpy.arange(4.0)
+    assert points.power.shape == (5, 4)
+
+    with pytest.raises(ValueError):
+        points.point_list[2].power_time_series = numpy.arange(3.0)
+    numpy.testing.assert_array_equal(points.power[1], numpy.arange(4.0))
+
+    points.power = None
+    points.point_list[2].power_time_series = numpy.arange(3.0)
+    assert points.power.shape == (5, 3)
+
+
+def test_grouped_power_matches_the_power_of_every_point(synthetic_root):
+    lat_lon, levels, types = random_fleet(12, seed=5)
+    types[3] = None
+    methods = [InterpolationMethod.LINEAR, InterpolationMethod.NEAREST] * 6
+
+    with data_root(synthetic_root):
+        points = WeaPoints(lat_lon, levels, types, interpolation_method=methods)
+        points.get_windpower_out(WindDataType.TSNETCDF, time_frame=["2009-06", "2010-12-31"])
+        power_curves = points._load_power_curves()
+    # only the synthetic steps of 2010 lie inside of the time frame
+    assert points.power.shape == (12, 12)
+
+    wind_data = {
+        kind.value: TsNcWindData(kind, time_frame=points.time_frame, _wind_data_path=synthetic_root)
+        for kind in (WindDataKind.WINDSPEED, WindDataKind.AIRDENSITY)
+        }
+    for num, point in enumerate(points.point_list):
+        if point.wea_type is None:
+            assert numpy.isnan(points.power[num]).all()
+            continue
+
+        interp_wind_data = {
+            kind: data.interp_points(points.x[[num]], points.y[[num]], points.level[[num]], method=point.interpolation_method).isel(point=0)
+            for kind, data in wind_data.items()
+            }
+        numpy.testing.assert_array_equal(points.power[num], point.tsnetcdf_power(interp_wind_data, power_curves))
@@ -0,0 +1,64 @@
+import os
+
+import numpy
+from scipy.special import gamma
+
+from anemosData import (
+                Mean3km10aWindData,
+                TsNcWindData,
+                WindDataKind,
+                WindDataType,
+                )
+from weibullFit import (
+                WEIBULL_K_BOUNDS,
+                weibull_from_moments,
+                write_weibull_parameters,
+                )
+
+
+def test_weibull_from_moments_recovers_parameters():
+    rng = numpy.random.default_rng(2)
+    A = rng.uniform(3, 12, (20, 30))
+    k = rng.uniform(1.2, 4, (20, 30))
+
+    mean = A * gamma(1 + 1 / k)
+    variance = A ** 2 * (gamma(1 + 2 / k) - gamma(1 + 1 / k) ** 2)
+
+    fit_A, fit_k = weibull_from_moments(mean, variance)
+
+    assert fit_A.shape == A.shape
+    numpy.testing.assert_allclose(fit_k, k, rtol=1e-10)
+    numpy.testing.assert_allclose(fit_A, A, rtol=1e-10)
+
+
+def test_weibull_from_moments_edge_cells():
+    fit_A, fit_k = weibull_from_moments(numpy.array([5.0, numpy.nan]), numpy.array([0.0, 1.0]))
+
+    # no variance gives the upper bound of k, no data NaN
+    numpy.testing.assert_allclose(fit_k[0], WEIBULL_K_BOUNDS[1])
+    assert numpy.isnan(fit_A[1]) and numpy.isnan(fit_k[1])
+
+
+def test_written_parameters_are_loaded_as_statistics(synthetic_root, tmp_path):
+    paths = write_weibull_parameters(
+        os.path.join(tmp_path, WindDataType.MEAN3KM10A.value),
+        period="2009",
+        time_frame=[2009, 2009],
+        time_block=5,
+        _wind_data_path=synthetic_root,
+        )
+    assert len(paths) == 4
+
+    wspd = TsNcWindData(WindDataKind.WINDSPEED, time_frame=[2009, 2009], _wind_data_path=synthetic_root).winddata.wspd
+    wspd = wspd.astype("float64").load().transpose("time", ...)
+    rho = TsNcWindData(WindDataKind.AIRDENSITY, time_frame=[2009, 2009], _wind_data_path=synthetic_root).winddata.rho
+    rho = rho.astype("float64").transpose("time", ...)
+    A, k = weibull_from_moments(wspd.mean("time").to_numpy(), wspd.var("time").to_numpy())
+
+    for kind, expected in [
+        (WindDataKind.WEIBULLA, A),
+        (WindDataKind.WEIBULLK, k),
+        (WindDataKind.AIRDENSITY, rho.mean("time").to_numpy()),
+        ]:
+        loaded = Mean3km10aWindData(kind, _wind_data_path=str(tmp_path), period="2009").winddata[kind.value]
+        numpy.testing.assert_allclose(loaded.transpose(*wspd.dims[1:]).to_numpy(), expected, rtol=1e-6)
@@ -0,0 +1,82 @@
+import numpy
+import pytest
+
+from anemosData import (
+                InterpolationMethod,
+                TsNcWindData,
+                WindDataKind,
+                )
+from windRose import (
+                WindRose,
+                tsnc_wind_rose,
+                )
+
+SPEED_BIN_EDGES = numpy.array([0, 3, 6, 9, 12, 40.0])
+
+
+def _histograms(wdir, wspd, sectors, speed_bin_edges):
+    """Bins every point on its own with numpy.histogram, sector 0 centered on north.
+    """
+    width = 360 / sectors
+    shifted = numpy.mod(wdir + width / 2, 360)
+    sector_edges = numpy.arange(sectors + 1) * width
+
+    counts, wspd_sum, speed_counts = [], [], []
+    for point_dir, point_wspd in zip(shifted, wspd):
+        valid = ~(numpy.isnan(point_dir) | numpy.isnan(point_wspd))
+        counts.append(numpy.histogram(point_dir[valid], bins=sector_edges)[0])
+        wspd_sum.append(numpy.histogram(point_dir[valid], bins=sector_edges, weights=point_wspd[valid])[0])
+        speed_counts.append(numpy.histogram2d(point_dir[valid], point_wspd[valid], bins=[sector_edges, speed_bin_edges])[0])
+
+    return numpy.array(counts), numpy.array(wspd_sum), numpy.array(speed_counts)
+
+
+def test_block_updates_match_numpy_histogram():
+    rng = numpy.random.default_rng(4)
+    wdir = rng.uniform(0, 360, (7, 500))
+    wdir[:, :20] = numpy.arange(20) * 30 + 15 - 1e-9
+    wspd = rng.weibull(2.0, (7, 500)) * 8
+    wspd[rng.random(wspd.shape) < 0.05] = numpy.nan
+    wdir[rng.random(wdir.shape) < 0.05] = numpy.nan
+
+    rose = WindRose(7, sectors=12, speed_bin_edges=SPEED_BIN_EDGES)
+    for start, stop in [(0, 1), (1, 130), (130, 500)]:
+        rose.update(wdir[:, start:stop], wspd[:, start:stop])
+
+    counts, wspd_sum, speed_counts = _histograms(wdir, wspd, 12, SPEED_BIN_EDGES)
+    numpy.testing.assert_array_equal(rose.counts, counts)
+    numpy.testing.assert_allclose(rose.wspd_sum, wspd_sum)
+    numpy.testing.assert_array_equal(rose.speed_counts, speed_counts)
+
+    roses = rose.to_dataset()
+    numpy.testing.assert_allclose(roses.histo.sum("sector"), 100)
+    numpy.testing.assert_allclose(roses.speed_histo.sum(["sector", "speed_bin"]), 100)
+
+
+@pytest.mark.parametrize("time_block", [5, 1008])
+def test_tsnc_wind_rose_bins_the_extracted_series(synthetic_root, time_block):
+    wind_speed = TsNcWindData(WindDataKind.WINDSPEED, _wind_data_path=synthetic_root)
+    xs = wind_speed.winddata.x.to_numpy()[[3, 40, 41]]
+    ys = wind_speed.winddata.y.to_numpy()[[7, 50, 20]]
+    levels = numpy.array([100, 85, 140])
+
+    wspd = wind_speed.interp_points(xs, ys, levels).wspd
+    wdir = TsNcWindData(WindDataKind.WINDDIRECTION, _wind_data_path=synthetic_root).interp_points(
+        xs,
+        ys,
+        levels,
+        method=InterpolationMethod.NEAREST,
+        ).wdir
+    roses = tsnc_wind_rose(xs, ys, levels, speed_bin_edges=SPEED_BIN_EDGES, time_block=time_block, _wind_data_path=synthetic_root)
+
+    counts, wspd_sum, speed_counts = _histograms(
+        wdir.transpose("point", "time").to_numpy().astype("float64"),
+        wspd.transpose("point", "time").to_numpy().astype("float64"),
+        12,
+        SPEED_BIN_EDGES,
+        )
+    total = counts.sum(axis=1, keepdims=True)
+    assert numpy.all(total == wspd.time.size)
+    numpy.testing.assert_allclose(roses.histo.to_numpy(), counts * 100 / total)
+    numpy.testing.assert_allclose(roses.wspd.to_numpy()[counts > 0], wspd_sum[counts > 0] / counts[counts > 0])
+    numpy.testing.assert_allclose(roses.speed_histo.to_numpy(), speed_counts * 100 / total[:, :, None])
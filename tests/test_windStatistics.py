@@ -0,0 +1,115 @@
+import os
+
+import numpy
+import pytest
+
+from anemosData import (
+                Mean3km1aWindData,
+                TsNcWindData,
+                WindDataKind,
+                WindDataType,
+                )
+from windStatistics import (
+                StreamingStatistics,
+                accumulate_tsnc_statistics,
+                iter_tsnc_statistics,
+                write_tsnc_statistics,
+                )
+
+
+def _blocks(seed: int = 3):
+    rng = numpy.random.default_rng(seed)
+    values = rng.weibull(2.0, (100, 4, 5, 3)) * 8
+    values[rng.random(values.shape) < 0.1] = numpy.nan
+    # a cell without any data
+    values[:, 0, 0, 0] = numpy.nan
+
+    return values, [values[start:stop] for start, stop in [(0, 7), (7, 8), (8, 60), (60, 100)]]
+
+
+def test_streaming_statistics_matches_numpy():
+    values, blocks = _blocks()
+    statistics = StreamingStatistics(values.shape[1:])
+    for block in blocks:
+        statistics.update(block)
+
+    has_data = ~numpy.isnan(values).all(axis=0)
+    numpy.testing.assert_array_equal(statistics.count, (~numpy.isnan(values)).sum(axis=0))
+    numpy.testing.assert_allclose(statistics.mean[has_data], numpy.nanmean(values[:, has_data], axis=0), rtol=1e-12)
+    numpy.testing.assert_allclose(statistics.variance()[has_data], numpy.nanvar(values[:, has_data], axis=0, ddof=1), rtol=1e-10)
+    numpy.testing.assert_allclose(statistics.variance(ddof=0)[has_data], numpy.nanvar(values[:, has_data], axis=0), rtol=1e-10)
+    assert numpy.isnan(statistics.variance()[0, 0, 0])
+
+
+def test_streaming_statistics_percentiles_within_one_bin():
+    values, blocks = _blocks()
+    bin_edges = numpy.arange(0, 40.25, 0.25)
+    statistics = StreamingStatistics(values.shape[1:], bin_edges=bin_edges)
+    for block in blocks:
+        statistics.update(block)
+
+    q = [10, 50, 90]
+    estimated = statistics.percentiles(q)
+    has_data = ~numpy.isnan(values).all(axis=0)
+    # the smallest value reaching the percentile lies in the bin the estimate is interpolated in
+    expected = numpy.nanpercentile(values[:, has_data], q, axis=0, method="inverted_cdf")
+
+    assert estimated.shape == (len(q), *values.shape[1:])
+    assert numpy.isnan(estimated[:, ~has_data]).all()
+    numpy.testing.assert_allclose(estimated[:, has_data], expected, rtol=0, atol=0.25)
+
+
+def test_accumulate_tsnc_statistics_matches_numpy(synthetic_root):
+    statistics, template = accumulate_tsnc_statistics(WindDataKind.WINDSPEED, _wind_data_path=synthetic_root, time_block=5)
+    data = TsNcWindData(WindDataKind.WINDSPEED, _wind_data_path=synthetic_root).winddata.wspd.load()
+
+    assert template.dims == ("y", "x", "level")
+    numpy.testing.assert_allclose(statistics.mean, data.mean("time", dtype="float64").to_numpy(), rtol=1e-6)
+    numpy.testing.assert_allclose(statistics.variance(), data.astype("float64").var("time", ddof=1).to_numpy(), rtol=1e-6)
+
+
+def test_annual_statistics_files_are_loaded_per_year(synthetic_root, tmp_path):
+    paths = write_tsnc_statistics(
+        WindDataKind.WINDSPEED,
+        os.path.join(tmp_path, WindDataType.MEAN3KM1A.value),
+        _wind_data_path=synthetic_root,
+        time_block=5,
+        )
+    assert len(paths) == 2
+
+    means = Mean3km1aWindData(WindDataKind.WINDSPEED, _wind_data_path=str(tmp_path)).winddata.wspd
+    data = TsNcWindData(WindDataKind.WINDSPEED, _wind_data_path=synthetic_root).winddata.wspd.load()
+
+    assert list(means.year.to_numpy()) == [2009, 2010]
+    numpy.testing.assert_allclose(
+        means.transpose("year", ...).to_numpy(),
+        data.astype("float64").groupby("time.year").mean("time").transpose("year", *means.dims[1:]).to_numpy(),
+        rtol=1e-6,
+        )
+
+
+def test_missing_annual_statistics_files_are_named(synthetic_root, tmp_path):
+    with pytest.raises(FileNotFoundError, match=r"wspd\.10L\.ym\.\*\.nc"):
+        Mean3km1aWindData(WindDataKind.WINDSPEED, _wind_data_path=str(tmp_path))
+
+    write_tsnc_statistics(
+        WindDataKind.WINDSPEED,
+        os.path.join(tmp_path, WindDataType.MEAN3KM1A.value),
+        _wind_data_path=synthetic_root,
+        time_frame=[2009, 2009],
+        )
+    with pytest.raises(FileNotFoundError, match=r"wspd\.10L\.ym\.2010\.nc"):
+        Mean3km1aWindData(WindDataKind.WINDSPEED, years=[2009, 2010], _wind_data_path=str(tmp_path))
+
+
+def test_statistics_close_their_files_when_stopped_early(synthetic_root, monkeypatch):
+    closed = []
+    close = TsNcWindData.close
+    monkeypatch.setattr(TsNcWindData, "close", lambda self: (closed.append(self), close(self)))
+
+    periods = iter_tsnc_statistics(WindDataKind.WINDSPEED, freq="M", _wind_data_path=synthetic_root)
+    next(periods)
+    assert not closed
+
+    periods.close()
+    assert len(closed) == 1
@@ -0,0 +1,76 @@
+import os
+
+import pytest
+import xarray
+
+from anemosData import (
+                TsNcWindData,
+                WindDataKind,
+                )
+from conftest import (
+                TEST_STEPS_PER_YEAR,
+                TEST_YEARS,
+                )
+from zarrStore import (
+                _axis_passes,
+                convert_tsnc_to_zarr,
+                )
+
+
+@pytest.fixture(scope="module")
+def one_level_root(synthetic_root, tmp_path_factory) -> str:
+    """Year files of a single level, with the last year shorter than the others like a year of a different length.
+    """
+    root = tmp_path_factory.mktemp("one_level")
+    tsnc_path = root / "TSNC-Format"
+    tsnc_path.mkdir()
+
+    for year in TEST_YEARS:
+        steps = TEST_STEPS_PER_YEAR - 2 if year == TEST_YEARS[-1] else TEST_STEPS_PER_YEAR
+        source_path = os.path.join(synthetic_root, "TSNC-Format", f"wspd.10L.{year}.ts.nc")
+        with xarray.open_dataset(source_path, engine="h5netcdf") as data:
+            data = data.isel(time=slice(0, steps), level=slice(3, 4))
+            data.to_netcdf(tsnc_path / f"wspd.10L.{year}.ts.nc", engine="h5netcdf", encoding={"wspd": {"chunksizes": (31, 45, 1, steps)}})
+
+    return str(root)
+
+
+def test_axis_passes_write_every_tile_once():
+    passes = _axis_passes(310, 31, 2)
+
+    assert [(start, stop) for start, stop, _ in passes] == [(start, min(start + 31, 310)) for start in range(0, 310, 31)]
+    # the writes follow each other, end on a tile boundary and never pass the rows read so far
+    write_stops = [write_stop for _, _, write_stop in passes]
+    assert write_stops == sorted(write_stops)
+    assert write_stops[-1] == 310
+    assert all(write_stop % 2 == 0 and write_stop <= stop for _, stop, write_stop in passes)
+
+
+@pytest.mark.parametrize("tile_size", [7, 64])
+def test_stores_match_the_year_files(one_level_root, tmp_path, tile_size):
+    paths = convert_tsnc_to_zarr(WindDataKind.WINDSPEED, str(tmp_path), _wind_data_path=one_level_root, tile_size=tile_size)
+
+    assert [os.path.basename(path) for path in paths] == [f"wspd.10L.{year}.ts.zarr" for year in TEST_YEARS]
+
+    source = TsNcWindData(WindDataKind.WINDSPEED, _wind_data_path=one_level_root, mfdataset=False)
+    for path, year_data in zip(paths, source.winddata):
+        with xarray.open_zarr(path) as store:
+            assert store.wspd.encoding["chunks"][:3] == (tile_size, tile_size, 1)
+            xarray.testing.assert_identical(store.wspd.load(), year_data.wspd.load())
+
+
+def test_time_chunk_follows_every_year_file(one_level_root, tmp_path):
+    store_path = str(tmp_path)
+    paths = convert_tsnc_to_zarr(WindDataKind.WINDSPEED, store_path, _wind_data_path=one_level_root, tile_size=32)
+
+    time_chunks = []
+    for path in paths:
+        with xarray.open_zarr(path) as store:
+            time_chunks.append(store.wspd.encoding["chunks"][-1])
+    assert time_chunks == [TEST_STEPS_PER_YEAR, TEST_STEPS_PER_YEAR - 2]
+
+    # all years are read back as one dataset, the time frame selects the stores
+    wind_data = TsNcWindData(WindDataKind.WINDSPEED, _wind_data_path=one_level_root, zarr_store_path=store_path)
+    assert wind_data.winddata.time.size == 2 * TEST_STEPS_PER_YEAR - 2
+    wind_data = TsNcWindData(WindDataKind.WINDSPEED, time_frame=[TEST_YEARS[-1], TEST_YEARS[-1]], _wind_data_path=one_level_root, zarr_store_path=store_path)
+    assert (wind_data.winddata.time.dt.year == TEST_YEARS[-1]).all()
@@ -0,0 +1,229 @@
+from typing import (
+                Optional,
+                List,
+                Union,
+                )
+
+import numpy
+import xarray
+
+from anemosData import (
+                WindDataKind,
+                TsNcWindData,
+                Mean3km10aWindData,
+                )
+from lambertGrid import LAMBERT_PROJ4
+from energyProduction import (
+                HOURS_PER_YEAR,
+                power_curve_arrays,
+                weibull_aep_kernel,
+                )
+from wea_data.power_curve import nearest_indices
+
+# grid cells per dask chunk and axis
+DEFAULT_CELL_CHUNK = 64
+
+
+def nearest_power_kernel(
+    wspd_values: numpy.ndarray,
+    rho_values: numpy.ndarray,
+    wspd: numpy.ndarray,
+    rho_grid: numpy.ndarray,
+    power: numpy.ndarray,
+    ) -> numpy.ndarray:
+    """Looks up the power of every wind speed and air density at the nearest power curve node.
+
+    The nodes are found by `power_curve.nearest_indices`, like the power of the TSNC power output.
+    """
+    result = power[nearest_indices(wspd_values, wspd), nearest_indices(rho_values, rho_grid)]
+
+    return numpy.where(numpy.isnan(wspd_values) | numpy.isnan(rho_values), numpy.nan, result)
+
+
+def _raster_dataset(
+    aep: xarray.DataArray,
+    power_max: float,
+    attrs: dict,
+    ) -> xarray.Dataset:
+
+    raster = xarray.Dataset({
+        "aep": aep.assign_attrs(units="kWh/a", long_name="annual energy production"),
+        "capacity_factor": (aep / (HOURS_PER_YEAR * power_max)).assign_attrs(long_name="capacity factor"),
+        })
+    raster.attrs = {**attrs, "crs": LAMBERT_PROJ4}
+
+    return raster
+
+
+def weibull_aep_raster(
+    power_curve: Union[xarray.DataArray, xarray.Dataset],
+    hub_height: float,
+    period: Optional[str] = "2009-2018",
+    s: float = 1,
+    _wind_data_path: Optional[str] = None,
+    extent: Optional[List[float]] = None,
+    cell_chunk: int = DEFAULT_CELL_CHUNK,
+    ) -> xarray.Dataset:
+    """Calculates AEP and capacity factor of one turbine type for every grid cell from the Weibull parameter grids.
+
+    The `wbA`, `wbk` and `rho` grids of `Mean3km10aWindData` are interpolated linearly to the hub
+    height and evaluated chunk by chunk with dask, instead of through one `_WeaPoint` per cell.
+    The result stays lazy until it is computed or written with `write_aep_raster`.
+
+    Args:
+        power_curve (Union[xarray.DataArray, xarray.Dataset]): Power curve with the dimensions wspd and rho,
+            e.g. `power_curves.power.sel(wea_type=...)`.
+        hub_height (float): Hub height of the turbine type.
+        period (Optional[str], optional): Period of the parameter grids, see `Mean3km10aWindData`. Defaults to "2009-2018".
+        s (float, optional): Availability factor. Defaults to 1.
+        _wind_data_path (Optional[str], optional): Root path of the anemos data. Defaults to None.
+        extent (Optional[List[float]], optional): `[x_min, y_min, x_max, y_max]` in lambert coordinates. Defaults to None.
+        cell_chunk (int, optional): Grid cells per dask chunk and axis. Defaults to DEFAULT_CELL_CHUNK.
+
+    Returns:
+        xarray.Dataset: The variables `aep` and `capacity_factor` with the dimensions (y, x).
+    """
+    wspd, rho_grid, power = power_curve_arrays(power_curve)
+
+    grids = {}
+    for kind in [WindDataKind.WEIBULLA, WindDataKind.WEIBULLK, WindDataKind.AIRDENSITY]:
+        data = Mean3km10aWindData(wind_data_kind=kind, _wind_data_path=_wind_data_path, extent=extent, period=period)
+        grids[kind.value] = data.winddata[kind.value].interp(level=hub_height).chunk({"y": cell_chunk, "x": cell_chunk})
+
+    aep = xarray.apply_ufunc(
+        weibull_aep_kernel,
+        grids[WindDataKind.WEIBULLA.value],
+        grids[WindDataKind.WEIBULLK.value],
+        grids[WindDataKind.AIRDENSITY.value],
+        kwargs={"wspd": wspd, "rho_grid": rho_grid, "power": power, "s": s},
+        dask="parallelized",
+        output_dtypes=["float64"],
+        )
+
+    return _raster_dataset(aep, power.max(), {"hub_height": hub_height, "period": period, "calculation_method": "weibull"})
+
+
+def rayleigh_aep_raster(
+    power_curve: Union[xarray.DataArray, xarray.Dataset],
+    hub_height: float,
+    period: Optional[str] = "2009-2018",
+    s: float = 1,
+    _wind_data_path: Optional[str] = None,
+    extent: Optional[List[float]] = None,
+    cell_chunk: int = DEFAULT_CELL_CHUNK,
+    ) -> xarray.Dataset:
+    """Calculates AEP and capacity factor of one turbine type for every grid cell from the mean wind speed.
+
+    The Rayleigh distribution of the mean wind speed is the Weibull distribution with `k = 2` and
+    `A = 2 * v_mean / sqrt(pi)`, so the same kernel as for `weibull_aep_raster` is used.
+
+    Args:
+        power_curve (Union[xarray.DataArray, xarray.Dataset]): Power curve with the dimensions wspd and rho.
+        hub_height (float): Hub height of the turbine type.
+        period (Optional[str], optional): Period of the mean grids, see `Mean3km10aWindData`. Defaults to "2009-2018".
+        s (float, optional): Availability factor. Defaults to 1.
+        _wind_data_path (Optional[str], optional): Root path of the anemos data. Defaults to None.
+        extent (Optional[List[float]], optional): `[x_min, y_min, x_max, y_max]` in lambert coordinates. Defaults to None.
+        cell_chunk (int, optional): Grid cells per dask chunk and axis. Defaults to DEFAULT_CELL_CHUNK.
+
+    Returns:
+        xarray.Dataset: The variables `aep` and `capacity_factor` with the dimensions (y, x).
+    """
+    wspd, rho_grid, power = power_curve_arrays(power_curve)
+
+    grids = {}
+    for kind in [WindDataKind.WINDSPEED, WindDataKind.AIRDENSITY]:
+        data = Mean3km10aWindData(wind_data_kind=kind, _wind_data_path=_wind_data_path, extent=extent, period=period)
+        grids[kind.value] = data.winddata[kind.value].interp(level=hub_height).chunk({"y": cell_chunk, "x": cell_chunk})
+
+    v_mean = grids[WindDataKind.WINDSPEED.value]
+    aep = xarray.apply_ufunc(
+        weibull_aep_kernel,
+        2 * v_mean / numpy.sqrt(numpy.pi),
+        xarray.full_like(v_mean, 2.0),
+        grids[WindDataKind.AIRDENSITY.value],
+        kwargs={"wspd": wspd, "rho_grid": rho_grid, "power": power, "s": s},
+        dask="parallelized",
+        output_dtypes=["float64"],
+        )
+
+    return _raster_dataset(aep, power.max(), {"hub_height": hub_height, "period": period, "calculation_method": "rayleigh"})
+
+
+def timeseries_aep_raster(
+    power_curve: Union[xarray.DataArray, xarray.Dataset],
+    hub_height: float,
+    time_frame: Optional[List[int]] = None,
+    _wind_data_path: Optional[str] = None,
+    extent: Optional[List[float]] = None,
+    cell_chunk: int = DEFAULT_CELL_CHUNK,
+    time_chunk: int = 1008,
+    ) -> xarray.Dataset:
+    """Calculates AEP and capacity factor of one turbine type for every grid cell from the TSNC-Format series.
+
+    `wspd` and `rho` are interpolated linearly to the hub height, the power of every time step is
+    looked up at the nearest node of the power curve, like in the TSNC power output of `WeaPoints`,
+    and averaged over the time frame. dask works through the series chunk by chunk.
+
+    Args:
+        power_curve (Union[xarray.DataArray, xarray.Dataset]): Power curve with the dimensions wspd and rho.
+        hub_height (float): Hub height of the turbine type.
+        time_frame (Optional[List[int]], optional): First and last year or date, like for `TsNcWindData`. Defaults to None.
+        _wind_data_path (Optional[str], optional): Root path of the anemos data. Defaults to None.
+        extent (Optional[List[float]], optional): `[x_min, y_min, x_max, y_max]` in lambert coordinates. Defaults to None.
+        cell_chunk (int, optional): Grid cells per dask chunk and axis. Defaults to DEFAULT_CELL_CHUNK.
+        time_chunk (int, optional): Time steps per dask chunk. Defaults to 1008, one week.
+
+    Returns:
+        xarray.Dataset: The variables `aep` and `capacity_factor` with the dimensions (y, x).
+    """
+    wspd, rho_grid, power = power_curve_arrays(power_curve)
+    chunks = {"time": time_chunk, "y": cell_chunk, "x": cell_chunk}
+
+    series = {}
+    for kind in [WindDataKind.WINDSPEED, WindDataKind.AIRDENSITY]:
+        # opened in the chunks of the files and rechunked after the crop to the extent, chunking
+        # the whole grid first would build the dask graph of every cell outside of the extent
+        data = TsNcWindData(wind_data_kind=kind, time_frame=time_frame, _wind_data_path=_wind_data_path, extent=extent, chunks={})
+        series[kind.value] = data.winddata[kind.value].chunk(chunks).interp(level=hub_height)
+
+    step_power = xarray.apply_ufunc(
+        nearest_power_kernel,
+        series[WindDataKind.WINDSPEED.value],
+        series[WindDataKind.AIRDENSITY.value],
+        kwargs={"wspd": wspd, "rho_grid": rho_grid, "power": power},
+        dask="parallelized",
+        output_dtypes=["float64"],
+        )
+    aep = step_power.mean("time") * HOURS_PER_YEAR
+
+    return _raster_dataset(aep, power.max(), {"hub_height": hub_height, "time_frame": str(time_frame), "calculation_method": "timeseries"})
+
+
+def write_aep_raster(
+    raster: xarray.Dataset,
+    path: str,
+    variable: str = "aep",
+    ) -> str:
+    """Computes and writes an AEP raster, as netCDF or, for a `.tif` path, as GeoTIFF of one variable.
+
+    Writing GeoTIFFs needs rioxarray.
+
+    Args:
+        raster (xarray.Dataset): Raster of `weibull_aep_raster`, `rayleigh_aep_raster` or `timeseries_aep_raster`.
+        path (str): Path of the written file.
+        variable (str, optional): Variable written to a GeoTIFF. Defaults to "aep".
+
+    Returns:
+        str: Path of the written file.
+    """
+    if path.endswith((".tif", ".tiff")):
+        import rioxarray
+
+        band = raster[variable].rio.set_spatial_dims(x_dim="x", y_dim="y").rio.write_crs(LAMBERT_PROJ4)
+        band.rio.to_raster(path)
+
+    else:
+        raster.to_netcdf(path, mode="w")
+
+    return path
@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from threading import RLock
+
+from typing import (
+                Dict,
+                Hashable,
+                Optional,
+                Union,
+                )
+
+import numpy
+import xarray
+
+# specific gas constants of dry air and water vapour in J/(kg K)
+R_DRY_AIR = 287.058
+R_WATER_VAPOUR = 461.495
+
+# conversion of the units found in the `units` attribute to Pa, K and a relative humidity fraction
+PRESSURE_UNIT_FACTORS = {"Pa": 1.0, "hPa": 100.0, "mbar": 100.0, "kPa": 1000.0}
+TEMPERATURE_UNIT_OFFSETS = {"K": 0.0, "C": 273.15, "degC": 273.15, "°C": 273.15, "degree_Celsius": 273.15}
+HUMIDITY_UNIT_FACTORS = {"%": 0.01, "percent": 0.01, "1": 1.0, "": 1.0}
+
+MAX_CACHED_SERIES = 16
+
+ArrayLike = Union[numpy.ndarray, xarray.DataArray]
+
+
+def saturation_vapour_pressure(
+    temp: ArrayLike,
+    ) -> ArrayLike:
+    """Returns the saturation vapour pressure over water in Pa by the Magnus formula.
+
+    Args:
+        temp (ArrayLike): Air temperature in K.
+    """
+    celsius = temp - 273.15
+    return 611.2 * numpy.exp(17.62 * celsius / (243.12 + celsius))
+
+
+def air_density(
+    pres: ArrayLike,
+    rhum: ArrayLike,
+    temp: ArrayLike,
+    ) -> ArrayLike:
+    """Returns the density of moist air as the sum of the dry air and water vapour partial densities.
+
+    `rho = (p - e) / (R_d T) + e / (R_v T)` with the vapour pressure `e = rhum * e_s(T)`.
+    Works elementwise on numpy arrays as well as on (lazy) xarray objects.
+
+    Args:
+        pres (ArrayLike): Air pressure in Pa.
+        rhum (ArrayLike): Relative humidity as fraction between 0 and 1.
+        temp (ArrayLike): Air temperature in K.
+
+    Returns:
+        ArrayLike: Air density in kg/m³.
+    """
+    vapour = rhum * saturation_vapour_pressure(temp)
+    return (pres - vapour) / (R_DRY_AIR * temp) + vapour / (R_WATER_VAPOUR * temp)
+
+
+def to_si_units(
+    data: xarray.DataArray,
+    ) -> xarray.DataArray:
+    """Converts pressure, relative humidity or temperature data to Pa, a fraction or K by its `units` attribute.
+
+    Data without a `units` attribute is returned unchanged, i.e. it is expected in these units.
+
+    Raises:
+        ValueError: If the `units` attribute is not known for the variable.
+    """
+    units = data.attrs.get("units")
+    if units is None:
+        return data
+
+    if units in TEMPERATURE_UNIT_OFFSETS and data.name == "temp":
+        return data + TEMPERATURE_UNIT_OFFSETS[units]
+    if units in PRESSURE_UNIT_FACTORS and data.name == "pres":
+        return data * PRESSURE_UNIT_FACTORS[units]
+    if units in HUMIDITY_UNIT_FACTORS and data.name == "rhum":
+        return data * HUMIDITY_UNIT_FACTORS[units]
+
+    raise ValueError(f"Unknown units '{units}' of '{data.name}'.")
+
+
+class DerivedSeriesCache():
+    """A bounded LRU cache of derived point series, shared by all instances of a process.
+
+    Args:
+        max_size (int, optional): Number of series to keep. Defaults to MAX_CACHED_SERIES.
+    """
+
+    def __init__(
+        self,
+        max_size: int = MAX_CACHED_SERIES,
+        ):
+
+        self.max_size = max_size
+        self._series: Dict[Hashable, xarray.Dataset] = OrderedDict()
+        self._lock = RLock()
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def get(
+        self,
+        key: Hashable,
+        ) -> Optional[xarray.Dataset]:
+        with self._lock:
+            if key not in self._series:
+                return None
+            self._series.move_to_end(key)
+            return self._series[key]
+
+    def put(
+        self,
+        key: Hashable,
+        series: xarray.Dataset,
+        ):
+        with self._lock:
+            self._series[key] = series
+            self._series.move_to_end(key)
+            while len(self._series) > self.max_size:
+                self._series.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+DERIVED_SERIES_CACHE = DerivedSeriesCache()
@@ -8,6 +8,9 @@ from typing import (
                 Optional, 
                 Dict, 
                 List,
+                Hashable,
+                Tuple,
+                Union,
                 )
 
 from abc import (
@@ -15,20 +18,43 @@ from abc import (
                 abstractmethod,
                 )
 
-from multiprocessing import (
-                Pool,
-                cpu_count,
+import os
+from itertools import count
+from weakref import (
+                finalize,
+                WeakKeyDictionary,
                 )
+from glob import glob
+
+from multiprocessing import cpu_count
 #import concurrent
 
 import pandas
-#import numpy
+import numpy
 import xarray
-#import geopandas
-#import rioxarray
-#from shapely.geometry import mapping
+import h5netcdf
+
+from datasetPool import DATASET_POOL
+from parallelExtraction import extract_points
+import pointInterpolation
+from h5PointReader import H5PointReader
+from lambertGrid import (
+                lambert_grid_coords,
+                LAMBERT_PROJ4,
+                )
+from regionMask import RegionMask
+from airDensity import (
+                air_density,
+                to_si_units,
+                DERIVED_SERIES_CACHE,
+                )
 
 CPUTOUSE = cpu_count() - 1
+# grid cells kept around a cropping extent, so the stencil of every interpolation method fits inside
+EXTENT_MARGIN_CELLS = 2
+# cache tokens of the sources passed to DerivedAirDensity without a cache_token, unlike id() never reused
+_SOURCE_TOKENS = WeakKeyDictionary()
+_source_token_count = count()
 
 class WindDataKind(Enum):
     WINDSPEED = "wspd"
@@ -39,6 +65,7 @@ class WindDataKind(Enum):
     WEIBULLA = "wbA"
     WEIBULLK = "wbk"
     DIRHISTOS = "dirhistos"
+    TEMPERATURE = "temp"
 
 class WindDataType(Enum):
     TSNETCDF = r"TSNC-Format/"
@@ -67,23 +94,93 @@ class _WindData(ABC):
     """
 
     _wind_data_path = r"/uba/anemos_winddata/20191029_anemosDataFull/UBA-Windatlas"
+    # coordinate reference system of the x/y coordinates, target shapes are transformed to it
+    _shape_crs = LAMBERT_PROJ4
     winddata = None
 
     def __init__(
         self,
         _wind_data_type: WindDataType = None,
         _wind_data_path: Optional[str] = None,
+        extent: Optional[List[float]] = None,
         ):
 
         if _wind_data_path:
             self._wind_data_path = _wind_data_path
         self._wind_data_type = _wind_data_type
+        self.extent = extent
 
         self.data_path = self.__build_data_path()
 
+        # datasets are shared with other instances through the DATASET_POOL, the references taken
+        # by this instance are released on close() or once the instance is garbage collected
+        self._pool_keys = []
+        self._pool_finalizer = finalize(self, DATASET_POOL.release, self._pool_keys)
+
     def __build_data_path(self) -> str:
         return f"{self._wind_data_path}/{self._wind_data_type.value}"
 
+    def _open_dataset(
+        self,
+        opener,
+        path: str,
+        **open_kwargs,
+        ) -> xarray.Dataset:
+        """Opens a dataset through the process wide DATASET_POOL.
+
+        Args:
+            opener (Callable): Function to open the dataset with, e.g. `xarray.open_dataset`.
+            path (str): Path (or glob pattern) passed to `opener`.
+            **open_kwargs: Open options passed to `opener`.
+
+        Returns:
+            xarray.Dataset: The (possibly shared) opened dataset.
+        """
+        key, data = DATASET_POOL.acquire(opener, path, **open_kwargs)
+        self._pool_keys.append(key)
+
+        return data
+
+    def close(self):
+        """Releases the datasets of this instance, so the DATASET_POOL may close them.
+        """
+        self._pool_finalizer()
+
+    def _crop_to_extent(
+        self,
+        data: xarray.Dataset,
+        ) -> xarray.Dataset:
+        """Crops the lazily opened data to `extent` plus a margin of EXTENT_MARGIN_CELLS grid cells.
+
+        Cropping before any computation keeps dask from scheduling chunks outside of the region
+        of interest. The extent is given as `[x_min, y_min, x_max, y_max]` in the coordinates of
+        the data, e.g. lambert x/y or lon/lat for the 3arcsecs data. It is clipped to the grid
+        first, so an extent of targets all outside of the grid keeps the cells of the nearest
+        edge instead of cropping the data to nothing, and the targets are interpolated to NaN.
+
+        Args:
+            data (xarray.Dataset): Data with the coordinates x and y.
+
+        Returns:
+            xarray.Dataset: The cropped data or the passed data if no extent is set.
+        """
+        if not self.extent:
+            return data
+
+        x_min, y_min, x_max, y_max = self.extent
+
+        slices = {}
+        for dim, (lower, upper) in {"x": (x_min, x_max), "y": (y_min, y_max)}.items():
+            coords = data[dim].values
+            margin = EXTENT_MARGIN_CELLS * abs(float(coords[1] - coords[0]))
+            lower, upper = numpy.clip([lower, upper], coords.min(), coords.max())
+            if coords[0] <= coords[-1]:
+                slices[dim] = slice(lower - margin, upper + margin)
+            else:
+                slices[dim] = slice(upper + margin, lower - margin)
+
+        return data.sel(**slices)
+
     @abstractmethod
     def load_winddata(self):
         pass
@@ -97,16 +194,105 @@ class _WindData(ABC):
         pass
 
     @abstractmethod
+    def interp_points(
+        self,
+        xs: numpy.ndarray,
+        ys: numpy.ndarray,
+        levels: numpy.ndarray,
+        method: Optional[InterpolationMethod] = InterpolationMethod.LINEAR,
+        ) -> xarray.Dataset:
+        pass
+
     def agg_shape(
         self,
-        target_shapes: List[float],
+        target_shapes: Union[str, "geopandas.GeoDataFrame"],
         aggregation_method: Optional[AggregationMethod] = AggregationMethod.MEDIAN,
         interpolation_method: Optional[InterpolationMethod] = InterpolationMethod.LINEAR,
+        name_column: Optional[str] = None,
+        subsamples: Optional[int] = 4,
+        cache_dir: Optional[str] = None,
         ) -> xarray.Dataset:
-        pass
+        """Aggregates the wind data over regions like Bundeslaender, Gemeinden or offshore wind farms.
+
+        The shapes are rasterized to the grid of the data once with `regionMask.RegionMask` and
+        every variable is reduced with a single pass over its (lazy) data. With `cache_dir` the
+        rasterized regions are also reused across runs.
+
+        Args:
+            target_shapes (Union[str, geopandas.GeoDataFrame]): Polygons with a crs set, or the path of a
+                file readable by geopandas like `mastr/geoData/contis_offshorewindfarms.shp`.
+            aggregation_method (Optional[AggregationMethod], optional): MEAN is weighted by the covered
+                fraction of every grid cell, MEDIAN, MAX and MIN use all grid cells touched by a region.
+                Defaults to AggregationMethod.MEDIAN.
+            interpolation_method (Optional[InterpolationMethod], optional): Not used, the regions are
+                rasterized to the grid cells instead of interpolated. Defaults to InterpolationMethod.LINEAR.
+            name_column (Optional[str], optional): Column with the region names. Defaults to None, which
+                uses the index of `target_shapes`.
+            subsamples (Optional[int], optional): Sample points per grid cell and axis to estimate the covered
+                fractions. Defaults to 4.
+            cache_dir (Optional[str], optional): Directory to cache the rasterized regions in. Defaults to None.
+
+        Returns:
+            xarray.Dataset: Aggregated data with the dimension region instead of (y, x).
+        """
+        if isinstance(target_shapes, str):
+            import geopandas
+            target_shapes = geopandas.read_file(target_shapes)
+
+        target_shapes = target_shapes.to_crs(self._shape_crs)
+        names = target_shapes[name_column] if name_column else target_shapes.index
+
+        data_list = self.winddata if isinstance(self.winddata, list) else [self.winddata]
+
+        mask = RegionMask.from_geometries(
+            geometries=list(target_shapes.geometry),
+            x=data_list[0].x.values,
+            y=data_list[0].y.values,
+            names=list(names),
+            subsamples=subsamples,
+            cache_dir=cache_dir,
+            )
+
+        agg_data = [mask.apply(data, method=aggregation_method.value) for data in data_list]
+        if len(agg_data) == 1:
+            return agg_data[0]
+
+        return xarray.concat(agg_data, dim="time")
 
 
 class TsNcWindData(_WindData):
+    """Time series wind data of the anemos TSNC-Format.
+
+    Args:
+        wind_data_kind (WindDataKind): Kind of wind data to load.
+        time_frame (Optional[List[int]], optional): First and last year or date to load. Years and partial
+            dates like `"2009-03"` cover the whole period, `numpy.datetime64` values are exact. Only the
+            year files overlapping the time frame are opened and all of them have to exist, otherwise a
+            FileNotFoundError names the missing ones. Without a time frame all year files found are loaded.
+            Defaults to None.
+        _wind_data_path (Optional[str], optional): Root path of the anemos data. Defaults to None.
+        chunks (Optional[Dict], optional): dask chunks passed to xarray. Defaults to None.
+        mfdataset (Optional[bool], optional): Load all years as one dataset. Defaults to True.
+        parallel (Optional[bool], optional): Open the files of a mfdataset in parallel. Defaults to True.
+        extent (Optional[List[float]], optional): `[x_min, y_min, x_max, y_max]` in lambert coordinates to
+            crop the data to before any computation, e.g. from `WeaPoints.get_extent`. Defaults to None.
+        zarr_store_path (Optional[str], optional): Directory of the point-access Zarr stores of every year written by
+            `zarrStore.convert_tsnc_to_zarr`. If passed, the data is read from there instead of the
+            TSNC-Format files and handled like a mfdataset. Defaults to None.
+        processes (Optional[int], optional): Number of worker processes extracting points from the
+            year files if `mfdataset` is False. Defaults to None, which uses CPUTOUSE.
+        point_chunk (Optional[int], optional): Number of points extracted per worker task if
+            `mfdataset` is False. Defaults to None, which uses `parallelExtraction.DEFAULT_POINT_CHUNK`.
+        fast_reader (Optional[bool], optional): Extract points in `interp_points` with the low-level
+            `H5PointReader` instead of xarray. Only NEAREST and LINEAR interpolation are supported and
+            it is not used for a Zarr store. Defaults to False.
+        dtype (Optional[str], optional): Floating point type of the data variables and of the extracted
+            points, e.g. `"float32"` to halve memory and bandwidth of long series for many points. The
+            interpolation weights are still calculated in float64, only the values are stored in `dtype`.
+            float32 keeps about 7 significant digits, i.e. a rounding error below 1e-5 m/s for `wspd` and
+            1e-7 kg/m³ for `rho`, far below the 0.001 m/s and 0.0001 kg/m³ steps of the power curves.
+            Defaults to None, which keeps the type of the files.
+    """
 
     _xy_coord_path = r"./lambert_projection/xy_lamber_projection_values"
     _wind_data_type = WindDataType.TSNETCDF
@@ -120,70 +306,178 @@ class TsNcWindData(_WindData):
         chunks: Optional[Dict] = None,
         mfdataset: Optional[bool] = True,
         parallel: Optional[bool] = True,
+        extent: Optional[List[float]] = None,
+        zarr_store_path: Optional[str] = None,
+        processes: Optional[int] = None,
+        point_chunk: Optional[int] = None,
+        fast_reader: Optional[bool] = False,
+        dtype: Optional[str] = None,
         ):
 
         super().__init__( 
             _wind_data_path = _wind_data_path,
             _wind_data_type = self._wind_data_type,
+            extent = extent,
             )#_WindData, self
 
         self.time_frame = time_frame
         self.wind_data_kind = wind_data_kind
 
         self.chunks = chunks
-        self.mfdataset = mfdataset
+        self.mfdataset = mfdataset or bool(zarr_store_path)
         self.parallel = parallel
+        self.zarr_store_path = zarr_store_path
+        self.processes = processes
+        self.point_chunk = point_chunk
+        self.fast_reader = fast_reader and not zarr_store_path
+        self._h5_readers = {}
+        self.dtype = dtype
 
         self.winddata = self.load_winddata()
 
+    def _load_lambert_coor(
+            self,
+            xy_path: Optional[str] = None,
+            ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Returns the cached lambert grid coordinates, computed from the grid definition in `lambertGrid`
+        or read once from `xy_path` if passed.
+        """
+        return lambert_grid_coords(xy_path)
+
     def _assign_new_lambert_coor(
             self,
             xarray_data:xarray.Dataset,
             xy_path: Optional[str] = None,
             ):
 
-        if not xy_path:
-            xy_path = self._xy_coord_path
-
-        new_dim_coor = pandas.read_csv(xy_path)
         # assign the new x,y values to the netCDF data
-        x = new_dim_coor["x"].dropna().astype("int").values
-        y = new_dim_coor["y"].values
+        x, y = self._load_lambert_coor(xy_path)
 
         return xarray_data.assign_coords(
             coords={"x": x,"y": y}
             )
-        
+
+    def _apply_dtype(
+            self,
+            data: xarray.Dataset,
+            ) -> xarray.Dataset:
+        """Casts the data variables lazily to `dtype`, coordinates are left untouched.
+        """
+        if not self.dtype:
+            return data
+
+        return data.astype(self.dtype)
+
+    @staticmethod
+    def _date_bounds(date) -> Tuple[pandas.Timestamp, pandas.Timestamp]:
+        """Returns the first and last timestamp covered by a single `time_frame` entry.
+
+        Integer years and partial date strings cover the whole period they name, e.g. `2009`
+        covers the full year and `"2009-03"` all of March. `numpy.datetime64` values are exact.
+        """
+        if isinstance(date, (numpy.datetime64, pandas.Timestamp)):
+            date = pandas.Timestamp(date)
+            return date, date
+
+        period = pandas.Period(str(date))
+        return period.start_time, period.end_time
+
+    def _time_bounds(self) -> Tuple[pandas.Timestamp, pandas.Timestamp]:
+        """Returns the first and last timestamp of `time_frame`.
+        """
+        return self._date_bounds(self.time_frame[0])[0], self._date_bounds(self.time_frame[-1])[1]
+
+    def _year_file_paths(
+            self,
+            data_path: Optional[str] = None,
+            suffix: str = "ts.nc",
+            ) -> List[str]:
+        """Returns the paths of the year files overlapping `time_frame` or all year files if it is not set.
+
+        Args:
+            data_path (Optional[str], optional): Directory of the year files. Defaults to None, which uses `data_path`.
+            suffix (str, optional): Suffix of the year files, e.g. `"ts.zarr"` for the Zarr stores. Defaults to "ts.nc".
+
+        Raises:
+            FileNotFoundError: If year files inside `time_frame` are missing, naming all of them.
+        """
+        data_path = data_path or self.data_path
+
+        if not self.time_frame:
+            return sorted(glob(f"{data_path}{self.wind_data_kind.value}.10L.*.{suffix}"))
+
+        start, end = self._time_bounds()
+        paths = [
+            f"{data_path}{self.wind_data_kind.value}.10L.{year}.{suffix}"
+            for year in range(start.year, end.year+1, 1)
+            ]
+
+        # the Zarr stores are directories
+        missing = [path for path in paths if not os.path.exists(path)]
+        if missing:
+            raise FileNotFoundError(
+                f"{len(missing)} of the {len(paths)} year files of the time frame {self.time_frame} are missing: {', '.join(missing)}"
+                )
+
+        return paths
+
     def __load_winddata_ds(self) -> List[xarray.Dataset]:
-        """ToDo: 
-        - specify date to year for import and more specific date for .sel after concatenation
+        """Opens only the year files overlapping `time_frame` and slices each of them to the exact time frame.
 
         Returns:
-            List[xarray.Dataset]: [description]
+            List[xarray.Dataset]: Lazily opened data per year file.
         """
         data_list = []
-        for year in range(self.time_frame[0], self.time_frame[1]+1, 1):
-            path = f"{self.data_path}{self.wind_data_kind.value}.10L.{year}.ts.nc"
-            data = xarray.open_dataset(path, engine='h5netcdf', chunks=self.chunks)
+        self._year_paths = []
+        self._year_time_slices = []
+        for path in self._year_file_paths():
+            data = self._open_dataset(xarray.open_dataset, path, engine='h5netcdf', chunks=self.chunks)
+
+            # integer positions of the time frame, so the parallel extraction reads only these steps
+            time_slice = slice(None)
+            if self.time_frame:
+                time_slice = data.get_index("time").slice_indexer(*self._time_bounds())
+            data = data.isel(time=time_slice)
+
+            if data.time.size == 0:
+                continue
+
             data = self._assign_new_lambert_coor(data)
-            data_list.append(data)
+            data = self._crop_to_extent(data)
+            data_list.append(self._apply_dtype(data))
+            self._year_paths.append(path)
+            self._year_time_slices.append(time_slice)
 
         return data_list
 
     def __load_winddata_mfds(self) -> xarray.Dataset:
-        path = f"{self.data_path}{self.wind_data_kind.value}.10L.*.ts.nc"
-        data = xarray.open_mfdataset(path, engine='h5netcdf', chunks=self.chunks, parallel=self.parallel)
+        paths = self._year_file_paths()
+        data = self._open_dataset(xarray.open_mfdataset, paths, engine='h5netcdf', chunks=self.chunks, parallel=self.parallel)
 
         if self.time_frame:
-            start = str(self.time_frame[0])
-            end = str(self.time_frame[1])
-            data = data.sel(time=slice(start, end))
+            data = data.sel(time=slice(*self._time_bounds()))
 
         data = self._assign_new_lambert_coor(data)
+        data = self._crop_to_extent(data)
 
-        return data
+        self._year_paths = paths
+
+        return self._apply_dtype(data)
+
+    def __load_winddata_zarr(self) -> xarray.Dataset:
+        paths = self._year_file_paths(f"{self.zarr_store_path}/", "ts.zarr")
+        # the stores already carry the lambert x/y coordinates
+        data = self._open_dataset(xarray.open_mfdataset, paths, engine="zarr", chunks=self.chunks if self.chunks else {}, parallel=self.parallel)
+
+        if self.time_frame:
+            data = data.sel(time=slice(*self._time_bounds()))
+
+        return self._apply_dtype(self._crop_to_extent(data))
 
     def load_winddata(self):
+        if self.zarr_store_path:
+            return self.__load_winddata_zarr()
+
         if self.mfdataset:
             return self.__load_winddata_mfds()
 
@@ -217,53 +511,113 @@ class TsNcWindData(_WindData):
             return interp_data#.load()
         
         if not self.mfdataset:
+            interp_data = self.interp_points(
+                    xs=numpy.array([x]),
+                    ys=numpy.array([y]),
+                    levels=numpy.array([level]),
+                    method=InterpolationMethod(method))
 
-            global interp_year
-            def interp_year(data, x=x, y=y, level=level, method=method):
-                interp_data = data.interp(
-                        x=x[0],
-                        y=y[0],
-                        level=level[0],
-                        method=method).load()
-                #print(f"{data.nbytes}, {x[0]}, {y[0]}, {level[0]}, {method}")
-                return interp_data
-
-            #with concurrent.futures.ProcessPoolExecutor() as executor:
-            #    array = executor.map(interp_year(), self.winddata)
-            
-            with Pool(CPUTOUSE) as proc_pool:
-                array = proc_pool.map(interp_year, self.winddata)
-                proc_pool.close()
-                proc_pool.join()
-
-                ts_interp = xarray.concat(array, dim="time")
+            return interp_data.isel(point=0)
 
-            return ts_interp.load()
-
-    def agg_shape(
+    def interp_points(
         self,
-        target_shapes: List[float],
-        aggregation_method: Optional[AggregationMethod] = AggregationMethod.MEDIAN,
-        interpolation_method: Optional[InterpolationMethod] = InterpolationMethod.LINEAR,
+        xs: numpy.ndarray,
+        ys: numpy.ndarray,
+        levels: numpy.ndarray,
+        method: Optional[InterpolationMethod] = InterpolationMethod.LINEAR,
         ) -> xarray.Dataset:
-        pass
-        # https://gis.stackexchange.com/questions/357490/mask-xarray-dataset-using-a-shapefile
-        # https://gis.stackexchange.com/questions/354782/masking-netcdf-time-series-data-from-shapefile-using-python/354798#354798
-        # https://pypi.org/project/xagg/
+        """Interpolates the time series of many target points in one vectorized pass.
+
+        Unlike calling `interp_point` once per target, every chunk of the underlying files
+        is read once for the whole collection of targets. For NEAREST and LINEAR only the
+        levels bracketing the hub heights are read, see `pointInterpolation.interp_points`.
+
+        Args:
+            xs (numpy.ndarray): x coordinates of the targets in the anemos lambert projection.
+            ys (numpy.ndarray): y coordinates of the targets in the anemos lambert projection.
+            levels (numpy.ndarray): Hub heights of the targets.
+            method (Optional[InterpolationMethod], optional): Interpolation method. Defaults to InterpolationMethod.LINEAR.
+
+        Returns:
+            xarray.Dataset: Interpolated data with the dimensions (point, time), in `dtype` if set.
+        """
+        method=method.value
 
-        #MSWEP_monthly2 = xarray.open_dataarray()
-        #MSWEP_monthly2.rio.set_spatial_dims(x_dim="lon", y_dim="lat", inplace=True)
-        #MSWEP_monthly2.rio.write_crs("epsg:4326", inplace=True)
-        #Africa_Shape = geopandas.read_file('D:\G3P\DATA\Shapefile\Africa_SHP\Africa.shp', crs="epsg:4326")
-        # SHAPE COORDINATES NEED TO BE TRANSFORMED
+        if self.fast_reader:
+            interp_data = self.__interp_points_h5(xs, ys, levels, method=method)
 
-        #clipped = MSWEP_monthly2.rio.clip(Africa_Shape.geometry.apply(mapping), Africa_Shape.crs, drop=False)
+        elif self.mfdataset:
+            interp_data = pointInterpolation.interp_points(self.winddata, xs, ys, levels, method=method)
+
+        else:
+            # the year files are extracted by worker processes, which open the files themselves
+            grid_x, grid_y = self._load_lambert_coor()
+            values = extract_points(
+                paths=self._year_paths,
+                variable=self.wind_data_kind.value,
+                grid_x=grid_x,
+                grid_y=grid_y,
+                xs=xs,
+                ys=ys,
+                levels=levels,
+                method=method,
+                time_slices=self._year_time_slices,
+                time_sizes=[data.time.size for data in self.winddata],
+                processes=self.processes or CPUTOUSE,
+                point_chunk=self.point_chunk,
+                dtype=self.dtype or "float64",
+                )
+            interp_data = xarray.Dataset(
+                data_vars={self.wind_data_kind.value: (["point", "time"], values)},
+                coords={"time": numpy.concatenate([data.time.values for data in self.winddata])},
+                )
+
+        return self._apply_dtype(interp_data).transpose("point", ...)
+
+    def __interp_points_h5(
+        self,
+        xs: numpy.ndarray,
+        ys: numpy.ndarray,
+        levels: numpy.ndarray,
+        method: str,
+        ) -> xarray.Dataset:
+        """Extracts points year file by year file with the low-level H5PointReader.
+        """
+        # the reader works on the uncropped files
+        grid_x, grid_y = self._load_lambert_coor()
+
+        values = []
+        times = []
+        for path in self._year_paths:
+            if path not in self._h5_readers:
+                h5file = self._open_dataset(h5netcdf.File, path, mode="r")
+                self._h5_readers[path] = H5PointReader(h5file, self.wind_data_kind.value, grid_x, grid_y)
+            reader = self._h5_readers[path]
+
+            # only the time steps inside the time frame are read
+            time = reader.read_time()
+            time_slice = slice(None)
+            if self.time_frame:
+                time_slice = pandas.Index(time).slice_indexer(*self._time_bounds())
+
+            values.append(reader.read_points(xs, ys, levels, method=method, time_slice=time_slice, dtype=self.dtype or "float64"))
+            times.append(time[time_slice])
+
+        values = numpy.concatenate(values, axis=1)
+        times = numpy.concatenate(times)
+
+        return xarray.Dataset(
+            data_vars={self.wind_data_kind.value: (["point", "time"], values)},
+            coords={"time": times},
+            )
 
 
 class Mean90mWindData(_WindData):
 
     _xy_coord_path = r"./lambert_projection/xy_lamber_projection_values"
     _wind_data_type = WindDataType.MEAN90M
+    # the 3arcsecs data uses lon/lat as x/y
+    _shape_crs = "EPSG:4326"
     winddata = None
 
     def __init__(
@@ -274,11 +628,13 @@ class Mean90mWindData(_WindData):
         chunks: Optional[Dict] = None,
         mfdataset: Optional[bool] = False,
         parallel: Optional[bool] = True,
+        extent: Optional[List[float]] = None,
         ):
 
         super().__init__( 
             _wind_data_path = _wind_data_path,
             _wind_data_type = self._wind_data_type,
+            extent = extent,
             )#_WindData, self
 
         #self.time_frame = time_frame
@@ -293,19 +649,19 @@ class Mean90mWindData(_WindData):
 
     def __load_winddata_mfds(self) -> xarray.Dataset:
         path = f"{self.data_path}D-3km.E5.3arcsecs.{self.wind_data_kind.value}*.nc"
-        data = xarray.open_mfdataset(path, engine='h5netcdf', chunks=self.chunks, parallel=self.parallel)
+        data = self._open_dataset(xarray.open_mfdataset, path, engine='h5netcdf', chunks=self.chunks, parallel=self.parallel)
 
         #data = self._assign_new_lambert_coor(data)
 
-        return data
+        return self._crop_to_extent(data)
 
     def __load_winddata_ds(self) -> xarray.Dataset:
         path = f"{self.data_path}D-3km.E5.3arcsecs.{self.wind_data_kind.value}.2009-2018.nc"
-        data = xarray.open_dataset(path, engine='h5netcdf')
+        data = self._open_dataset(xarray.open_dataset, path, engine='h5netcdf', chunks=self.chunks)
 
         #data = self._assign_new_lambert_coor(data)
 
-        return data
+        return self._crop_to_extent(data)
 
     def load_winddata(self) -> xarray.Dataset:
         if self.mfdataset:
@@ -324,38 +680,67 @@ class Mean90mWindData(_WindData):
         method: Optional[InterpolationMethod] = InterpolationMethod.LINEAR,
         ) -> xarray.Dataset:
 
-        x=target_coord[1],
-        y=target_coord[0],
-        level=target_level,
-        method=method.value
+        # the 3arcsecs data uses lon/lat as x/y, so the target is passed as [lat, lon]
+        return self.interp_points(
+            xs=numpy.array([target_coord[1]]),
+            ys=numpy.array([target_coord[0]]),
+            levels=numpy.array([target_level]),
+            method=method,
+            ).isel(point=0)
 
-        if not self.mfdataset:
-            interp_data =  self.winddata.interp(
-                    x=x[0],
-                    y=y[0],
-                    level=level[0],
-                    method=method)#.interp(
-                    #level=level[0],
-                    #method=method)
+    def interp_points(
+        self,
+        xs: numpy.ndarray,
+        ys: numpy.ndarray,
+        levels: numpy.ndarray,
+        method: Optional[InterpolationMethod] = InterpolationMethod.LINEAR,
+        ) -> xarray.Dataset:
+        """Interpolates the statistics of many target points in one vectorized pass.
 
-            return interp_data#.load()
-        
+        The 3arcsecs grid is a regular lon/lat grid, so for NEAREST and LINEAR the cell offsets and
+        bilinear weights of all targets are calculated arithmetically and only their 2 x 2
+        neighbourhoods are read, see `pointInterpolation.interp_points_regular`. Opened with
+        `chunks={}`, only the file chunks containing a target are read for fleets spread over the grid.
+
+        Args:
+            xs (numpy.ndarray): Longitudes of the targets.
+            ys (numpy.ndarray): Latitudes of the targets.
+            levels (numpy.ndarray): Hub heights of the targets.
+            method (Optional[InterpolationMethod], optional): Interpolation method. Defaults to InterpolationMethod.LINEAR.
+
+        Returns:
+            xarray.Dataset: Interpolated data with the dimension point.
+        """
         if self.mfdataset:
             raise NotImplementedError()
 
-    def agg_shape(
-    self,
-    target_shapes: List[float],
-    aggregation_method: Optional[AggregationMethod] = AggregationMethod.MEDIAN,
-    interpolation_method: Optional[InterpolationMethod] = InterpolationMethod.LINEAR,
-    ) -> xarray.Dataset:
-        pass
+        regular = all(pointInterpolation.is_regular_axis(self.winddata[dim].values) for dim in ("x", "y"))
+        if regular and method.value in pointInterpolation.BRACKETING_METHODS:
+            return pointInterpolation.interp_points_regular(self.winddata, xs, ys, levels, method=method.value)
+
+        return pointInterpolation.interp_points(self.winddata, xs, ys, levels, method=method.value)
 
 
 class Mean3km10aWindData(_WindData):
+    """Long term means of the anemos statistics on the 3 km lambert grid.
+
+    Args:
+        wind_data_kind (WindDataKind): Kind of wind data to load.
+        _wind_data_path (Optional[str], optional): Root path of the anemos data. Defaults to None.
+        chunks (Optional[Dict], optional): dask chunks passed to xarray. Defaults to None.
+        mfdataset (Optional[bool], optional): Load the data as mfdataset. Defaults to False.
+        parallel (Optional[bool], optional): Open the files of a mfdataset in parallel. Defaults to True.
+        level (Optional[int], optional): Level of the `dirhistos` data. Defaults to None.
+        extent (Optional[List[float]], optional): `[x_min, y_min, x_max, y_max]` in lambert coordinates to
+            crop the data to before any computation. Defaults to None.
+        period (Optional[str], optional): Period label of the files to load. Besides the anemos 2009-2018
+            means, this loads parameter grids of custom periods, e.g. written by `weibullFit.write_weibull_parameters`.
+            Defaults to "2009-2018".
+    """
 
     _xy_coord_path = r"./lambert_projection/xy_lamber_projection_values"
     _wind_data_type = WindDataType.MEAN3KM10A
+    _file_pattern = "{kind}.10L.ltm.{period}.nc"
     winddata = None
 
     def __init__(
@@ -367,43 +752,48 @@ class Mean3km10aWindData(_WindData):
         mfdataset: Optional[bool] = False,
         parallel: Optional[bool] = True,
         level: Optional[int] = None,
+        extent: Optional[List[float]] = None,
+        period: Optional[str] = "2009-2018",
         ):
 
         super().__init__( 
             _wind_data_path = _wind_data_path,
             _wind_data_type = self._wind_data_type,
+            extent = extent,
             )#_WindData, self
 
         #self.time_frame = time_frame
         self.wind_data_kind = wind_data_kind
+        self.period = period
 
         self.chunks = chunks
         self.mfdataset = mfdataset
         self.parallel = parallel
 
         if wind_data_kind is WindDataKind.DIRHISTOS:
-            path = f"{self.data_path}{self.wind_data_kind.value}.{str(level)}m.2009-2018.nc"
-            self.winddata = xarray.open_dataset(path, engine='h5netcdf')
+            path = f"{self.data_path}{self.wind_data_kind.value}.{str(level)}m.{self.period}.nc"
+            self.winddata = self._open_dataset(xarray.open_dataset, path, engine='h5netcdf')
+            self.winddata = self._crop_to_extent(self.winddata)
             
         else:
             self.winddata = self.load_winddata()
 
 
     def __load_winddata_mfds(self) -> xarray.Dataset:
-        path = f"{self.data_path}{self.wind_data_kind.value}.10L.ltm.2009-2018.nc"
-        data = xarray.open_mfdataset(path, engine='h5netcdf', chunks=self.chunks, parallel=self.parallel)
+        path = self.data_path + self._file_pattern.format(kind=self.wind_data_kind.value, period=self.period)
+        data = self._open_dataset(xarray.open_mfdataset, path, engine='h5netcdf', chunks=self.chunks, parallel=self.parallel)
 
         #data = self._assign_new_lambert_coor(data)
 
-        return data
+        return self._crop_to_extent(data)
 
     def __load_winddata_ds(self) -> xarray.Dataset:
-        path = f"{self.data_path}{self.wind_data_kind.value}.10L.ltm.2009-2018.nc"
-        data = xarray.open_dataset(path, engine='h5netcdf')
+        path = self.data_path + self._file_pattern.format(kind=self.wind_data_kind.value, period=self.period)
+        data = self._open_dataset(xarray.open_dataset, path, engine='h5netcdf')
 
         #data = self._assign_new_lambert_coor(data)
 
-        return data
+        return self._crop_to_extent(data)
 
     def load_winddata(self) -> xarray.Dataset:
         if self.mfdataset:
@@ -441,10 +831,339 @@ class Mean3km10aWindData(_WindData):
         if self.mfdataset:
             raise NotImplementedError()
 
-    def agg_shape(
-    self,
-    target_shapes: List[float],
-    aggregation_method: Optional[AggregationMethod] = AggregationMethod.MEDIAN,
-    interpolation_method: Optional[InterpolationMethod] = InterpolationMethod.LINEAR,
-    ) -> xarray.Dataset:
-        pass
\ No newline at end of file
+    def interp_points(
+        self,
+        xs: numpy.ndarray,
+        ys: numpy.ndarray,
+        levels: numpy.ndarray,
+        method: Optional[InterpolationMethod] = InterpolationMethod.LINEAR,
+        ) -> xarray.Dataset:
+        """Interpolates the statistics of many target points in one vectorized pass.
+
+        Args:
+            xs (numpy.ndarray): x coordinates of the targets in the anemos lambert projection.
+            ys (numpy.ndarray): y coordinates of the targets in the anemos lambert projection.
+            levels (numpy.ndarray): Hub heights of the targets. Ignored for data without levels like `dirhistos`.
+            method (Optional[InterpolationMethod], optional): Interpolation method. Defaults to InterpolationMethod.LINEAR.
+
+        Returns:
+            xarray.Dataset: Interpolated data with the dimension point.
+        """
+        if self.mfdataset:
+            raise NotImplementedError()
+
+        return pointInterpolation.interp_points(self.winddata, xs, ys, levels, method=method.value)
+
+
+class Mean3km1aWindData(_WindData):
+    """Annual means of the anemos statistics on the 3 km lambert grid.
+
+    One file per variable and year is read, named like `_file_pattern`, e.g. written by
+    `windStatistics.write_tsnc_statistics`. The years are stacked along the dimension `year`.
+
+    Args:
+        wind_data_kind (WindDataKind): Kind of wind data to load.
+        years (Optional[List[int]], optional): Years to load. Defaults to None, which loads all years found.
+        _wind_data_path (Optional[str], optional): Root path of the anemos data. Defaults to None.
+        chunks (Optional[Dict], optional): dask chunks passed to xarray. Defaults to None.
+        extent (Optional[List[float]], optional): `[x_min, y_min, x_max, y_max]` in lambert coordinates to
+            crop the data to before any computation. Defaults to None.
+    """
+
+    _wind_data_type = WindDataType.MEAN3KM1A
+    _file_pattern = "{kind}.10L.ym.{year}.nc"
+    winddata = None
+
+    def __init__(
+        self,
+        wind_data_kind: WindDataKind,
+        years: Optional[List[int]] = None,
+        _wind_data_path: Optional[str] = None,
+        chunks: Optional[Dict] = None,
+        extent: Optional[List[float]] = None,
+        ):
+
+        super().__init__( 
+            _wind_data_path = _wind_data_path,
+            _wind_data_type = self._wind_data_type,
+            extent = extent,
+            )
+
+        self.wind_data_kind = wind_data_kind
+        self.years = years
+        self.chunks = chunks
+
+        self.winddata = self.load_winddata()
+
+    def _year_file_paths(self) -> Dict[int, str]:
+        """Returns the paths of the annual files of `years`, or of all annual files found, keyed by year.
+
+        Raises:
+            FileNotFoundError: If annual files of `years` are missing, naming all of them, or if no annual
+                file matches the file pattern at all, naming the pattern.
+        """
+        if self.years:
+            paths = {
+                int(year): self.data_path + self._file_pattern.format(kind=self.wind_data_kind.value, year=year)
+                for year in self.years
+                }
+
+            missing = [path for path in paths.values() if not os.path.exists(path)]
+            if missing:
+                raise FileNotFoundError(
+                    f"{len(missing)} of the {len(paths)} annual files of the years {self.years} are missing: {', '.join(missing)}"
+                    )
+
+            return paths
+
+        pattern = self.data_path + self._file_pattern.format(kind=self.wind_data_kind.value, year="*")
+        prefix, suffix = pattern.split("*")
+
+        paths = {int(path[len(prefix):-len(suffix)]): path for path in sorted(glob(pattern))}
+        if not paths:
+            raise FileNotFoundError(f"No annual files of '{self.wind_data_kind.value}' match {pattern}")
+
+        return paths
+
+    def load_winddata(self) -> xarray.Dataset:
+        paths = self._year_file_paths()
+
+        data_list = []
+        for path in paths.values():
+            data = self._open_dataset(xarray.open_dataset, path, engine='h5netcdf', chunks=self.chunks)
+            data_list.append(self._crop_to_extent(data))
+
+        return xarray.concat(data_list, dim=pandas.Index(list(paths), name="year"))
+
+    def get_winddata(self):
+        return self.winddata
+
+    def interp_point(
+        self,
+        target_coord: List[float],
+        target_level,
+        method: Optional[InterpolationMethod] = InterpolationMethod.LINEAR,
+        ) -> xarray.Dataset:
+
+        return self.interp_points(
+            xs=numpy.array([target_coord[0]]),
+            ys=numpy.array([target_coord[1]]),
+            levels=numpy.array([target_level]),
+            method=method,
+            ).isel(point=0)
+
+    def interp_points(
+        self,
+        xs: numpy.ndarray,
+        ys: numpy.ndarray,
+        levels: numpy.ndarray,
+        method: Optional[InterpolationMethod] = InterpolationMethod.LINEAR,
+        ) -> xarray.Dataset:
+        """Interpolates the annual statistics of many target points in one vectorized pass.
+
+        Args:
+            xs (numpy.ndarray): x coordinates of the targets in the anemos lambert projection.
+            ys (numpy.ndarray): y coordinates of the targets in the anemos lambert projection.
+            levels (numpy.ndarray): Hub heights of the targets.
+            method (Optional[InterpolationMethod], optional): Interpolation method. Defaults to InterpolationMethod.LINEAR.
+
+        Returns:
+            xarray.Dataset: Interpolated data with the dimensions (point, year).
+        """
+        return pointInterpolation.interp_points(self.winddata, xs, ys, levels, method=method.value)
+
+
+class DerivedAirDensity(_WindData):
+    """Air density time series derived on the fly from pressure, relative humidity and temperature.
+
+    Replaces the `WindDataKind.AIRDENSITY` files of the TSNC-Format. The three inputs are merged
+    lazily, so `interp_points` extracts them in a single pass over the files, and the density is
+    only calculated for the extracted points, see `airDensity.air_density`. Extracted series are
+    kept in the process wide `DERIVED_SERIES_CACHE`, keyed by the input files, the time frame, the
+    targets and the interpolation method, so reusing them, e.g. for several turbine types, costs
+    no further read.
+
+    Other thermodynamic inputs, e.g. of a scenario, are passed as `sources`. They must provide
+    a single dataset on the same grid as `winddata`, like a TsNcWindData with `mfdataset`. Their
+    cached series are keyed by `cache_token`, or without one by a token unique to each source object,
+    so two in-memory scenarios never share series.
+
+    Args:
+        time_frame (Optional[List[int]], optional): First and last year or date, like for `TsNcWindData`. Defaults to None.
+        _wind_data_path (Optional[str], optional): Root path of the anemos data. Defaults to None.
+        chunks (Optional[Dict], optional): dask chunks passed to xarray. Defaults to None.
+        extent (Optional[List[float]], optional): `[x_min, y_min, x_max, y_max]` in lambert coordinates to
+            crop the inputs to before any computation. Defaults to None.
+        dtype (Optional[str], optional): Floating point type of the derived density, see `TsNcWindData`.
+            The density itself is always calculated in float64. Defaults to None.
+        sources (Optional[Dict[WindDataKind, _WindData]], optional): Inputs replacing the TSNC-Format
+            files, keyed by AIRPRESSURE, RELATIVEAIRHUMIDITY and TEMPERATURE. Defaults to None.
+        cache (Optional[bool], optional): Keep and reuse extracted series. Defaults to True.
+        cache_token (Optional[Hashable], optional): Identifies the data of the passed `sources` in the cache,
+            e.g. a scenario name, so instances with equal sources share their series. Defaults to None.
+    """
+
+    _wind_data_type = WindDataType.TSNETCDF
+    _input_kinds = (WindDataKind.AIRPRESSURE, WindDataKind.RELATIVEAIRHUMIDITY, WindDataKind.TEMPERATURE)
+    wind_data_kind = WindDataKind.AIRDENSITY
+    winddata = None
+
+    def __init__(
+        self,
+        time_frame: Optional[List[int]] = None,
+        _wind_data_path: Optional[str] = None,
+        chunks: Optional[Dict] = None,
+        extent: Optional[List[float]] = None,
+        dtype: Optional[str] = None,
+        sources: Optional[Dict[WindDataKind, _WindData]] = None,
+        cache: Optional[bool] = True,
+        cache_token: Optional[Hashable] = None,
+        ):
+
+        super().__init__( 
+            _wind_data_path = _wind_data_path,
+            _wind_data_type = self._wind_data_type,
+            extent = extent,
+            )
+
+        self.time_frame = time_frame
+        self.chunks = chunks
+        self.dtype = dtype
+        self.cache = cache
+        self.cache_token = cache_token
+
+        # the passed sources may hold in-memory data, which is not identified by its files
+        self._passed_kinds = set(sources or {})
+        self.sources = dict(sources or {})
+        for kind in self._input_kinds:
+            if kind not in self.sources:
+                self.sources[kind] = TsNcWindData(
+                    wind_data_kind=kind,
+                    time_frame=time_frame,
+                    _wind_data_path=_wind_data_path,
+                    chunks=chunks,
+                    extent=extent,
+                    )
+
+        self.inputs = self.load_inputs()
+        self.winddata = self.load_winddata()
+
+    def load_inputs(self) -> xarray.Dataset:
+        """Merges the inputs lazily into one dataset, converted to Pa, a humidity fraction and K.
+        """
+        inputs = [to_si_units(self.sources[kind].winddata[kind.value]) for kind in self._input_kinds]
+
+        return xarray.merge(inputs, join="exact", combine_attrs="drop")
+
+    def load_winddata(self) -> xarray.Dataset:
+        """Returns the lazily derived density of the whole grid, calculated only when accessed.
+        """
+        rho = air_density(*[self.inputs[kind.value] for kind in self._input_kinds])
+
+        return self.__as_dataset(rho)
+
+    def get_winddata(self):
+        return self.winddata
+
+    def close(self):
+        for source in self.sources.values():
+            source.close()
+        super().close()
+
+    def __as_dataset(
+        self,
+        rho: xarray.DataArray,
+        ) -> xarray.Dataset:
+        data = rho.rename(self.wind_data_kind.value).to_dataset()
+        data[self.wind_data_kind.value].attrs = {"long_name": "air density", "units": "kg/m3"}
+
+        if self.dtype:
+            data = data.astype(self.dtype)
+
+        return data
+
+    def _cache_key(
+        self,
+        xs: numpy.ndarray,
+        ys: numpy.ndarray,
+        levels: numpy.ndarray,
+        method: InterpolationMethod,
+        ) -> Tuple:
+        sources = tuple(
+            (
+                kind.value,
+                type(source).__name__,
+                str(getattr(source, "zarr_store_path", None) or getattr(source, "data_path", None)),
+                tuple(getattr(source, "_year_paths", ())),
+                str(getattr(source, "time_frame", None)),
+                str(getattr(source, "extent", None)),
+                self._source_token(source) if kind in self._passed_kinds else None,
+            )
+            for kind, source in self.sources.items()
+            )
+        targets = tuple(numpy.asarray(values, dtype="float64").tobytes() for values in (xs, ys, levels))
+
+        return sources + targets + (method.value, str(self.dtype))
+
+    def _source_token(
+        self,
+        source: _WindData,
+        ) -> Hashable:
+        if self.cache_token is not None:
+            return self.cache_token
+        if source not in _SOURCE_TOKENS:
+            _SOURCE_TOKENS[source] = next(_source_token_count)
+
+        return _SOURCE_TOKENS[source]
+
+    def interp_point(
+        self,
+        target_coord: List[float],
+        target_level,
+        method: Optional[InterpolationMethod] = InterpolationMethod.LINEAR,
+        ) -> xarray.Dataset:
+
+        return self.interp_points(
+            xs=numpy.array([target_coord[0]]),
+            ys=numpy.array([target_coord[1]]),
+            levels=numpy.array([target_level]),
+            method=method,
+            ).isel(point=0)
+
+    def interp_points(
+        self,
+        xs: numpy.ndarray,
+        ys: numpy.ndarray,
+        levels: numpy.ndarray,
+        method: Optional[InterpolationMethod] = InterpolationMethod.LINEAR,
+        ) -> xarray.Dataset:
+        """Extracts the three inputs of many target points in one pass and derives their density.
+
+        The inputs are interpolated, not the density, so the result equals the density of the
+        interpolated pressure, humidity and temperature.
+
+        Args:
+            xs (numpy.ndarray): x coordinates of the targets in the anemos lambert projection.
+            ys (numpy.ndarray): y coordinates of the targets in the anemos lambert projection.
+            levels (numpy.ndarray): Hub heights of the targets.
+            method (Optional[InterpolationMethod], optional): Interpolation method. Defaults to InterpolationMethod.LINEAR.
+
+        Returns:
+            xarray.Dataset: Loaded density with the dimensions (point, time), in `dtype` if set.
+        """
+        key = self._cache_key(xs, ys, levels, method)
+        if self.cache:
+            cached = DERIVED_SERIES_CACHE.get(key)
+            if cached is not None:
+                # copies, so callers modifying their series never change the cached one
+                return cached.copy(deep=True)
+
+        inputs = pointInterpolation.interp_points(self.inputs, xs, ys, levels, method=method.value)
+        inputs = inputs.load().astype("float64")
+        rho = air_density(*[inputs[kind.value] for kind in self._input_kinds])
+
+        interp_data = self.__as_dataset(rho).transpose("point", ...)
+        if self.cache:
+            DERIVED_SERIES_CACHE.put(key, interp_data.copy(deep=True))
+
+        return interp_data
@@ -0,0 +1,215 @@
+import argparse
+import contextlib
+import io
+import time
+
+from typing import (
+                Callable,
+                Iterator,
+                List,
+                Optional,
+                Sequence,
+                Tuple,
+                )
+
+import numpy
+import pandas
+
+from anemosData import (
+                _WindData,
+                WindDataKind,
+                TsNcWindData,
+                Mean90mWindData,
+                Mean3km10aWindData,
+                )
+from datasetPool import DATASET_POOL
+from lambertGrid import geo_to_lambert
+from syntheticData import (
+                MEAN90M_EXTENT,
+                POWER_CURVE_TYPES,
+                write_synthetic_anemos_data,
+                )
+from weaPoints import (
+                WeaPoints,
+                WindDataType,
+                CalculationMethod,
+                )
+
+BENCHMARK_FLEET_SIZES = (10, 100, 1000)
+# number of years of the TSNC-Format time frames, starting with BENCHMARK_FIRST_YEAR
+BENCHMARK_TIME_SPANS = (1,)
+BENCHMARK_FIRST_YEAR = 2009
+# hub heights of the random fleets, inside of the levels of all datasets
+FLEET_HUB_HEIGHTS = (60, 200)
+
+
+@contextlib.contextmanager
+def data_root(
+    root: str,
+    ) -> Iterator[None]:
+    """Points all wind data classes and the power curves of `WeaPoints` to a data root, e.g. of `syntheticData`.
+    """
+    wind_data_path = _WindData._wind_data_path
+    power_curves_path = WeaPoints._power_curves_path
+
+    _WindData._wind_data_path = root
+    WeaPoints._power_curves_path = f"{root}/powercurves/single_netcdfs/wea_*.nc"
+    try:
+        yield
+    finally:
+        _WindData._wind_data_path = wind_data_path
+        WeaPoints._power_curves_path = power_curves_path
+
+
+def random_fleet(
+    size: int,
+    extent: List[float] = MEAN90M_EXTENT,
+    wea_types: Sequence[str] = tuple(POWER_CURVE_TYPES),
+    seed: int = 0,
+    ) -> Tuple[List[List[float]], List[float], List[str]]:
+    """Draws turbines inside of `extent`, so they lie on the 3arcsecs grid of the synthetic data as well.
+
+    Returns:
+        Tuple[List[List[float]], List[float], List[str]]: `[lat, lon]` coordinates, hub heights and turbine types.
+    """
+    rng = numpy.random.default_rng(seed)
+    lon_min, lat_min, lon_max, lat_max = extent
+
+    lat_lon = numpy.column_stack([rng.uniform(lat_min, lat_max, size), rng.uniform(lon_min, lon_max, size)])
+    levels = rng.uniform(*FLEET_HUB_HEIGHTS, size)
+    types = rng.choice(list(wea_types), size)
+
+    return lat_lon.tolist(), levels.tolist(), types.tolist()
+
+
+def _time_frame(
+    years: int,
+    ) -> List[numpy.datetime64]:
+    last = BENCHMARK_FIRST_YEAR + years - 1
+    return [numpy.datetime64(f"{BENCHMARK_FIRST_YEAR}-01-01T00:00"), numpy.datetime64(f"{last}-12-31T23:50")]
+
+
+def _cases(
+    fleet_size: int,
+    time_spans: Sequence[int],
+    seed: int = 0,
+    ) -> Iterator[Tuple[str, Optional[int], Callable]]:
+    """Yields the name, the time span and the function of every benchmark case of one fleet.
+    """
+    lat_lon, levels, types = random_fleet(fleet_size, seed=seed)
+    lats, lons = numpy.array(lat_lon).T
+    levels = numpy.array(levels)
+
+    xs, ys = geo_to_lambert(lats, lons)
+
+    # the points of a WeaPoints instance are transformed on creation, which is not part of the timings
+    points = WeaPoints(lat_lon, levels.tolist(), types)
+
+    for years in time_spans:
+        time_frame = [BENCHMARK_FIRST_YEAR, BENCHMARK_FIRST_YEAR + years - 1]
+
+        yield "TsNcWindData.interp_points", years, lambda: TsNcWindData(
+            WindDataKind.WINDSPEED, time_frame=time_frame,
+            ).interp_points(xs, ys, levels).load()
+
+        yield "TsNcWindData.interp_points fast_reader", years, lambda: TsNcWindData(
+            WindDataKind.WINDSPEED, time_frame=time_frame, fast_reader=True,
+            ).interp_points(xs, ys, levels).load()
+
+        yield "WeaPoints.get_windpower_out TSNETCDF", years, lambda: points.get_windpower_out(
+            WindDataType.TSNETCDF, time_frame=_time_frame(years),
+            )
+
+    yield "Mean90mWindData.interp_points", None, lambda: Mean90mWindData(
+        WindDataKind.WEIBULLA,
+        ).interp_points(lons, lats, levels).load()
+
+    yield "Mean3km10aWindData.interp_points", None, lambda: Mean3km10aWindData(
+        WindDataKind.WEIBULLA,
+        ).interp_points(xs, ys, levels).load()
+
+    yield "WeaPoints.get_windpower_out MEAN90M", None, lambda: points.get_windpower_out(
+        WindDataType.MEAN90M, calculation_method=CalculationMethod.WEIBULL,
+        )
+
+    yield "WeaPoints.get_windpower_out MEAN3KM10A", None, lambda: points.get_windpower_out(
+        WindDataType.MEAN3KM10A, calculation_method=CalculationMethod.WEIBULL,
+        )
+
+
+def run_benchmarks(
+    root: str,
+    fleet_sizes: Sequence[int] = BENCHMARK_FLEET_SIZES,
+    time_spans: Sequence[int] = BENCHMARK_TIME_SPANS,
+    repeats: int = 3,
+    seed: int = 0,
+    ) -> pandas.DataFrame:
+    """Times the extraction of the wind data classes and the power output of `WeaPoints` on a data root.
+
+    Every case runs `repeats` times. The first run opens the files, the later runs reuse the
+    datasets of the DATASET_POOL and the operating system's file cache, so `first` is the cold
+    and `best` the warm time. The progress output of `WeaPoints` is suppressed.
+
+    Args:
+        root (str): Data root, e.g. written by `syntheticData.write_synthetic_anemos_data`.
+        fleet_sizes (Sequence[int], optional): Numbers of turbines. Defaults to BENCHMARK_FLEET_SIZES.
+        time_spans (Sequence[int], optional): Years of the TSNC-Format cases. Defaults to BENCHMARK_TIME_SPANS.
+        repeats (int, optional): Runs per case. Defaults to 3.
+        seed (int, optional): Seed of the random fleets. Defaults to 0.
+
+    Returns:
+        pandas.DataFrame: The columns `case`, `fleet_size`, `years`, `first` and `best` in seconds.
+    """
+    results = []
+    with data_root(root):
+        for fleet_size in fleet_sizes:
+            for case, years, function in _cases(fleet_size, time_spans, seed=seed):
+                DATASET_POOL.clear()
+
+                timings = []
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        function()
+                    timings.append(time.perf_counter() - start)
+
+                results.append({
+                    "case": case,
+                    "fleet_size": fleet_size,
+                    "years": years,
+                    "first": timings[0],
+                    "best": min(timings),
+                    })
+
+    return pandas.DataFrame(results).astype({"years": "Int64"})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the anemos wind data extraction and power output.")
+    parser.add_argument("root", help="data root, written first with --generate")
+    parser.add_argument("--generate", action="store_true", help="write synthetic data to the root before")
+    parser.add_argument("--years", type=int, default=max(BENCHMARK_TIME_SPANS), help="years of synthetic data to write")
+    parser.add_argument("--steps-per-year", type=int, default=None, help="10 min time steps per synthetic year, 0 for full years")
+    parser.add_argument("--fleet-sizes", nargs="+", type=int, default=list(BENCHMARK_FLEET_SIZES), help="numbers of turbines")
+    parser.add_argument("--time-spans", nargs="+", type=int, default=list(BENCHMARK_TIME_SPANS), help="years of the TSNC-Format cases")
+    parser.add_argument("--repeats", type=int, default=3, help="runs per case")
+    parser.add_argument("--output", default=None, help="csv file to write the timings to")
+    args = parser.parse_args()
+
+    if args.generate:
+        generate_kwargs = {}
+        if args.steps_per_year is not None:
+            generate_kwargs["steps_per_year"] = args.steps_per_year or None
+        years = range(BENCHMARK_FIRST_YEAR, BENCHMARK_FIRST_YEAR + max(args.years, max(args.time_spans)))
+        write_synthetic_anemos_data(args.root, years=years, **generate_kwargs)
+
+    timings = run_benchmarks(
+        root=args.root,
+        fleet_sizes=args.fleet_sizes,
+        time_spans=args.time_spans,
+        repeats=args.repeats,
+        )
+    print(timings.to_string(index=False))
+
+    if args.output:
+        timings.to_csv(args.output, index=False)
@@ -6,6 +6,7 @@ import numpy
 import xarray
 
 from weaPoints import WeaPoints
+from energyProduction import annual_energy_production
 
 
 class PowerCalculationMethod(Enum):
@@ -99,17 +100,8 @@ class Get_power_weibull():
         return 1 - numpy.exp(-(numpy.pi/4)*(v_i/v_mean)**2)
 
     def aep(self, F:numpy.array, P:numpy.array, s:float=0.85) -> float:
-        AEP_list = list()
-        for i, _ in enumerate(F):
-            if i == 0:
-                AEP_i = 8760 * F[i] * P[i]
-
-            else:
-                AEP_i = 8760 * (F[i] - F[i-1]) * ((P[i] + P[i-1])/2)
-            
-            AEP_list.append(AEP_i)
-
-        return sum(AEP_list) * s
+        # F and P may also be 2D with the shape (wspd, points), see energyProduction.annual_energy_production
+        return annual_energy_production(F=F, P=P, s=s)
 
     
     def weibull_aep(self, lkl:xarray.DataArray, A:float, k:float, rho:float, s:float=0.85) -> float:
@@ -0,0 +1,128 @@
+from collections import OrderedDict
+from threading import RLock
+
+from typing import (
+                Callable,
+                Dict,
+                Hashable,
+                List,
+                Tuple,
+                )
+
+import xarray
+
+MAX_OPEN_DATASETS = 64
+
+
+def _freeze(value) -> Hashable:
+    """Turns nested open options like `chunks` dicts into a hashable key part.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class DatasetPool():
+    """A bounded LRU pool of open xarray datasets, shared across all `_WindData` instances of a process.
+
+    Datasets are keyed by the open function, the path and the open options. Acquiring an already
+    open dataset only increases its reference count. Once more than `max_size` datasets are open,
+    the least recently used datasets without references are closed. Referenced datasets are never
+    closed, so the pool may exceed `max_size` while more datasets than that are in use.
+
+    Args:
+        max_size (int, optional): Number of open datasets to keep. Defaults to MAX_OPEN_DATASETS.
+    """
+
+    def __init__(
+        self,
+        max_size: int = MAX_OPEN_DATASETS,
+        ):
+
+        self.max_size = max_size
+        self._datasets: Dict[Hashable, xarray.Dataset] = OrderedDict()
+        self._references: Dict[Hashable, int] = {}
+        self._lock = RLock()
+
+    def __len__(self) -> int:
+        return len(self._datasets)
+
+    @staticmethod
+    def build_key(
+        opener: Callable,
+        path: str,
+        **open_kwargs,
+        ) -> Hashable:
+        return (f"{opener.__module__}.{opener.__qualname__}", str(path), _freeze(open_kwargs))
+
+    def acquire(
+        self,
+        opener: Callable,
+        path: str,
+        **open_kwargs,
+        ) -> Tuple[Hashable, xarray.Dataset]:
+        """Returns the pooled dataset for the passed open call and takes a reference on it.
+
+        Args:
+            opener (Callable): Function to open the dataset with, e.g. `xarray.open_dataset`.
+            path (str): Path (or glob pattern) passed to `opener`.
+            **open_kwargs: Open options passed to `opener`.
+
+        Returns:
+            Tuple[Hashable, xarray.Dataset]: The pool key to release the reference with and the dataset.
+        """
+        key = self.build_key(opener, path, **open_kwargs)
+
+        with self._lock:
+            if key in self._datasets:
+                self._datasets.move_to_end(key)
+                self._references[key] += 1
+                return key, self._datasets[key]
+
+            dataset = opener(path, **open_kwargs)
+            self._datasets[key] = dataset
+            self._references[key] = 1
+            self._evict()
+
+            return key, dataset
+
+    def release(
+        self,
+        keys: List[Hashable],
+        ):
+        """Drops one reference per passed key and closes surplus datasets without references.
+        """
+        with self._lock:
+            for key in keys:
+                if key in self._references and self._references[key] > 0:
+                    self._references[key] -= 1
+            self._evict()
+
+    def _evict(self):
+        surplus = len(self._datasets) - self.max_size
+        if surplus <= 0:
+            return
+
+        unreferenced = [key for key in self._datasets if self._references[key] == 0]
+        for key in unreferenced[:surplus]:
+            self._close(key)
+
+    def _close(
+        self,
+        key: Hashable,
+        ):
+        dataset = self._datasets.pop(key)
+        del self._references[key]
+        dataset.close()
+
+    def clear(self):
+        """Closes all datasets without references.
+        """
+        with self._lock:
+            for key in [key for key in self._datasets if self._references[key] == 0]:
+                self._close(key)
+
+
+DATASET_POOL = DatasetPool()
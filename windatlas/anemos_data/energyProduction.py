@@ -0,0 +1,108 @@
+from typing import Union
+
+import numpy
+import xarray
+
+# cells evaluated at once, bounds the (wspd x cells) temporaries of fine power curves
+AEP_CELL_BATCH = 256
+HOURS_PER_YEAR = 8760
+
+
+def power_curve_arrays(
+    power_curve: Union[xarray.DataArray, xarray.Dataset],
+    ):
+    """Returns wspd, rho and the (wspd, rho) power values of a single power curve.
+    """
+    if isinstance(power_curve, xarray.Dataset):
+        power_curve = power_curve.power
+    power_curve = power_curve.transpose("wspd", "rho").load()
+
+    return (
+        power_curve.wspd.to_numpy().astype("float64"),
+        power_curve.rho.to_numpy().astype("float64"),
+        power_curve.to_numpy().astype("float64"),
+        )
+
+
+def annual_energy_production(
+    F: numpy.ndarray,
+    P: numpy.ndarray,
+    s: float = 0.85,
+    ) -> Union[float, numpy.ndarray]:
+    """Integrates a power curve over the CDF of a wind speed distribution to the energy production per year.
+
+    The first wind speed bin counts with its CDF value, every further bin with the CDF difference to
+    the previous bin times the mean power of both. F and P may hold further axes after the wind
+    speeds, e.g. (wspd, points) for a whole fleet, and are broadcast against each other, so a single
+    power curve of the shape (wspd,) is used for all columns of F.
+
+    Args:
+        F (numpy.ndarray): CDF at the wind speeds of the power curve, the wind speeds along the first axis.
+        P (numpy.ndarray): Power at the same wind speeds.
+        s (float, optional): Availability factor. Defaults to 0.85.
+
+    Returns:
+        Union[float, numpy.ndarray]: Energy production per year in the unit of the power curve times hours,
+            a float for 1D inputs and else one value per column.
+    """
+    F = numpy.asarray(F, dtype="float64")
+    P = numpy.asarray(P, dtype="float64")
+
+    # trailing axes are added, so the wind speeds of both stay aligned along the first axis
+    ndim = max(F.ndim, P.ndim)
+    F = F.reshape(F.shape + (1,) * (ndim - F.ndim))
+    P = P.reshape(P.shape + (1,) * (ndim - P.ndim))
+
+    energy = F[0] * P[0] + ((F[1:] - F[:-1]) * (P[1:] + P[:-1]) / 2).sum(axis=0)
+
+    return HOURS_PER_YEAR * energy * s
+
+
+def weibull_aep_kernel(
+    A: numpy.ndarray,
+    k: numpy.ndarray,
+    rho: numpy.ndarray,
+    wspd: numpy.ndarray,
+    rho_grid: numpy.ndarray,
+    power: numpy.ndarray,
+    s: float = 1,
+    ) -> numpy.ndarray:
+    """Calculates the annual energy production of a Weibull distribution for many cells at once.
+
+    Matches `_WeaPoint.weibull_aep`: the power curve is interpolated linearly to the air density
+    of every cell, NaN outside of its rho range, and integrated over the Weibull CDF with the
+    trapezoidal power of every wind speed bin.
+
+    Args:
+        A (numpy.ndarray): Weibull scale parameters.
+        k (numpy.ndarray): Weibull shape parameters, same shape as A.
+        rho (numpy.ndarray): Air densities, same shape as A.
+        wspd (numpy.ndarray): Wind speeds of the power curve.
+        rho_grid (numpy.ndarray): Air densities of the power curve.
+        power (numpy.ndarray): Power curve with the shape (wspd, rho).
+        s (float, optional): Availability factor. Defaults to 1.
+
+    Returns:
+        numpy.ndarray: Energy production per year in the unit of the power curve times hours.
+    """
+    shape = numpy.shape(A)
+    A = numpy.ravel(A).astype("float64")
+    k = numpy.ravel(k).astype("float64")
+    rho = numpy.ravel(rho).astype("float64")
+
+    # the AEP is linear in the power curve, so the rho interpolation is applied to the columns
+    lower = numpy.clip(numpy.searchsorted(rho_grid, rho, side="right") - 1, 0, rho_grid.size - 2)
+    weight = (rho - rho_grid[lower]) / (rho_grid[lower + 1] - rho_grid[lower])
+    outside = (rho < rho_grid[0]) | (rho > rho_grid[-1]) | numpy.isnan(rho)
+
+    aep = numpy.full(A.shape, numpy.nan)
+    for start in range(0, A.size, AEP_CELL_BATCH):
+        cells = slice(start, start + AEP_CELL_BATCH)
+        P = power[:, lower[cells]] * (1 - weight[cells]) + power[:, lower[cells] + 1] * weight[cells]
+        F = 1 - numpy.exp(-(wspd[:, None] / A[cells]) ** k[cells])
+
+        aep[cells] = annual_energy_production(F=F, P=P, s=s)
+
+    aep[outside] = numpy.nan
+
+    return aep.reshape(shape)
@@ -0,0 +1,336 @@
+import os
+import hashlib
+
+from typing import (
+                Optional,
+                List,
+                Tuple,
+                )
+
+import numpy
+import xarray
+import scipy.sparse
+
+from anemosData import InterpolationMethod
+from lambertGrid import lambert_grid_coords
+from pointInterpolation import GATHER_TILE
+
+# bytes of the gathered grid cells multiplied at once, if no time block is passed to `apply`
+MAX_BLOCK_BYTES = 64 * 2**20
+
+
+class ExtractionOperator():
+    """A reusable sparse extraction operator for the anemos lambert grid.
+
+    For a fixed set of target points the interpolation stencil on the x/y(/level) grid is the
+    same for every time step and every variable. This class stores it once as a sparse
+    `(n_points x n_gridcells)` weight matrix, so the extraction of a whole time block of e.g.
+    `wspd` or `rho` is a single sparse matrix multiplication.
+
+    Grid cells are counted in the C order of the dimensions (level, y, x). Data without a
+    `level` dimension is supported by building the operator with `level=None`. Targets outside
+    of the grid have an empty row and are extracted as NaN, like with `interp_points`.
+
+    Args:
+        weights (scipy.sparse.csr_matrix): The `(n_points x n_gridcells)` weight matrix.
+        x (numpy.ndarray): x coordinates of the grid.
+        y (numpy.ndarray): y coordinates of the grid.
+        level (Optional[numpy.ndarray]): level coordinates of the grid or None for 2D data.
+    """
+    _supported_methods = (InterpolationMethod.NEAREST, InterpolationMethod.LINEAR)
+
+    def __init__(
+        self,
+        weights: scipy.sparse.csr_matrix,
+        x: numpy.ndarray,
+        y: numpy.ndarray,
+        level: Optional[numpy.ndarray] = None,
+        ):
+
+        self.weights = weights.tocsr()
+        self.x = numpy.asarray(x, dtype="float64")
+        self.y = numpy.asarray(y, dtype="float64")
+        self.level = None if level is None else numpy.asarray(level, dtype="float64")
+
+        if self.weights.shape[1] != self.num_gridcells:
+            raise ValueError(f"Weight matrix has {self.weights.shape[1]} columns, but the grid has {self.num_gridcells} cells.")
+
+    @property
+    def num_points(self) -> int:
+        return self.weights.shape[0]
+
+    @property
+    def grid_shape(self) -> Tuple[int, ...]:
+        if self.level is None:
+            return (self.y.size, self.x.size)
+        return (self.level.size, self.y.size, self.x.size)
+
+    @property
+    def num_gridcells(self) -> int:
+        return int(numpy.prod(self.grid_shape))
+
+    @classmethod
+    def from_points(
+        cls,
+        xs: numpy.ndarray,
+        ys: numpy.ndarray,
+        levels: Optional[numpy.ndarray] = None,
+        x: Optional[numpy.ndarray] = None,
+        y: Optional[numpy.ndarray] = None,
+        level: Optional[numpy.ndarray] = None,
+        method: Optional[InterpolationMethod] = InterpolationMethod.LINEAR,
+        cache_dir: Optional[str] = None,
+        ) -> "ExtractionOperator":
+        """Builds the operator for the given targets on the given grid.
+
+        If `cache_dir` is passed, an operator build earlier for exactly the same targets, grid
+        and method is loaded from there instead, and a newly build one is saved there. Targets
+        outside of the grid or the levels get an empty row, so `apply` returns NaN for them.
+
+        Args:
+            xs (numpy.ndarray): x coordinates of the targets in the anemos lambert projection.
+            ys (numpy.ndarray): y coordinates of the targets in the anemos lambert projection.
+            levels (Optional[numpy.ndarray], optional): Hub heights of the targets. Ignored if `level` is None. Defaults to None.
+            x (Optional[numpy.ndarray], optional): x coordinates of the grid. Defaults to None, which uses the cached
+                coordinates of `lambertGrid.lambert_grid_coords`, as assigned by `TsNcWindData._assign_new_lambert_coor`.
+            y (Optional[numpy.ndarray], optional): y coordinates of the grid. Defaults to None, see `x`.
+            level (Optional[numpy.ndarray], optional): level coordinates of the grid. Defaults to None.
+            method (Optional[InterpolationMethod], optional): Either NEAREST or LINEAR. Defaults to InterpolationMethod.LINEAR.
+            cache_dir (Optional[str], optional): Directory to cache the operator in. Defaults to None.
+
+        Raises:
+            NotImplementedError: If an interpolation method other than NEAREST or LINEAR is passed.
+
+        Returns:
+            ExtractionOperator: The operator for the passed targets.
+        """
+        if method.value not in [supported.value for supported in cls._supported_methods]:
+            raise NotImplementedError(f"Interpolation method '{method.value}' is not supported by the ExtractionOperator.")
+
+        if x is None or y is None:
+            x, y = lambert_grid_coords()
+
+        axes = [
+            (numpy.asarray(ys, dtype="float64"), numpy.asarray(y, dtype="float64")),
+            (numpy.asarray(xs, dtype="float64"), numpy.asarray(x, dtype="float64")),
+            ]
+        if level is not None:
+            axes.insert(0, (numpy.asarray(levels, dtype="float64"), numpy.asarray(level, dtype="float64")))
+
+        if cache_dir:
+            cache_path = os.path.join(cache_dir, f"extraction_operator_{cls._cache_key(axes, method)}.npz")
+            if os.path.exists(cache_path):
+                return cls.load(cache_path)
+
+        # stencil per axis: (num_points, num_stencil) arrays of grid indices and weights
+        stencils = [cls._axis_stencil(targets, coords, method) for targets, coords in axes]
+        shape = [coords.size for _, coords in axes]
+
+        # outer product of all axis stencils gives the stencil in the flattened grid
+        indices = numpy.zeros((len(axes[0][0]), 1), dtype="int64")
+        weights = numpy.ones((len(axes[0][0]), 1), dtype="float64")
+        for (axis_indices, axis_weights), size in zip(stencils, shape):
+            indices = (indices[:, :, None] * size + axis_indices[:, None, :]).reshape(len(indices), -1)
+            weights = (weights[:, :, None] * axis_weights[:, None, :]).reshape(len(weights), -1)
+
+        rows = numpy.repeat(numpy.arange(indices.shape[0]), indices.shape[1])
+        matrix = scipy.sparse.coo_matrix(
+            (weights.ravel(), (rows, indices.ravel())),
+            shape=(indices.shape[0], int(numpy.prod(shape))),
+            ).tocsr()
+        matrix.eliminate_zeros()
+
+        operator = cls(
+            weights=matrix,
+            x=x,
+            y=y,
+            level=level,
+            )
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            operator.save(cache_path)
+
+        return operator
+
+    @classmethod
+    def from_wind_data(
+        cls,
+        wind_data: xarray.Dataset,
+        xs: numpy.ndarray,
+        ys: numpy.ndarray,
+        levels: Optional[numpy.ndarray] = None,
+        method: Optional[InterpolationMethod] = InterpolationMethod.LINEAR,
+        cache_dir: Optional[str] = None,
+        ) -> "ExtractionOperator":
+        """Builds the operator on the grid of already loaded wind data, like `TsNcWindData.winddata`.
+
+        Args:
+            wind_data (xarray.Dataset): Wind data with lambert x/y coordinates assigned.
+            xs (numpy.ndarray): x coordinates of the targets.
+            ys (numpy.ndarray): y coordinates of the targets.
+            levels (Optional[numpy.ndarray], optional): Hub heights of the targets. Defaults to None.
+            method (Optional[InterpolationMethod], optional): Either NEAREST or LINEAR. Defaults to InterpolationMethod.LINEAR.
+            cache_dir (Optional[str], optional): Directory to cache the operator in. Defaults to None.
+
+        Returns:
+            ExtractionOperator: The operator for the passed targets.
+        """
+        level = wind_data.level.values if "level" in wind_data.dims else None
+
+        return cls.from_points(
+            xs=xs,
+            ys=ys,
+            levels=levels,
+            x=wind_data.x.values,
+            y=wind_data.y.values,
+            level=level,
+            method=method,
+            cache_dir=cache_dir,
+            )
+
+    @staticmethod
+    def _axis_stencil(
+        targets: numpy.ndarray,
+        coords: numpy.ndarray,
+        method: InterpolationMethod,
+        ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Calculates grid indices and weights of the targets along one monotonically increasing axis.
+
+        Targets outside of the axis, or NaN, get zero weights, which empties their row of the operator.
+        """
+        # NaN targets are outside as well
+        inside = (targets >= coords[0]) & (targets <= coords[-1])
+        targets = numpy.where(inside, targets, coords[0])
+
+        if coords.size == 1:
+            return numpy.zeros((targets.size, 1), dtype="int64"), inside[:, None].astype("float64")
+
+        lower = numpy.clip(numpy.searchsorted(coords, targets, side="right") - 1, 0, coords.size - 2)
+        upper_weight = (targets - coords[lower]) / (coords[lower + 1] - coords[lower])
+
+        if method.value == InterpolationMethod.NEAREST.value:
+            nearest = numpy.where(upper_weight > 0.5, lower + 1, lower)
+            return nearest[:, None], inside[:, None].astype("float64")
+
+        indices = numpy.stack([lower, lower + 1], axis=1)
+        weights = numpy.stack([1 - upper_weight, upper_weight], axis=1) * inside[:, None]
+
+        return indices, weights
+
+    @staticmethod
+    def _cache_key(
+        axes: List[Tuple[numpy.ndarray, numpy.ndarray]],
+        method: InterpolationMethod,
+        ) -> str:
+        key = hashlib.sha1(method.value.encode())
+        for targets, coords in axes:
+            key.update(numpy.ascontiguousarray(targets).tobytes())
+            key.update(numpy.ascontiguousarray(coords).tobytes())
+
+        return key.hexdigest()
+
+    def apply(
+        self,
+        data: xarray.DataArray,
+        time_block: Optional[int] = None,
+        ) -> xarray.DataArray:
+        """Extracts the target points from gridded data.
+
+        Only the grid cells with a non-zero weight are read. Lazily opened files read a pointwise
+        selection as the outer product of the selected indices, so there the cells are gathered in
+        groups sharing their file chunk tile (`GATHER_TILE` cells if unknown) and level, see
+        `pointInterpolation.interp_points_regular`. Every time block is then a multiplication of
+        the sparse weights with the gathered `(n_cells x time)` block.
+
+        Args:
+            data (xarray.DataArray): Data on the grid of this operator, e.g. `TsNcWindData.winddata.wspd`.
+            time_block (Optional[int], optional): Number of time steps loaded and multiplied at once.
+                Defaults to None, which bounds the gathered cells of a block to about MAX_BLOCK_BYTES.
+
+        Returns:
+            xarray.DataArray: Extracted data with the dimensions (point, time), NaN for targets outside of the grid.
+        """
+        grid_dims = ["y", "x"] if self.level is None else ["level", "y", "x"]
+
+        columns = numpy.unique(self.weights.indices)
+        weights = self.weights[:, columns]
+        cells = dict(zip(grid_dims, numpy.unravel_index(columns, self.grid_shape)))
+
+        if not time_block:
+            time_block = max(1, MAX_BLOCK_BYTES // max(1, columns.size * data.dtype.itemsize))
+
+        if data.chunks is not None:
+            groups = numpy.zeros(columns.size, dtype="int64")
+        else:
+            # one group per file chunk tile and level
+            preferred_chunks = data.encoding.get("preferred_chunks", {})
+            keys = [cells[dim] // preferred_chunks.get(dim, GATHER_TILE) for dim in ("y", "x")]
+            if self.level is not None:
+                keys.append(cells["level"])
+            _, groups = numpy.unique(numpy.stack(keys, axis=1), axis=0, return_inverse=True)
+            groups = groups.ravel()
+
+        order = numpy.argsort(groups, kind="stable")
+        group_columns = numpy.split(order, numpy.flatnonzero(numpy.diff(groups[order])) + 1) if columns.size else []
+
+        extracted = numpy.full((self.num_points, data.time.size), numpy.nan)
+        for start in range(0, data.time.size, time_block):
+            stop = min(start + time_block, data.time.size)
+            block = numpy.empty((columns.size, stop - start), dtype=data.dtype)
+
+            for group in group_columns:
+                indexers = {dim: xarray.DataArray(indices[group], dims="cell") for dim, indices in cells.items()}
+                part = data.isel(time=slice(start, stop), **indexers).load()
+                block[group] = part.transpose("cell", "time").to_numpy()
+
+            extracted[:, start:stop] = weights @ block
+
+        # targets outside of the grid have no weights
+        extracted[numpy.diff(self.weights.indptr) == 0] = numpy.nan
+
+        return xarray.DataArray(
+            data=extracted,
+            dims=("point", "time"),
+            coords={"time": data.time},
+            name=data.name,
+            attrs=data.attrs,
+            )
+
+    def save(
+        self,
+        path: str,
+        ):
+        """Saves the operator to a `.npz` file.
+        """
+        numpy.savez(
+            path,
+            data=self.weights.data,
+            indices=self.weights.indices,
+            indptr=self.weights.indptr,
+            shape=numpy.array(self.weights.shape),
+            x=self.x,
+            y=self.y,
+            level=numpy.array([]) if self.level is None else self.level,
+            has_level=self.level is not None,
+            )
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        ) -> "ExtractionOperator":
+        """Loads an operator saved with `save`.
+        """
+        with numpy.load(path) as npz:
+            weights = scipy.sparse.csr_matrix(
+                (npz["data"], npz["indices"], npz["indptr"]),
+                shape=tuple(npz["shape"]),
+                )
+
+            return cls(
+                weights=weights,
+                x=npz["x"],
+                y=npz["y"],
+                level=npz["level"] if bool(npz["has_level"]) else None,
+                )
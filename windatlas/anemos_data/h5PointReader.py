@@ -0,0 +1,191 @@
+from typing import (
+                Optional,
+                Tuple,
+                )
+
+import numpy
+import xarray
+import h5netcdf
+
+from pointInterpolation import (
+                GATHER_TILE,
+                bracketing_levels,
+                regular_axis_offsets,
+                )
+
+# bytes of the file read at once for one group of targets
+MAX_BOX_BYTES = 64 * 2**20
+
+
+class H5PointReader():
+    """A fast point reader working directly on the HDF5 datasets of a TSNC-Format file.
+
+    For many points and years the per call overhead of xarray's `.interp` (index building,
+    coordinate alignment, dask graphs) dominates the extraction. This reader maps the targets to
+    integer offsets using the regular spacing of the lambert grid. Targets sharing the file chunk
+    tile of their lower corner and their lower level are read together as the box covering their
+    2 x 2 cell neighbourhoods and bracketing levels, in time blocks of at most about
+    MAX_BOX_BYTES, so every file chunk is read about once however many targets it serves. The
+    interpolation is then done with plain numpy and matches the xarray path to float tolerance.
+
+    Missing values (`_FillValue`, `missing_value`) become NaN and packed values are unpacked
+    with `scale_factor` and `add_offset`, like xarray decodes them.
+
+    Only NEAREST and LINEAR interpolation are supported. Targets outside of the grid get NaN.
+
+    Args:
+        h5file (h5netcdf.File): The opened TSNC-Format file.
+        variable (str): Name of the variable to read, e.g. `wspd`.
+        grid_x (numpy.ndarray): Regular lambert x coordinates of the file.
+        grid_y (numpy.ndarray): Regular lambert y coordinates of the file.
+    """
+
+    def __init__(
+        self,
+        h5file: h5netcdf.File,
+        variable: str,
+        grid_x: numpy.ndarray,
+        grid_y: numpy.ndarray,
+        ):
+
+        self.h5file = h5file
+        self.variable = h5file.variables[variable]
+        self.dims = self.variable.dimensions
+
+        self.grid_x = numpy.asarray(grid_x, dtype="float64")
+        self.grid_y = numpy.asarray(grid_y, dtype="float64")
+
+        self.levels = None
+        if "level" in self.dims:
+            self.levels = numpy.asarray(h5file.variables["level"][:], dtype="float64")
+
+        # CF packing and missing values of the variable, decoded after every read
+        attrs = self.variable.attrs
+        self.fill_values = [value for name in ("_FillValue", "missing_value") if name in attrs for value in numpy.atleast_1d(attrs[name])]
+        self.scale_factor = float(numpy.asarray(attrs.get("scale_factor", 1)).ravel()[0])
+        self.add_offset = float(numpy.asarray(attrs.get("add_offset", 0)).ravel()[0])
+
+        # targets are grouped by the tiles of the file chunks, of contiguous files by GATHER_TILE cells
+        chunks = dict(zip(self.dims, self.variable.chunks)) if self.variable.chunks else {}
+        self.tile = {dim: chunks.get(dim, GATHER_TILE) for dim in ("x", "y")}
+        self.tile["time"] = chunks.get("time", 1)
+
+    def read_time(self) -> numpy.ndarray:
+        """Reads and decodes the time axis of the file.
+        """
+        time = self.h5file.variables["time"]
+        raw = xarray.Dataset({"time": ("time", time[:], dict(time.attrs))})
+
+        return xarray.decode_cf(raw).time.values
+
+    def read_points(
+        self,
+        xs: numpy.ndarray,
+        ys: numpy.ndarray,
+        levels: Optional[numpy.ndarray] = None,
+        method: str = "linear",
+        time_slice: slice = slice(None),
+        dtype: str = "float64",
+        ) -> numpy.ndarray:
+        """Reads and interpolates the time series of the targets.
+
+        Args:
+            xs (numpy.ndarray): x coordinates of the targets in the anemos lambert projection.
+            ys (numpy.ndarray): y coordinates of the targets in the anemos lambert projection.
+            levels (Optional[numpy.ndarray], optional): Hub heights of the targets. Defaults to None.
+            method (str, optional): Either "linear" or "nearest". Defaults to "linear".
+            time_slice (slice, optional): Positions of the time steps to read. Defaults to all time steps.
+            dtype (str, optional): Floating point type of the returned values. The interpolation itself
+                is done in float64. Defaults to "float64".
+
+        Raises:
+            NotImplementedError: If an interpolation method other than "linear" or "nearest" is passed.
+
+        Returns:
+            numpy.ndarray: Interpolated data with the shape (point, time).
+        """
+        if method not in ("linear", "nearest"):
+            raise NotImplementedError(f"Interpolation method '{method}' is not supported by the H5PointReader.")
+
+        xs = numpy.atleast_1d(numpy.asarray(xs, dtype="float64"))
+        ys = numpy.atleast_1d(numpy.asarray(ys, dtype="float64"))
+
+        x_lower, x_upper, x_weight, x_inside = regular_axis_offsets(xs, self.grid_x, method)
+        y_lower, y_upper, y_weight, y_inside = regular_axis_offsets(ys, self.grid_y, method)
+        inside = x_inside & y_inside
+
+        if self.levels is not None:
+            level_lower, level_upper, level_weight = bracketing_levels(self.levels, levels, method=method)
+            inside &= ~numpy.isnan(level_weight)
+
+        targets = numpy.flatnonzero(inside)
+        lower = {"x": x_lower, "y": y_lower}
+        upper = {"x": x_upper, "y": y_upper}
+        weights = {"x": x_weight, "y": y_weight}
+        if self.levels is not None:
+            lower["level"], upper["level"], weights["level"] = level_lower, level_upper, level_weight
+
+        time_start, time_stop, time_step = time_slice.indices(self.variable.shape[self.dims.index("time")])
+        time_size = len(range(time_start, time_stop, time_step))
+        output = numpy.full((xs.size, time_size), numpy.nan, dtype=dtype)
+
+        # one group per file chunk tile of the lower corner and lower level, read as one box
+        keys = [lower[dim][targets] // self.tile[dim] for dim in ("x", "y")]
+        if self.levels is not None:
+            keys.append(level_lower[targets])
+        _, groups = numpy.unique(numpy.stack(keys, axis=1), axis=0, return_inverse=True)
+        groups = groups.ravel()
+        order = numpy.argsort(groups, kind="stable")
+        bounds = numpy.flatnonzero(numpy.diff(groups[order])) + 1
+
+        for group in numpy.split(targets[order], bounds):
+            if group.size == 0:
+                continue
+
+            box = {dim: slice(lower[dim][group].min(), upper[dim][group].max() + 1) for dim in lower}
+            # positions of the 2 x 2 (x 2 levels) corners of every target inside of the box
+            corners = tuple(
+                numpy.stack([lower[dim][group], upper[dim][group]], axis=1).reshape(-1, *[2 if i == axis else 1 for i in range(len(lower))]) - box[dim].start
+                for axis, dim in enumerate(lower)
+                )
+
+            # time blocks aligned to the file chunks, bounding the box to about MAX_BOX_BYTES
+            box_cells = numpy.prod([box[dim].stop - box[dim].start for dim in box])
+            time_block = max(self.tile["time"], MAX_BOX_BYTES // (box_cells * self.variable.dtype.itemsize) // self.tile["time"] * self.tile["time"])
+
+            for block_start in range(0, time_size, time_block):
+                block_stop = min(block_start + time_block, time_size)
+                slices = {
+                    **box,
+                    "time": slice(time_start + block_start * time_step, time_start + block_stop * time_step, time_step),
+                    }
+                values = self.variable[tuple(slices[dim] for dim in self.dims)]
+                values = numpy.moveaxis(values, [self.dims.index(dim) for dim in slices], range(len(slices)))
+
+                # corner series with the shape (point, 2, 2, [2,] time)
+                block = self._decode(values[corners])
+
+                # bilinear in x/y, then linear between the bracketing levels
+                for dim in lower:
+                    weight = weights[dim][group].reshape(-1, *[1] * (block.ndim - 2))
+                    block = block[:, 0] * (1 - weight) + block[:, -1] * weight
+
+                output[group, block_start:block_stop] = block
+
+        return output
+
+    def _decode(
+        self,
+        values: numpy.ndarray,
+        ) -> numpy.ndarray:
+        """Masks the missing values and unpacks the values to float64 like `xarray.decode_cf`.
+        """
+        values = values.astype("float64")
+        for fill_value in self.fill_values:
+            values[values == fill_value] = numpy.nan
+        if self.scale_factor != 1:
+            values *= self.scale_factor
+        if self.add_offset != 0:
+            values += self.add_offset
+
+        return values
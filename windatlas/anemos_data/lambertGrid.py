@@ -0,0 +1,83 @@
+from functools import lru_cache
+
+from typing import (
+                Optional,
+                Tuple,
+                )
+
+import numpy
+import pandas
+from pyproj import (
+                CRS,
+                Transformer,
+                )
+
+# the local lambert projection of the anemos windatlas data
+LAMBERT_PROJ4 = "+proj=lcc +lat_1=48.0 +lat_2=54.0 +lat_0=50.893 +lon_0=10.736 +a=6370000 +b=6370000 +nadgrids=null +no_defs"
+
+# definition of the regular 3 km grid of the anemos windatlas data in its local lambert projection
+LAMBERT_X_ORIGIN = -369000
+LAMBERT_Y_ORIGIN = -408000
+LAMBERT_SPACING = 3000
+LAMBERT_X_SIZE = 225
+LAMBERT_Y_SIZE = 310
+
+
+@lru_cache(maxsize=None)
+def lambert_grid_coords(
+    xy_path: Optional[str] = None,
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """Returns the x and y coordinates of the anemos lambert grid.
+
+    By default the coordinates are computed from the grid definition above, so they do not depend
+    on the working directory. If `xy_path` is passed, they are read from that csv file instead, like
+    `lambert_projection/xy_lamber_projection_values`. Either way they are build only once per
+    process and shared by all callers, which is why the returned arrays are read-only.
+
+    Args:
+        xy_path (Optional[str], optional): csv file with the columns x and y. Defaults to None.
+
+    Returns:
+        Tuple[numpy.ndarray, numpy.ndarray]: The x and y coordinates.
+    """
+    if xy_path:
+        new_dim_coor = pandas.read_csv(xy_path)
+        x = new_dim_coor["x"].dropna().astype("int").values
+        y = new_dim_coor["y"].astype("int").values
+    else:
+        x = LAMBERT_X_ORIGIN + LAMBERT_SPACING * numpy.arange(LAMBERT_X_SIZE, dtype="int64")
+        y = LAMBERT_Y_ORIGIN + LAMBERT_SPACING * numpy.arange(LAMBERT_Y_SIZE, dtype="int64")
+
+    x.setflags(write=False)
+    y.setflags(write=False)
+
+    return x, y
+
+
+@lru_cache(maxsize=None)
+def _geo_to_lambert_transformer() -> Transformer:
+    """Returns the transformer from WGS84 to the anemos lambert projection, build once per process.
+    """
+    return Transformer.from_crs(CRS.from_epsg(4326), CRS.from_proj4(LAMBERT_PROJ4))
+
+
+def geo_to_lambert(
+    lat: numpy.ndarray,
+    lon: numpy.ndarray,
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """Transforms latitudes and longitudes to x and y of the anemos lambert projection.
+
+    All coordinates are transformed in one vectorized call of a cached transformer, so neither
+    the projections nor the transformer are build per point.
+
+    Args:
+        lat (numpy.ndarray): Latitudes in degree.
+        lon (numpy.ndarray): Longitudes in degree.
+
+    Returns:
+        Tuple[numpy.ndarray, numpy.ndarray]: The x and y coordinates.
+    """
+    return _geo_to_lambert_transformer().transform(
+        numpy.asarray(lat, dtype="float64"),
+        numpy.asarray(lon, dtype="float64"),
+        )
@@ -0,0 +1,216 @@
+from concurrent.futures import (
+                ProcessPoolExecutor,
+                as_completed,
+                )
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import cpu_count
+from multiprocessing.shared_memory import SharedMemory
+from threading import RLock
+
+from typing import (
+                Optional,
+                List,
+                Dict,
+                )
+
+import numpy
+import xarray
+
+import pointInterpolation
+from datasetPool import DatasetPool
+
+DEFAULT_POINT_CHUNK = 1000
+# year files a worker process keeps open between its batches, the least recently used ones are closed
+MAX_WORKER_DATASETS = 8
+
+# datasets opened by a worker process, reused by all batches the worker extracts from the same file
+_worker_pool: Optional[DatasetPool] = None
+
+# worker pools by number of processes, kept alive between calls so the workers keep their datasets
+_executors: Dict[int, ProcessPoolExecutor] = {}
+_executors_lock = RLock()
+
+
+def _init_worker(
+    max_datasets: int = MAX_WORKER_DATASETS,
+    ):
+    global _worker_pool
+    _worker_pool = DatasetPool(max_size=max_datasets)
+
+
+def _get_executor(
+    processes: int,
+    ) -> ProcessPoolExecutor:
+    with _executors_lock:
+        if processes not in _executors:
+            _executors[processes] = ProcessPoolExecutor(processes, initializer=_init_worker)
+        return _executors[processes]
+
+
+def _discard_executor(
+    processes: int,
+    ):
+    with _executors_lock:
+        executor = _executors.pop(processes, None)
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_workers():
+    """Stops all worker processes of `extract_points` and closes their datasets.
+    """
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _extract_batch(task: dict):
+    """Extracts one batch of points from one year file and writes it to the shared output array.
+
+    Runs inside a worker process. Only file paths, coordinates and the name of the shared memory
+    block are send to the worker, the dataset is opened by the worker itself and kept in its
+    `DatasetPool` of at most MAX_WORKER_DATASETS unused files for the following batches. The file is opened
+    without dask and for NEAREST and LINEAR only the 2 x 2 x 2 corner series of the targets are
+    gathered, see `pointInterpolation.interp_points_regular`, instead of loading the full variable.
+    """
+    key, data = _worker_pool.acquire(xarray.open_dataset, task["path"], engine="h5netcdf")
+    try:
+        data = data.assign_coords(coords={"x": task["grid_x"], "y": task["grid_y"]})
+        data = data[[task["variable"]]].isel(time=task["time_slice"])
+
+        interp = pointInterpolation.interp_points
+        if task["method"] in pointInterpolation.BRACKETING_METHODS:
+            interp = pointInterpolation.interp_points_regular
+
+        values = interp(
+            data,
+            xs=task["xs"],
+            ys=task["ys"],
+            levels=task["levels"],
+            method=task["method"],
+            )[task["variable"]].transpose("point", "time").to_numpy()
+    finally:
+        _worker_pool.release([key])
+
+    shared = SharedMemory(name=task["shared_name"])
+    try:
+        output = numpy.ndarray(task["shape"], dtype=task["dtype"], buffer=shared.buf)
+        output[task["point_start"]:task["point_stop"], task["time_start"]:task["time_stop"]] = values
+        del output
+    finally:
+        shared.close()
+
+
+def extract_points(
+    paths: List[str],
+    variable: str,
+    grid_x: numpy.ndarray,
+    grid_y: numpy.ndarray,
+    xs: numpy.ndarray,
+    ys: numpy.ndarray,
+    levels: numpy.ndarray,
+    method: str = "linear",
+    time_slices: Optional[List[slice]] = None,
+    time_sizes: Optional[List[int]] = None,
+    processes: Optional[int] = None,
+    point_chunk: Optional[int] = None,
+    dtype: str = "float64",
+    ) -> numpy.ndarray:
+    """Extracts the time series of many points from per-year files with a pool of worker processes.
+
+    The work is split into tasks of one year file and one batch of `point_chunk` points. Every
+    worker opens the year files itself and writes its results straight into a shared memory
+    block holding the full `(point, time)` output, so neither datasets nor result arrays are
+    pickled between the processes.
+
+    The worker pool is kept alive between calls, so the workers reuse their opened datasets, see
+    `shutdown_workers`. Every worker keeps at most MAX_WORKER_DATASETS year files open between its
+    tasks and closes the least recently used ones beyond that. If a worker dies, e.g. killed for running out of memory, the pool is
+    discarded and the call raises instead of waiting for the lost task.
+
+    Args:
+        paths (List[str]): Year files in temporal order, e.g. `{kind}.10L.{year}.ts.nc`.
+        variable (str): Name of the variable to extract, e.g. `wspd`.
+        grid_x (numpy.ndarray): Lambert x coordinates assigned to the files.
+        grid_y (numpy.ndarray): Lambert y coordinates assigned to the files.
+        xs (numpy.ndarray): x coordinates of the targets.
+        ys (numpy.ndarray): y coordinates of the targets.
+        levels (numpy.ndarray): Hub heights of the targets.
+        method (str, optional): Interpolation method, "linear" and "nearest" gather only the corners of the targets. Defaults to "linear".
+        time_slices (Optional[List[slice]], optional): Positions of the time steps to extract per file. Defaults to None, which extracts all time steps.
+        time_sizes (Optional[List[int]], optional): Number of time steps selected by `time_slices` per file, e.g. of
+            the already opened datasets. Defaults to None, which opens every file to count them.
+        processes (Optional[int], optional): Number of worker processes. Defaults to None, which uses all but one core.
+        point_chunk (Optional[int], optional): Number of points per task. Defaults to None, which uses DEFAULT_POINT_CHUNK.
+        dtype (str, optional): Floating point type of the shared output array. Defaults to "float64".
+
+    Raises:
+        concurrent.futures.process.BrokenProcessPool: If a worker process died during the extraction.
+
+    Returns:
+        numpy.ndarray: Extracted data with the shape (point, time).
+    """
+    xs = numpy.asarray(xs, dtype="float64")
+    ys = numpy.asarray(ys, dtype="float64")
+    levels = numpy.asarray(levels, dtype="float64")
+
+    if not processes:
+        processes = max(cpu_count() - 1, 1)
+    if not point_chunk:
+        point_chunk = DEFAULT_POINT_CHUNK
+
+    if time_slices is None:
+        time_slices = [slice(None)] * len(paths)
+
+    if time_sizes is None:
+        time_sizes = []
+        for path, time_slice in zip(paths, time_slices):
+            with xarray.open_dataset(path, engine="h5netcdf") as data:
+                time_sizes.append(len(range(*time_slice.indices(data.time.size))))
+
+    time_offsets = numpy.concatenate([[0], numpy.cumsum(time_sizes)])
+    shape = (xs.size, int(time_offsets[-1]))
+
+    itemsize = numpy.dtype(dtype).itemsize
+    shared = SharedMemory(create=True, size=max(int(numpy.prod(shape)) * itemsize, 1))
+    try:
+        tasks = []
+        for num, path in enumerate(paths):
+            for point_start in range(0, xs.size, point_chunk):
+                point_stop = min(point_start + point_chunk, xs.size)
+                tasks.append({
+                    "path": path,
+                    "variable": variable,
+                    "grid_x": grid_x,
+                    "grid_y": grid_y,
+                    "xs": xs[point_start:point_stop],
+                    "ys": ys[point_start:point_stop],
+                    "levels": levels[point_start:point_stop],
+                    "method": method,
+                    "time_slice": time_slices[num],
+                    "shared_name": shared.name,
+                    "shape": shape,
+                    "dtype": dtype,
+                    "point_start": point_start,
+                    "point_stop": point_stop,
+                    "time_start": int(time_offsets[num]),
+                    "time_stop": int(time_offsets[num + 1]),
+                    })
+
+        executor = _get_executor(processes)
+        try:
+            futures = [executor.submit(_extract_batch, task) for task in tasks]
+            # result() re-raises errors of the workers and BrokenProcessPool if a worker died
+            for future in as_completed(futures):
+                future.result()
+        except BrokenProcessPool:
+            _discard_executor(processes)
+            raise
+
+        return numpy.ndarray(shape, dtype=dtype, buffer=shared.buf).copy()
+
+    finally:
+        shared.close()
+        shared.unlink()
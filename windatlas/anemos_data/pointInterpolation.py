@@ -0,0 +1,314 @@
+from typing import (
+                Dict,
+                Tuple,
+                )
+
+import numpy
+import xarray
+
+# vertical interpolation with only the two levels bracketing a target is exact for these methods
+BRACKETING_METHODS = ("nearest", "linear")
+# relative tolerance of the grid spacing for an axis to be handled as regular
+REGULAR_AXIS_RTOL = 1e-6
+# x/y cells of the tiles the targets are gathered by from data not backed by dask, if the file chunks are unknown
+GATHER_TILE = 32
+
+
+def point_indexers(
+    xs: numpy.ndarray,
+    ys: numpy.ndarray,
+    levels: numpy.ndarray,
+    data: xarray.Dataset,
+    ) -> Dict[str, xarray.DataArray]:
+    """Builds vectorized indexers sharing the new dimension `point` for a collection of targets.
+
+    Passing these to `.interp` or `.sel` makes xarray pick one value per target instead of
+    the outer product of all x, y and level values. The level indexer is only added if the
+    passed data has a `level` dimension and `levels` is not None.
+
+    Args:
+        xs (numpy.ndarray): x coordinates of the targets.
+        ys (numpy.ndarray): y coordinates of the targets.
+        levels (numpy.ndarray): Hub heights of the targets.
+        data (xarray.Dataset): The data the indexers are build for.
+
+    Returns:
+        Dict[str, xarray.DataArray]: Indexers for the dimensions x, y and level.
+    """
+    indexers = {
+        "x": xarray.DataArray(numpy.asarray(xs, dtype="float64"), dims="point"),
+        "y": xarray.DataArray(numpy.asarray(ys, dtype="float64"), dims="point"),
+        }
+    if "level" in data.dims and levels is not None:
+        indexers["level"] = xarray.DataArray(numpy.asarray(levels, dtype="float64"), dims="point")
+
+    return indexers
+
+
+def bracketing_levels(
+    grid_levels: numpy.ndarray,
+    target_levels: numpy.ndarray,
+    method: str = "linear",
+    ) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """Finds the two levels of the grid bracketing each target level and their interpolation weight.
+
+    For `nearest` both returned indices point to the nearest level, with ties going to the lower
+    level like in `scipy.interpolate.interpn`. Targets outside of the grid levels get a NaN weight.
+
+    Args:
+        grid_levels (numpy.ndarray): Monotonically increasing levels of the data, e.g. 40 to 300 m.
+        target_levels (numpy.ndarray): Hub heights of the targets.
+        method (str, optional): Either "linear" or "nearest". Defaults to "linear".
+
+    Returns:
+        Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]: Index of the lower level, index of the
+            upper level and the weight of the upper level per target.
+    """
+    grid_levels = numpy.asarray(grid_levels, dtype="float64")
+    target_levels = numpy.asarray(target_levels, dtype="float64")
+
+    if grid_levels.size == 1:
+        lower = numpy.zeros(target_levels.shape, dtype="int64")
+        weight = numpy.where(target_levels == grid_levels[0], 0.0, numpy.nan)
+        return lower, lower, weight
+
+    lower = numpy.clip(numpy.searchsorted(grid_levels, target_levels, side="right") - 1, 0, grid_levels.size - 2)
+    upper = lower + 1
+    weight = (target_levels - grid_levels[lower]) / (grid_levels[upper] - grid_levels[lower])
+
+    if method == "nearest":
+        lower = numpy.where(weight > 0.5, upper, lower)
+        upper = lower
+        weight = numpy.zeros(weight.shape)
+
+    # a target exactly on a level only needs that level
+    upper = numpy.where(weight == 0, lower, upper)
+
+    outside = (target_levels < grid_levels[0]) | (target_levels > grid_levels[-1]) | numpy.isnan(target_levels)
+    weight = numpy.where(outside, numpy.nan, weight)
+
+    return lower, upper, weight
+
+
+def is_regular_axis(
+    coords: numpy.ndarray,
+    rtol: float = REGULAR_AXIS_RTOL,
+    ) -> bool:
+    """Checks if the coordinates of an axis have a constant spacing, ascending or descending.
+    """
+    coords = numpy.asarray(coords, dtype="float64")
+    if coords.size < 2:
+        return False
+
+    spacing = numpy.diff(coords)
+    return bool(spacing[0] != 0 and numpy.allclose(spacing, spacing[0], rtol=rtol, atol=0))
+
+
+def regular_axis_offsets(
+    targets: numpy.ndarray,
+    coords: numpy.ndarray,
+    method: str = "linear",
+    ) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """Maps targets to integer offsets of the neighbouring grid cells, using the regular grid spacing.
+
+    For `nearest` both offsets point to the nearest cell, with ties going to the lower offset
+    like in `scipy.interpolate.interpn`.
+
+    Args:
+        targets (numpy.ndarray): Coordinates of the targets.
+        coords (numpy.ndarray): Regular coordinates of the axis, ascending or descending.
+        method (str, optional): Either "linear" or "nearest". Defaults to "linear".
+
+    Returns:
+        Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]: Lower offset, upper
+            offset, weight of the upper cell and a mask of the targets inside of the grid.
+    """
+    targets = numpy.asarray(targets, dtype="float64")
+    coords = numpy.asarray(coords, dtype="float64")
+
+    # the mean spacing, so rounding of single coordinates does not add up over large grids
+    spacing = (coords[-1] - coords[0]) / (coords.size - 1)
+    position = (targets - coords[0]) / spacing
+    inside = (position >= 0) & (position <= coords.size - 1)
+
+    lower = numpy.clip(numpy.floor(numpy.nan_to_num(position)).astype("int64"), 0, coords.size - 2)
+    weight = numpy.clip(position - lower, 0, 1)
+
+    if method == "nearest":
+        lower = numpy.where(weight > 0.5, lower + 1, lower)
+        weight = numpy.zeros(weight.shape)
+
+    # targets exactly on a grid line only need one cell
+    upper = numpy.where(weight == 0, lower, lower + 1)
+
+    return lower, upper, weight, inside
+
+
+def _gather_tile(
+    data: xarray.Dataset,
+    dim: str,
+    ) -> int:
+    """Returns the tile size along `dim` the targets are gathered by, the file chunk size if known.
+    """
+    for variable in data.data_vars.values():
+        chunk = variable.encoding.get("preferred_chunks", {}).get(dim)
+        if chunk:
+            return int(chunk)
+
+    return GATHER_TILE
+
+
+def _gather_corners(
+    data: xarray.Dataset,
+    indexers: Dict[str, xarray.DataArray],
+    ) -> xarray.Dataset:
+    """Selects the corner indexers pointwise, group by group of the targets if the data is not backed by dask.
+    """
+    if any(variable.chunks is not None for variable in data.data_vars.values()):
+        return data.isel(indexers)
+
+    # one group per file chunk tile of the lower corner and lower level
+    keys = [indexers[dim].values[:, 0] // _gather_tile(data, dim) for dim in ("y", "x")]
+    if "level" in indexers:
+        keys.append(indexers["level"].values[:, 0])
+    _, groups = numpy.unique(numpy.stack(keys, axis=1), axis=0, return_inverse=True)
+    groups = groups.ravel()
+
+    order = numpy.argsort(groups, kind="stable")
+    bounds = numpy.flatnonzero(numpy.diff(groups[order])) + 1
+
+    parts = []
+    for targets in numpy.split(order, bounds):
+        group_indexers = {dim: indexer.isel(point=targets) for dim, indexer in indexers.items()}
+        parts.append(data.isel(group_indexers).load())
+
+    return xarray.concat(parts, dim="point").isel(point=numpy.argsort(order))
+
+
+def interp_points_regular(
+    data: xarray.Dataset,
+    xs: numpy.ndarray,
+    ys: numpy.ndarray,
+    levels: numpy.ndarray,
+    method: str = "linear",
+    ) -> xarray.Dataset:
+    """Interpolates many target points of data on a regular x/y grid by index arithmetic.
+
+    The cell offsets and bilinear weights of all targets are calculated in one vectorized step
+    from the grid spacing, without building xarray interpolation indexes. Only the 2 x 2 cell
+    neighbourhoods (of the two bracketing levels) of the targets are then gathered with a pointwise
+    `.isel`, for dask backed data in a single one that reads only the chunks containing a target.
+    Lazily opened files without dask read a pointwise selection as the outer product of the
+    selected x, y and level indices, so there the targets are gathered in groups sharing the file
+    chunk tile of their lower corner (`GATHER_TILE` cells if unknown) and their lower level. Every
+    file chunk is then read about once and a read never exceeds one chunk tile plus one cell at
+    two levels, e.g. 32 x 46 x 2 series for the (31, 45, 1, time) chunks of the TSNC-Format files.
+    Targets outside of the grid get NaN, like with `.interp`.
+
+    Args:
+        data (xarray.Dataset): Data with regular x and y coordinates and optionally the dimension level.
+        xs (numpy.ndarray): x coordinates of the targets.
+        ys (numpy.ndarray): y coordinates of the targets.
+        levels (numpy.ndarray): Hub heights of the targets.
+        method (str, optional): Either "linear" or "nearest". Defaults to "linear".
+
+    Raises:
+        NotImplementedError: If an interpolation method other than "linear" or "nearest" is passed.
+
+    Returns:
+        xarray.Dataset: Interpolated data with the leading dimension point.
+    """
+    if method not in BRACKETING_METHODS:
+        raise NotImplementedError(f"Interpolation method '{method}' is not supported on regular grids.")
+
+    xs = numpy.atleast_1d(numpy.asarray(xs, dtype="float64"))
+    ys = numpy.atleast_1d(numpy.asarray(ys, dtype="float64"))
+
+    x_lower, x_upper, x_weight, inside = regular_axis_offsets(xs, data.x.values, method)
+    y_lower, y_upper, y_weight, y_inside = regular_axis_offsets(ys, data.y.values, method)
+    inside &= y_inside
+
+    offsets = {"x": (x_lower, x_upper, x_weight), "y": (y_lower, y_upper, y_weight)}
+    coords = {"x": ("point", xs), "y": ("point", ys)}
+    if "level" in data.dims and levels is not None:
+        level_lower, level_upper, level_weight = bracketing_levels(data.level.values, levels, method=method)
+        inside &= ~numpy.isnan(level_weight)
+        offsets["level"] = (level_lower, level_upper, numpy.nan_to_num(level_weight))
+        coords["level"] = ("point", numpy.atleast_1d(numpy.asarray(levels, dtype="float64")))
+
+    indexers = {}
+    weights = {}
+    for dim, (lower, upper, weight) in offsets.items():
+        corner = f"{dim}_corner"
+        indexers[dim] = xarray.DataArray(numpy.stack([lower, upper], axis=1), dims=("point", corner))
+        weights[dim] = xarray.DataArray(numpy.stack([1 - weight, weight], axis=1), dims=("point", corner))
+
+    corners = _gather_corners(data, indexers).drop_vars(list(indexers), errors="ignore")
+
+    interp_data = xarray.Dataset(attrs=data.attrs)
+    for name, variable in corners.data_vars.items():
+        if not all(dim in variable.dims for dim in ("x_corner", "y_corner")):
+            continue
+
+        for dim, weight in weights.items():
+            variable = (variable * weight).sum(weight.dims[1], skipna=False)
+        interp_data[name] = variable.where(xarray.DataArray(inside, dims="point"))
+        interp_data[name].attrs = data[name].attrs
+
+    return interp_data.assign_coords(coords).transpose("point", ...)
+
+
+def interp_points(
+    data: xarray.Dataset,
+    xs: numpy.ndarray,
+    ys: numpy.ndarray,
+    levels: numpy.ndarray,
+    method: str = "linear",
+    ) -> xarray.Dataset:
+    """Interpolates many target points of gridded data, reading only the cells and levels around the targets.
+
+    For NEAREST and LINEAR on a regular x/y grid, like the lambert grid of the anemos data, only
+    the 2 x 2 x 2 corner series of every target are gathered, see `interp_points_regular`. On
+    irregular grids the hyperslabs of the levels bracketing at least one target are selected
+    before the horizontal interpolation, the vertical interpolation between the two bracketing
+    levels of each target is then applied as weights. For other methods the plain xarray
+    interpolation over all levels is used.
+
+    Args:
+        data (xarray.Dataset): Gridded data with the dimensions x and y and optionally level.
+        xs (numpy.ndarray): x coordinates of the targets.
+        ys (numpy.ndarray): y coordinates of the targets.
+        levels (numpy.ndarray): Hub heights of the targets.
+        method (str, optional): Interpolation method. Defaults to "linear".
+
+    Returns:
+        xarray.Dataset: Interpolated data with the leading dimension point.
+    """
+    if method in BRACKETING_METHODS and is_regular_axis(data.x.values) and is_regular_axis(data.y.values):
+        return interp_points_regular(data, xs, ys, levels, method=method)
+
+    if "level" not in data.dims or levels is None or method not in BRACKETING_METHODS:
+        return data.interp(**point_indexers(xs, ys, levels, data), method=method).transpose("point", ...)
+
+    lower, upper, weight = bracketing_levels(data.level.values, levels, method=method)
+    needed_levels = numpy.unique(numpy.concatenate([lower, upper]))
+
+    # only the hyperslabs of the needed levels are read from the files
+    horizontal = data.isel(level=needed_levels).interp(
+        **point_indexers(xs, ys, None, data),
+        method=method,
+        )
+
+    lower_data = horizontal.isel(level=xarray.DataArray(numpy.searchsorted(needed_levels, lower), dims="point"))
+    upper_data = horizontal.isel(level=xarray.DataArray(numpy.searchsorted(needed_levels, upper), dims="point"))
+    weight = xarray.DataArray(weight, dims="point")
+
+    interp_data = lower_data.copy()
+    for name, variable in horizontal.data_vars.items():
+        if "level" in variable.dims:
+            interp_data[name] = lower_data[name] * (1 - weight) + upper_data[name] * weight
+
+    interp_data = interp_data.assign_coords(level=xarray.DataArray(numpy.asarray(levels, dtype="float64"), dims="point"))
+    interp_data.attrs = data.attrs
+
+    return interp_data.transpose("point", ...)
@@ -0,0 +1,345 @@
+import os
+import hashlib
+import warnings
+
+from typing import (
+                Optional,
+                List,
+                Tuple,
+                )
+
+import numpy
+import xarray
+import scipy.sparse
+from matplotlib.path import Path
+
+# number of sub-cell sample points tested at once while rasterizing, bounds the memory of large regions
+RASTERIZE_BLOCK_SIZE = 1000000
+
+_reductions = {
+    "median": numpy.nanmedian,
+    "max": numpy.nanmax,
+    "min": numpy.nanmin,
+    }
+
+
+class RegionMask():
+    """Regions rasterized to a regular grid, reusable for every variable and time step of that grid.
+
+    Every region is stored as one row of a sparse `(n_regions x n_gridcells)` matrix holding the
+    fraction of each grid cell covered by the region. Rasterizing shapes like Gemeinden or offshore
+    wind farms is expensive, aggregating with the stored fractions is cheap: the area weighted mean
+    is a single sparse matrix multiplication, median, max and min a gather of the covered cells.
+
+    Grid cells are counted in the C order of the dimensions (y, x).
+
+    Args:
+        weights (scipy.sparse.csr_matrix): The `(n_regions x n_gridcells)` matrix of covered cell fractions.
+        x (numpy.ndarray): x coordinates of the grid cell centers.
+        y (numpy.ndarray): y coordinates of the grid cell centers.
+        names (Optional[List[str]]): Names of the regions. Defaults to None, which numbers the regions.
+    """
+
+    def __init__(
+        self,
+        weights: scipy.sparse.csr_matrix,
+        x: numpy.ndarray,
+        y: numpy.ndarray,
+        names: Optional[List[str]] = None,
+        ):
+
+        self.weights = weights.tocsr()
+        self.x = numpy.asarray(x, dtype="float64")
+        self.y = numpy.asarray(y, dtype="float64")
+        self.names = list(range(self.weights.shape[0])) if names is None else list(names)
+
+        if self.weights.shape[1] != self.y.size * self.x.size:
+            raise ValueError(f"Weight matrix has {self.weights.shape[1]} columns, but the grid has {self.y.size * self.x.size} cells.")
+
+    @property
+    def num_regions(self) -> int:
+        return self.weights.shape[0]
+
+    @classmethod
+    def from_geometries(
+        cls,
+        geometries: list,
+        x: numpy.ndarray,
+        y: numpy.ndarray,
+        names: Optional[List[str]] = None,
+        subsamples: int = 4,
+        cache_dir: Optional[str] = None,
+        ) -> "RegionMask":
+        """Rasterizes (multi) polygons to the grid.
+
+        The covered fraction of a grid cell is estimated from `subsamples` x `subsamples` regularly
+        spaced points inside the cell. If `cache_dir` is passed, a mask rasterized earlier for exactly
+        the same geometries, grid and subsamples is loaded from there instead, and a newly rasterized
+        one is saved there.
+
+        Args:
+            geometries (list): Polygons or MultiPolygons in the coordinates of the grid, as shapely
+                geometries, e.g. `GeoDataFrame.geometry`, or as GeoJSON like mappings.
+            x (numpy.ndarray): Regularly spaced x coordinates of the grid cell centers.
+            y (numpy.ndarray): Regularly spaced y coordinates of the grid cell centers.
+            names (Optional[List[str]], optional): Names of the regions. Defaults to None.
+            subsamples (int, optional): Sample points per cell and axis. Defaults to 4.
+            cache_dir (Optional[str], optional): Directory to cache the mask in. Defaults to None.
+
+        Raises:
+            ValueError: If a geometry is neither a Polygon nor a MultiPolygon.
+
+        Returns:
+            RegionMask: The mask of the passed geometries.
+        """
+        x = numpy.asarray(x, dtype="float64")
+        y = numpy.asarray(y, dtype="float64")
+        polygons = [cls._polygons(geometry) for geometry in geometries]
+
+        if cache_dir:
+            cache_path = os.path.join(cache_dir, f"region_mask_{cls._cache_key(polygons, x, y, subsamples)}.npz")
+            if os.path.exists(cache_path):
+                mask = cls.load(cache_path)
+                if names is not None:
+                    mask.names = list(names)
+                return mask
+
+        rows, indices, fractions = [], [], []
+        for num, region in enumerate(polygons):
+            for exterior, holes in region:
+                cell_indices, cell_fractions = cls._rasterize_polygon(exterior, holes, x, y, subsamples)
+                rows.append(numpy.full(cell_indices.size, num))
+                indices.append(cell_indices)
+                fractions.append(cell_fractions)
+
+        # the polygons of a MultiPolygon are summed up, clipping covers overlapping polygons
+        matrix = scipy.sparse.coo_matrix(
+            (
+                numpy.concatenate(fractions) if fractions else numpy.array([]),
+                (
+                    numpy.concatenate(rows) if rows else numpy.array([], dtype="int64"),
+                    numpy.concatenate(indices) if indices else numpy.array([], dtype="int64"),
+                    ),
+                ),
+            shape=(len(polygons), y.size * x.size),
+            ).tocsr()
+        matrix.sum_duplicates()
+        matrix.data = numpy.minimum(matrix.data, 1)
+
+        mask = cls(
+            weights=matrix,
+            x=x,
+            y=y,
+            names=names,
+            )
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            mask.save(cache_path)
+
+        return mask
+
+    @staticmethod
+    def _polygons(geometry) -> List[Tuple[numpy.ndarray, List[numpy.ndarray]]]:
+        """Returns the exterior and the holes of every polygon of a Polygon or MultiPolygon.
+        """
+        if geometry is None:
+            return []
+
+        mapping = geometry.__geo_interface__ if hasattr(geometry, "__geo_interface__") else geometry
+
+        if mapping["type"] == "Polygon":
+            polygons = [mapping["coordinates"]]
+        elif mapping["type"] == "MultiPolygon":
+            polygons = mapping["coordinates"]
+        else:
+            raise ValueError(f"Only Polygons and MultiPolygons can be rasterized, not '{mapping['type']}'.")
+
+        return [
+            (numpy.asarray(rings[0], dtype="float64")[:, :2], [numpy.asarray(ring, dtype="float64")[:, :2] for ring in rings[1:]])
+            for rings in polygons
+            ]
+
+    @staticmethod
+    def _rasterize_polygon(
+        exterior: numpy.ndarray,
+        holes: List[numpy.ndarray],
+        x: numpy.ndarray,
+        y: numpy.ndarray,
+        subsamples: int,
+        ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Returns the flat indices and covered fractions of the grid cells touched by one polygon.
+        """
+        dx = abs(x[1] - x[0])
+        dy = abs(y[1] - y[0])
+        offsets = (numpy.arange(subsamples) + 0.5) / subsamples - 0.5
+
+        # only the cells inside the bounding box of the polygon are tested
+        x_min, y_min = exterior.min(axis=0)
+        x_max, y_max = exterior.max(axis=0)
+        x_cells = numpy.flatnonzero((x >= x_min - dx / 2) & (x <= x_max + dx / 2))
+        y_cells = numpy.flatnonzero((y >= y_min - dy / 2) & (y <= y_max + dy / 2))
+        if x_cells.size == 0 or y_cells.size == 0:
+            return numpy.array([], dtype="int64"), numpy.array([])
+
+        exterior = Path(exterior)
+        holes = [Path(hole) for hole in holes]
+        sample_x = (x[x_cells][:, None] + offsets[None, :] * dx).ravel()
+
+        block_rows = max(RASTERIZE_BLOCK_SIZE // (sample_x.size * subsamples), 1)
+
+        indices, fractions = [], []
+        for start in range(0, y_cells.size, block_rows):
+            rows = y_cells[start:start + block_rows]
+            sample_y = (y[rows][:, None] + offsets[None, :] * dy).ravel()
+
+            points = numpy.column_stack([
+                numpy.tile(sample_x, sample_y.size),
+                numpy.repeat(sample_y, sample_x.size),
+                ])
+            inside = exterior.contains_points(points)
+            for hole in holes:
+                inside &= ~hole.contains_points(points)
+
+            fraction = inside.reshape(rows.size, subsamples, x_cells.size, subsamples).mean(axis=(1, 3))
+            row_idx, col_idx = numpy.nonzero(fraction)
+            indices.append(rows[row_idx] * x.size + x_cells[col_idx])
+            fractions.append(fraction[row_idx, col_idx])
+
+        return numpy.concatenate(indices), numpy.concatenate(fractions)
+
+    @staticmethod
+    def _cache_key(
+        polygons: List[List[Tuple[numpy.ndarray, List[numpy.ndarray]]]],
+        x: numpy.ndarray,
+        y: numpy.ndarray,
+        subsamples: int,
+        ) -> str:
+        key = hashlib.sha1(str(subsamples).encode())
+        key.update(numpy.ascontiguousarray(x).tobytes())
+        key.update(numpy.ascontiguousarray(y).tobytes())
+        for region in polygons:
+            key.update(b"region")
+            for exterior, holes in region:
+                for ring in [exterior, *holes]:
+                    key.update(numpy.ascontiguousarray(ring).tobytes())
+
+        return key.hexdigest()
+
+    def reduce(
+        self,
+        values: numpy.ndarray,
+        method: str = "mean",
+        ) -> numpy.ndarray:
+        """Aggregates gridded values per region.
+
+        `mean` is weighted by the covered cell fractions, `median`, `max` and `min` use every cell
+        touched by the region. NaN values are ignored, regions without valid cells get NaN.
+
+        Args:
+            values (numpy.ndarray): Values with the trailing dimensions (y, x).
+            method (str, optional): One of "mean", "median", "max" or "min". Defaults to "mean".
+
+        Raises:
+            NotImplementedError: If an unsupported aggregation method is passed.
+
+        Returns:
+            numpy.ndarray: Aggregated values with the trailing dimension region instead of (y, x).
+        """
+        if method != "mean" and method not in _reductions:
+            raise NotImplementedError(f"Aggregation method '{method}' is not supported by the RegionMask.")
+
+        lead_shape = values.shape[:-2]
+        flat = values.reshape(-1, self.y.size * self.x.size)
+        valid = ~numpy.isnan(flat)
+
+        if method == "mean":
+            sums = (self.weights @ numpy.where(valid, flat, 0).T).T
+            weights = (self.weights @ valid.T.astype("float64")).T
+            result = numpy.divide(sums, weights, out=numpy.full(sums.shape, numpy.nan), where=weights > 0)
+
+        else:
+            result = numpy.full((flat.shape[0], self.num_regions), numpy.nan)
+            with warnings.catch_warnings():
+                # regions without valid cells stay NaN
+                warnings.simplefilter("ignore", category=RuntimeWarning)
+                for num in range(self.num_regions):
+                    cells = self.weights.indices[self.weights.indptr[num]:self.weights.indptr[num + 1]]
+                    if cells.size:
+                        result[:, num] = _reductions[method](flat[:, cells], axis=1)
+
+        return result.reshape(*lead_shape, self.num_regions)
+
+    def apply(
+        self,
+        data: xarray.Dataset,
+        method: str = "mean",
+        ) -> xarray.Dataset:
+        """Aggregates every data variable with the dimensions x and y per region.
+
+        Dask backed data stays lazy and is reduced chunk by chunk, e.g. one time block after another.
+
+        Args:
+            data (xarray.Dataset): Data on the grid of this mask.
+            method (str, optional): One of "mean", "median", "max" or "min". Defaults to "mean".
+
+        Returns:
+            xarray.Dataset: Aggregated data with the dimension region instead of (y, x).
+        """
+        data_vars = {}
+        for name, variable in data.data_vars.items():
+            if "x" not in variable.dims or "y" not in variable.dims:
+                continue
+            if variable.chunks:
+                variable = variable.chunk({"y": -1, "x": -1})
+
+            data_vars[name] = xarray.apply_ufunc(
+                self.reduce,
+                variable,
+                kwargs={"method": method},
+                input_core_dims=[["y", "x"]],
+                output_core_dims=[["region"]],
+                dask="parallelized",
+                output_dtypes=["float64"],
+                dask_gufunc_kwargs={"output_sizes": {"region": self.num_regions}},
+                keep_attrs=True,
+                )
+
+        return xarray.Dataset(data_vars, attrs=data.attrs).assign_coords(region=self.names)
+
+    def save(
+        self,
+        path: str,
+        ):
+        """Saves the mask to a `.npz` file.
+        """
+        numpy.savez(
+            path,
+            data=self.weights.data,
+            indices=self.weights.indices,
+            indptr=self.weights.indptr,
+            shape=numpy.array(self.weights.shape),
+            x=self.x,
+            y=self.y,
+            names=numpy.array([str(name) for name in self.names]),
+            )
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        ) -> "RegionMask":
+        """Loads a mask saved with `save`. The region names are loaded as strings.
+        """
+        with numpy.load(path) as npz:
+            weights = scipy.sparse.csr_matrix(
+                (npz["data"], npz["indices"], npz["indptr"]),
+                shape=tuple(npz["shape"]),
+                )
+
+            return cls(
+                weights=weights,
+                x=npz["x"],
+                y=npz["y"],
+                names=npz["names"].tolist(),
+                )
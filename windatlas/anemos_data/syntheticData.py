@@ -0,0 +1,423 @@
+import argparse
+import calendar
+import os
+
+from typing import (
+                Dict,
+                List,
+                Optional,
+                Sequence,
+                Tuple,
+                )
+
+import numpy
+import pandas
+import xarray
+import dask.array
+from pyproj import Transformer
+
+from anemosData import (
+                WindDataKind,
+                WindDataType,
+                Mean3km10aWindData,
+                )
+from lambertGrid import (
+                LAMBERT_PROJ4,
+                LAMBERT_X_SIZE,
+                LAMBERT_Y_SIZE,
+                lambert_grid_coords,
+                )
+
+# model levels of the TSNC-Format and Statistics data and of the 3arcsecs data
+ANEMOS_LEVELS = numpy.array([40, 60, 80, 100, 120, 140, 170, 200, 250, 300])
+MEAN90M_LEVELS = numpy.array([40, 80, 100, 120, 140, 166, 200, 250, 300])
+
+TSNC_KINDS = (WindDataKind.WINDSPEED, WindDataKind.AIRDENSITY, WindDataKind.WINDDIRECTION)
+STATISTICS_KINDS = (WindDataKind.WINDSPEED, WindDataKind.AIRDENSITY, WindDataKind.WEIBULLA, WindDataKind.WEIBULLK)
+MEAN90M_KINDS = STATISTICS_KINDS
+
+# the TSNC-Format has one file per year with 10 min time steps, one day per year by default keeps the files small
+STEPS_PER_DAY = 144
+DEFAULT_STEPS_PER_YEAR = STEPS_PER_DAY
+# time steps generated and written at once per level
+TSNC_TIME_BLOCK = STEPS_PER_DAY
+# HDF5 chunks of the written TSNC-Format files as (y, x, level, time)
+TSNC_FILE_CHUNKS = (31, 45, 1, STEPS_PER_DAY)
+
+# a 1° x 1° box of the 3 km grid as `[lon_min, lat_min, lon_max, lat_max]`, the full data covers 5.2° to 15.43° and 47.2° to 56.71°
+MEAN90M_EXTENT = [9.0, 50.5, 10.0, 51.5]
+ARCSECS_SPACING = 1 / 1200
+
+POWER_CURVE_TYPES = {
+    # name: (rated power in kW, rotor diameter in m)
+    "synthetic_2MW": (2000, 82),
+    "synthetic_3MW": (3000, 112),
+    "synthetic_5MW": (5000, 140),
+    }
+CUT_IN_WSPD = 3.0
+CUT_OUT_WSPD = 25.0
+POWER_COEFFICIENT = 0.45
+
+UNITS = {
+    WindDataKind.WINDSPEED: "m/s",
+    WindDataKind.AIRDENSITY: "kg/m3",
+    WindDataKind.WINDDIRECTION: "degree",
+    WindDataKind.AIRPRESSURE: "Pa",
+    WindDataKind.RELATIVEAIRHUMIDITY: "%",
+    WindDataKind.TEMPERATURE: "K",
+    WindDataKind.WEIBULLA: "m/s",
+    WindDataKind.WEIBULLK: "1",
+    }
+
+
+def _weibull_scale(
+    levels: numpy.ndarray,
+    ) -> numpy.ndarray:
+    """Weibull scale of the wind speed by a power law profile, about 6.5 m/s at 100 m.
+    """
+    return 6.5 * (numpy.asarray(levels, dtype="float64") / 100) ** 0.2
+
+
+def sample_field(
+    kind: WindDataKind,
+    levels: numpy.ndarray,
+    shape: Tuple[int, ...],
+    rng: numpy.random.Generator,
+    ) -> numpy.ndarray:
+    """Draws plausible values of one wind data kind.
+
+    The level is expected on the first axis of `shape`. Wind speeds follow a Weibull distribution
+    growing with height, wind directions prevail from south west, density, pressure and temperature
+    decrease with height. Neither the spatial nor the temporal structure of real data is modelled.
+
+    Args:
+        kind (WindDataKind): Kind of wind data to draw.
+        levels (numpy.ndarray): Levels of the first axis.
+        shape (Tuple[int, ...]): Shape of the drawn values, starting with the level axis.
+        rng (numpy.random.Generator): Random number generator.
+
+    Raises:
+        NotImplementedError: If no values can be drawn for `kind`.
+
+    Returns:
+        numpy.ndarray: The values in float32.
+    """
+    height = numpy.asarray(levels, dtype="float64").reshape((-1,) + (1,) * (len(shape) - 1))
+
+    if kind is WindDataKind.WINDSPEED:
+        values = _weibull_scale(height) * rng.weibull(2.0, shape)
+    elif kind is WindDataKind.WINDDIRECTION:
+        prevailing = rng.random(shape) < 0.6
+        values = numpy.where(prevailing, rng.normal(240, 40, shape), rng.uniform(0, 360, shape)) % 360
+    elif kind is WindDataKind.AIRDENSITY:
+        values = 1.225 * numpy.exp(-height / 8500) + rng.normal(0, 0.02, shape)
+    elif kind is WindDataKind.AIRPRESSURE:
+        values = 101325 * numpy.exp(-height / 8500) + rng.normal(0, 800, shape)
+    elif kind is WindDataKind.RELATIVEAIRHUMIDITY:
+        values = numpy.clip(rng.normal(75, 15, shape), 5, 100)
+    elif kind is WindDataKind.TEMPERATURE:
+        values = 283.15 - 0.0065 * height + rng.normal(0, 6, shape)
+    elif kind is WindDataKind.WEIBULLA:
+        values = _weibull_scale(height) * rng.uniform(0.85, 1.15, shape)
+    elif kind is WindDataKind.WEIBULLK:
+        values = rng.uniform(1.6, 2.4, shape)
+    else:
+        raise NotImplementedError(f"No synthetic values for '{kind.value}'.")
+
+    values = numpy.broadcast_to(values, shape).astype("float32")
+    if kind is WindDataKind.WINDDIRECTION:
+        # directions just below 360° are rounded up to 360° in float32
+        values[values >= 360] = 0
+
+    return values
+
+
+def _lambert_lat_lon() -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """Returns the latitude and longitude of every cell of the lambert grid with the shape (y, x).
+    """
+    x, y = lambert_grid_coords()
+    to_geo = Transformer.from_crs(LAMBERT_PROJ4, "EPSG:4326", always_xy=True)
+    lon, lat = to_geo.transform(*numpy.meshgrid(x, y))
+
+    return lat.astype("float32"), lon.astype("float32")
+
+
+def _time_axis(
+    year: int,
+    steps_per_year: Optional[int] = DEFAULT_STEPS_PER_YEAR,
+    ) -> pandas.DatetimeIndex:
+    """Returns the first `steps_per_year` 10 min time steps of `year`, all of them if it is None.
+    """
+    if steps_per_year is None:
+        steps_per_year = (366 if calendar.isleap(year) else 365) * STEPS_PER_DAY
+
+    return pandas.date_range(f"{year}-01-01", periods=steps_per_year, freq="10min")
+
+
+def write_tsnc_files(
+    root: str,
+    years: Sequence[int] = (2009,),
+    steps_per_year: Optional[int] = DEFAULT_STEPS_PER_YEAR,
+    kinds: Sequence[WindDataKind] = TSNC_KINDS,
+    seed: int = 0,
+    ) -> List[str]:
+    """Writes synthetic year files in the layout of the TSNC-Format.
+
+    Like the anemos files, the variable has the dimensions (y, x, level, time) on the full 225 x 310
+    grid with the integer cell indices as x/y, float32 levels and lat/lon as auxiliary coordinates.
+    The values are generated and written block by block, so files of full years (52560 time steps,
+    about 11 GB per variable) can be written with little memory.
+
+    Args:
+        root (str): Root path of the synthetic data, used as `_wind_data_path`.
+        years (Sequence[int], optional): Years to write. Defaults to (2009,).
+        steps_per_year (Optional[int], optional): Number of 10 min time steps per year, starting on January 1st.
+            Defaults to DEFAULT_STEPS_PER_YEAR, None writes full years.
+        kinds (Sequence[WindDataKind], optional): Wind data kinds to write. Defaults to TSNC_KINDS.
+        seed (int, optional): Seed of the random values. Defaults to 0.
+
+    Returns:
+        List[str]: Paths of the written files.
+    """
+    path = os.path.join(root, WindDataType.TSNETCDF.value)
+    os.makedirs(path, exist_ok=True)
+    lat, lon = _lambert_lat_lon()
+
+    paths = []
+    for kind_num, kind in enumerate(kinds):
+        for year in years:
+            time = _time_axis(year, steps_per_year)
+            shape = (LAMBERT_Y_SIZE, LAMBERT_X_SIZE, ANEMOS_LEVELS.size, time.size)
+            chunks = (LAMBERT_Y_SIZE, LAMBERT_X_SIZE, 1, min(TSNC_TIME_BLOCK, time.size))
+
+            def block(empty, block_info=None):
+                # every block has its own seed, so the values do not depend on the order the blocks are written in
+                location = block_info[0]["chunk-location"]
+                rng = numpy.random.default_rng((seed, kind_num, year) + tuple(location))
+                level = ANEMOS_LEVELS[location[2]:location[2] + 1]
+                values = sample_field(kind, level, (1,) + empty.shape[:2] + empty.shape[3:], rng)
+                return numpy.moveaxis(values, 0, 2)
+
+            values = dask.array.empty(shape, chunks=chunks, dtype="float32").map_blocks(block, dtype="float32")
+            data = xarray.Dataset(
+                data_vars={kind.value: (["y", "x", "level", "time"], values, {"units": UNITS[kind]})},
+                coords={
+                    "y": numpy.arange(LAMBERT_Y_SIZE, dtype="int16"),
+                    "x": numpy.arange(LAMBERT_X_SIZE, dtype="int16"),
+                    "level": ANEMOS_LEVELS.astype("float32"),
+                    "time": time,
+                    "lat": (["y", "x"], lat),
+                    "lon": (["y", "x"], lon),
+                    },
+                attrs={"title": "synthetic D3E5"},
+                )
+
+            file_path = os.path.join(path, f"{kind.value}.10L.{year}.ts.nc")
+            data.to_netcdf(file_path, mode="w", engine="h5netcdf", encoding={kind.value: {"chunksizes": tuple(min(size, chunk) for size, chunk in zip(shape, TSNC_FILE_CHUNKS))}})
+            paths.append(file_path)
+
+    return paths
+
+
+def write_statistics_files(
+    root: str,
+    period: str = "2009-2018",
+    kinds: Sequence[WindDataKind] = STATISTICS_KINDS,
+    dirhistos_levels: Sequence[int] = (100,),
+    sectors: int = 12,
+    seed: int = 0,
+    ) -> List[str]:
+    """Writes synthetic long term means and direction histograms in the layout of the Statistics data.
+
+    The means have the dimensions (level, y, x) and are named like `Mean3km10aWindData._file_pattern`,
+    the histograms of one level have the dimensions (klassen, y, x) and are named `dirhistos.{level}m.{period}.nc`.
+    Both carry the lambert x/y coordinates, like loaded by `Mean3km10aWindData`.
+
+    Args:
+        root (str): Root path of the synthetic data, used as `_wind_data_path`.
+        period (str, optional): Period label of the file names. Defaults to "2009-2018".
+        kinds (Sequence[WindDataKind], optional): Wind data kinds of the means. Defaults to STATISTICS_KINDS.
+        dirhistos_levels (Sequence[int], optional): Levels of the direction histograms. Defaults to (100,).
+        sectors (int, optional): Number of direction sectors. Defaults to 12.
+        seed (int, optional): Seed of the random values. Defaults to 0.
+
+    Returns:
+        List[str]: Paths of the written files.
+    """
+    path = os.path.join(root, WindDataType.MEAN3KM10A.value)
+    os.makedirs(path, exist_ok=True)
+
+    rng = numpy.random.default_rng(seed)
+    x, y = lambert_grid_coords()
+    lat, lon = _lambert_lat_lon()
+    coords = {"y": y, "x": x, "lat": (["y", "x"], lat), "lon": (["y", "x"], lon)}
+    shape = (ANEMOS_LEVELS.size, y.size, x.size)
+
+    paths = []
+    for kind in kinds:
+        data = xarray.Dataset(
+            data_vars={kind.value: (["level", "y", "x"], sample_field(kind, ANEMOS_LEVELS, shape, rng), {"units": UNITS[kind]})},
+            coords=dict(coords, level=ANEMOS_LEVELS),
+            attrs={"Referenzperiode": period},
+            )
+        file_path = os.path.join(path, Mean3km10aWindData._file_pattern.format(kind=kind.value, period=period))
+        data.to_netcdf(file_path, mode="w", engine="h5netcdf")
+        paths.append(file_path)
+
+    width = 360 / sectors
+    for level in dirhistos_levels:
+        shape = (sectors, y.size, x.size)
+        counts = rng.dirichlet(numpy.ones(sectors), size=(y.size, x.size)).transpose(2, 0, 1)
+        data = xarray.Dataset(
+            data_vars={
+                "histo": (["klassen", "y", "x"], counts * 100, {"units": "%"}),
+                "wspd": (["klassen", "y", "x"], sample_field(WindDataKind.WINDSPEED, [level] * sectors, shape, rng), {"units": "m/s"}),
+                "klassengrenzen": (["klassen"], numpy.arange(sectors) * width - width / 2, {"units": "degree"}),
+                },
+            coords=coords,
+            attrs={"Referenzperiode": period},
+            )
+        file_path = os.path.join(path, f"{WindDataKind.DIRHISTOS.value}.{level}m.{period}.nc")
+        data.to_netcdf(file_path, mode="w", engine="h5netcdf")
+        paths.append(file_path)
+
+    return paths
+
+
+def write_mean90m_files(
+    root: str,
+    extent: List[float] = MEAN90M_EXTENT,
+    kinds: Sequence[WindDataKind] = MEAN90M_KINDS,
+    seed: int = 0,
+    ) -> List[str]:
+    """Writes synthetic long term means in the layout of the 3arcsecs data.
+
+    The variables have the dimensions (level, y, x) on a regular 3 arcsecond grid with the longitude
+    ascending as x and the latitude descending as y, named `D-3km.E5.3arcsecs.{kind}.2009-2018.nc`.
+
+    Args:
+        root (str): Root path of the synthetic data, used as `_wind_data_path`.
+        extent (List[float], optional): `[lon_min, lat_min, lon_max, lat_max]` of the grid. Defaults to MEAN90M_EXTENT.
+        kinds (Sequence[WindDataKind], optional): Wind data kinds to write. Defaults to MEAN90M_KINDS.
+        seed (int, optional): Seed of the random values. Defaults to 0.
+
+    Returns:
+        List[str]: Paths of the written files.
+    """
+    path = os.path.join(root, WindDataType.MEAN90M.value)
+    os.makedirs(path, exist_ok=True)
+
+    rng = numpy.random.default_rng(seed)
+    lon_min, lat_min, lon_max, lat_max = extent
+    x = lon_min + ARCSECS_SPACING / 2 + ARCSECS_SPACING * numpy.arange(round((lon_max - lon_min) / ARCSECS_SPACING))
+    y = lat_max - ARCSECS_SPACING / 2 - ARCSECS_SPACING * numpy.arange(round((lat_max - lat_min) / ARCSECS_SPACING))
+    shape = (MEAN90M_LEVELS.size, y.size, x.size)
+
+    paths = []
+    for kind in kinds:
+        data = xarray.Dataset(
+            data_vars={kind.value: (["level", "y", "x"], sample_field(kind, MEAN90M_LEVELS, shape, rng).astype("float64"))},
+            coords={"level": MEAN90M_LEVELS, "y": y, "x": x},
+            attrs={"description": f"synthetic {kind.value} 2009-2018", "units": UNITS[kind]},
+            )
+        file_path = os.path.join(path, f"D-3km.E5.3arcsecs.{kind.value}.2009-2018.nc")
+        data.to_netcdf(file_path, mode="w", engine="h5netcdf", encoding={kind.value: {"chunksizes": (1, min(y.size, 512), min(x.size, 512))}})
+        paths.append(file_path)
+
+    return paths
+
+
+def write_power_curves(
+    root: str,
+    wea_types: Dict[str, Tuple[float, float]] = POWER_CURVE_TYPES,
+    wspd_step: float = 0.01,
+    rho_step: float = 0.001,
+    ) -> List[str]:
+    """Writes synthetic power curves in the layout of the interpolated single turbine netCDFs.
+
+    Every file holds the variable `power` in kW over `wspd` and `rho` and the scalar coordinate
+    `wea_type`, so the files are combined like in `WeaPoints._load_power_curves`. The coordinates are
+    rounded like by `Lkl_array.lkl_interpolate`. The anemos curves use 0.001 m/s and 0.0001 kg/m³ steps,
+    the coarser defaults keep the files small.
+
+    Args:
+        root (str): Directory to write the files to.
+        wea_types (Dict[str, Tuple[float, float]], optional): Rated power in kW and rotor diameter in m per
+            turbine type. Defaults to POWER_CURVE_TYPES.
+        wspd_step (float, optional): Wind speed step. Defaults to 0.01.
+        rho_step (float, optional): Air density step. Defaults to 0.001.
+
+    Returns:
+        List[str]: Paths of the written files.
+    """
+    os.makedirs(root, exist_ok=True)
+
+    wspd = numpy.round(numpy.arange(0, 35 + wspd_step / 2, wspd_step), 3)
+    rho = numpy.round(numpy.arange(0.95, 1.35 + rho_step / 2, rho_step), 4)
+
+    paths = []
+    for wea_type, (rated_power, rotor_diameter) in wea_types.items():
+        area = numpy.pi * (rotor_diameter / 2) ** 2
+        power = 0.5 * rho[None, :] * area * POWER_COEFFICIENT * wspd[:, None] ** 3 / 1000
+        power = numpy.minimum(power, rated_power)
+        power = numpy.where((wspd[:, None] < CUT_IN_WSPD) | (wspd[:, None] > CUT_OUT_WSPD), 0, power)
+
+        data = xarray.Dataset(
+            data_vars={"power": (["wspd", "rho"], power, {"units": "kW"})},
+            coords={"wspd": wspd, "rho": rho, "wea_type": wea_type},
+            attrs={"describtion": "synthetic interpolated Leistungskennlinie"},
+            )
+        file_path = os.path.join(root, f"wea_{wea_type}.nc")
+        data.to_netcdf(file_path, mode="w", engine="h5netcdf")
+        paths.append(file_path)
+
+    return paths
+
+
+def write_synthetic_anemos_data(
+    root: str,
+    years: Sequence[int] = (2009,),
+    steps_per_year: Optional[int] = DEFAULT_STEPS_PER_YEAR,
+    mean90m_extent: List[float] = MEAN90M_EXTENT,
+    seed: int = 0,
+    ) -> List[str]:
+    """Writes a complete synthetic anemos data root, so the wind data classes run without `/uba/anemos_winddata`.
+
+    The TSNC-Format, Statistics and 3arcsecs folders can be loaded by passing `root` as `_wind_data_path`,
+    the power curves are written to `{root}/powercurves/single_netcdfs`, see `benchmark.data_root`.
+
+    Args:
+        root (str): Root path to write to.
+        years (Sequence[int], optional): Years of the TSNC-Format files. Defaults to (2009,).
+        steps_per_year (Optional[int], optional): 10 min time steps per year, None for full years. Defaults to DEFAULT_STEPS_PER_YEAR.
+        mean90m_extent (List[float], optional): Extent of the 3arcsecs grid. Defaults to MEAN90M_EXTENT.
+        seed (int, optional): Seed of the random values. Defaults to 0.
+
+    Returns:
+        List[str]: Paths of the written files.
+    """
+    tsnc_kinds = TSNC_KINDS + (WindDataKind.AIRPRESSURE, WindDataKind.RELATIVEAIRHUMIDITY, WindDataKind.TEMPERATURE)
+
+    return (
+        write_tsnc_files(root, years=years, steps_per_year=steps_per_year, kinds=tsnc_kinds, seed=seed)
+        + write_statistics_files(root, seed=seed)
+        + write_mean90m_files(root, extent=mean90m_extent, seed=seed)
+        + write_power_curves(os.path.join(root, "powercurves", "single_netcdfs"))
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic data in the naming and layout of the anemos windatlas data.")
+    parser.add_argument("root", help="root path to write the data to")
+    parser.add_argument("--years", nargs="+", type=int, default=[2009], help="years of the TSNC-Format files")
+    parser.add_argument("--steps-per-year", type=int, default=DEFAULT_STEPS_PER_YEAR, help="10 min time steps per year, 0 for full years")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random values")
+    args = parser.parse_args()
+
+    written = write_synthetic_anemos_data(
+        root=args.root,
+        years=args.years,
+        steps_per_year=args.steps_per_year or None,
+        seed=args.seed,
+        )
+    print(f"{len(written)} files written to {args.root}")
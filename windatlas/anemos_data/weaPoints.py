@@ -6,18 +6,17 @@ import xarray
 import pandas
 import datetime
 
-# for Coordinate Transformation
-from pyproj import CRS, Transformer
-from ogr import Geometry, wkbPoint
-from osr import SpatialReference
-
 # for function definitions
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, InitVar
 from enum import Enum, unique
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator
 
-from anemosData import _WindData, WindDataKind, TsNcWindData, Mean90mWindData, Mean3km10aWindData
-#from power_curve import Lkl_array
+from anemosData import _WindData, WindDataKind, TsNcWindData, Mean90mWindData, Mean3km10aWindData, DerivedAirDensity
+from energyProduction import annual_energy_production, power_curve_arrays, weibull_aep_kernel
+from extractionOperator import ExtractionOperator
+from windRose import tsnc_wind_rose
+from lambertGrid import LAMBERT_PROJ4, geo_to_lambert
+from wea_data.power_curve import lookup_power
 
 #########################################################
 ### Filter functions to work through netCDF wind data ###
@@ -48,6 +47,9 @@ class CalculationMethod (Enum):
     RAYLEIGH = "rayleigh"
     WINDSPEEDMEAN = "wspd"
 
+# order of the interpolation method codes of `WeaPoints.interpolation_codes`
+INTERPOLATION_METHODS = list(InterpolationMethod)
+
 # 
 @dataclass()
 class _WeaPoint():
@@ -66,6 +68,7 @@ class _WeaPoint():
         x_y_coor (List[float]): A list of x and y coordinates which are calculated for the anemos windatlas data by a given lamber projection transformation.
         transform_engine (Optional[ProjectionTransformation]): Definition of the python framework to use for the coordinate transformation.
         interpolation_method (Optional[InterpolationMethod]): Interpolation method to be used in later data extraction processes, if the lat_lon_coor is located in between grid points of the anemos windatlas data.
+        transformed_coor (Optional[List[float]]): Already transformed x and y coordinates, e.g. of a batch transformation in `WeaPoints`, which skips the transformation of this point.
     """
     lat_lon_coor: List[float]
     level: float
@@ -89,26 +92,29 @@ class _WeaPoint():
     EinheitMastrNummer: Optional[str]=None
     Hauptwindrichtung: Optional[int]=None
     mittlere_windgeschw_Hauptwindrichtung: Optional[float]=None
+    transformed_coor: InitVar[Optional[List[float]]]=None
 
-    def __post_init__(self):
-        self.x_y_coor = self.__coor_transformation()
+    def __post_init__(self, transformed_coor):
+        if transformed_coor is not None:
+            self.x_y_coor = list(transformed_coor)
+        else:
+            self.x_y_coor = self.__coor_transformation()
 
     def __coor_transformation(self) -> List[float]:
         """Transforms lat lon coordinates to a local lambert projection coordinate(x,y) given by anemos for their windatlas data.
         """
-        __lambert_proj_str = "+proj=lcc +lat_1=48.0 +lat_2=54.0 +lat_0=50.893 +lon_0=10.736 +a=6370000 +b=6370000 +nadgrids=null +no_defs"
+        __lambert_proj_str = LAMBERT_PROJ4
 
         if self.transform_engine.value == "pyproj":
 
-            crsD3E5 = CRS.from_proj4(__lambert_proj_str)
-            crsGeo = CRS.from_epsg(4326)
-            geo2altas = Transformer.from_crs(crsGeo, crsD3E5)
-
-            x,y = geo2altas.transform(self.lat_lon_coor[0], self.lat_lon_coor[1])
-            return [x,y]
+            x,y = geo_to_lambert(self.lat_lon_coor[0], self.lat_lon_coor[1])
+            return [float(x),float(y)]
 
         if self.transform_engine.value == "gdal":
-            
+            # the GDAL bindings are only needed for this optional transformation engine
+            from ogr import Geometry, wkbPoint
+            from osr import SpatialReference
+
             d3e5Prj = SpatialReference()
             d3e5Prj.ImportFromProj4(__lambert_proj_str)
             geoPrj = SpatialReference()
@@ -142,21 +148,52 @@ class _WeaPoint():
                         target_level=self.level, 
                         method=self.interpolation_method)#.load()
 
+        self.calculate_tsnetcdf_power_output(
+            interp_wind_data=interp_wind_data,
+            power_curves=power_curves,
+            )
+
+    def calculate_tsnetcdf_power_output(
+        self,
+        interp_wind_data: dict,
+        power_curves: xarray.Dataset,
+        ):
+        """Calculates the power time series from wind data already interpolated to this point.
+
+        Args:
+            interp_wind_data (dict): Time series of `wspd` and `rho` at this point, keyed by the wind data kind.
+            power_curves (xarray.Dataset): Power curves with the dimension `wea_type`.
+        """
+        self.power_time_series = self.tsnetcdf_power(
+            interp_wind_data=interp_wind_data,
+            power_curves=power_curves,
+            )
+
+    def tsnetcdf_power(
+        self,
+        interp_wind_data: dict,
+        power_curves: xarray.Dataset,
+        ) -> np.ndarray:
+        """Returns the power time series for wind data already interpolated to this point, without storing it.
+
+        Args:
+            interp_wind_data (dict): Time series of `wspd` and `rho` at this point, keyed by the wind data kind.
+            power_curves (xarray.Dataset): Power curves with the dimension `wea_type`.
+
+        Returns:
+            np.ndarray: Energy output per 10 min time step.
+        """
         # calculating power from wspd, rho and power_curve
-        #print(power_curves)
-        power_curve = power_curves.sel(wea_type=self.wea_type)
-        #print(power_curve.values)
-        power = power_curve.load().sel(
-                wspd=xarray.DataArray(interp_wind_data["wspd"].wspd.to_numpy(), dims='wea'), 
-                rho=xarray.DataArray(interp_wind_data["rho"].rho.to_numpy(), dims='wea'), 
-                method="nearest")#.load()
+        power_curve = power_curves.sel(wea_type=self.wea_type).load()
+        power = lookup_power(
+                power=power_curve.power.transpose("wspd", "rho").to_numpy(),
+                wspd_coords=power_curve.wspd.to_numpy(),
+                rho_coords=power_curve.rho.to_numpy(),
+                wspd=interp_wind_data["wspd"].wspd.to_numpy(), 
+                rho=interp_wind_data["rho"].rho.to_numpy(),
+                )
 
-        #df = power.to_pandas().to_frame()
-        #df = df.rename({0: "Eout"}, axis=1)
-        #df = df.set_index(new_wind_data["wspd"].time.values)
-        #print(power.wea)
-        #print(type(power))
-        self.power_time_series = power.power.values / 6 # divided by 4 because 10 min resolution
+        return power / 6 # divided by 6 because 10 min resolution
 
 
     def get_mean90m_power_output(
@@ -175,6 +212,25 @@ class _WeaPoint():
                         target_level=self.level, 
                         method=self.interpolation_method)#.load()
 
+        self.calculate_mean90m_power_output(
+            interp_wind_data=interp_wind_data,
+            power_curves=power_curves,
+            calculation_method=calculation_method,
+            )
+
+    def calculate_mean90m_power_output(
+        self,
+        interp_wind_data: Dict[str, xarray.Dataset],
+        power_curves: xarray.DataArray,
+        calculation_method: CalculationMethod,
+        ):
+        """Calculates the power output from the already interpolated 3arcsecs statistics of this point.
+
+        Args:
+            interp_wind_data (Dict[str, xarray.Dataset]): Statistics of this point, keyed by the wind data kind.
+            power_curves (xarray.DataArray): Power curves of all turbine types.
+            calculation_method (CalculationMethod): Calculation method for the statistics data.
+        """
         # calculating power from wspd, rho and power_curve
         power_curve = power_curves.sel(wea_type=self.wea_type)
 
@@ -214,10 +270,9 @@ class _WeaPoint():
                         method=self.interpolation_method)#.load()
 
         # calculating power from wspd, rho and power_curve
-        power_curve = power_curves[self.wea_type]
+        power_curve = power_curves.sel(wea_type=self.wea_type)
 
         if calculation_method is CalculationMethod.WEIBULL:
-            print(interp_wind_data["rho"].rho)
             self.power_time_series = self.weibull_aep(
                 lkl=power_curve,
                 A=float(interp_wind_data["wbA"].wbA.to_numpy()),
@@ -279,28 +334,18 @@ class _WeaPoint():
         P:np.array, 
         s:float=0.85
         ) -> float:
-        """_summary_
+        """Integrates the power over the CDF of the wind speeds, see `energyProduction.annual_energy_production`.
 
         Args:
-            F (np.array): _description_
-            P (np.array): _description_
-            s (float, optional): _description_. Defaults to 0.85.
+            F (np.array): CDF at the wind speeds of the power curve, also 2D with the shape (wspd, points).
+            P (np.array): Power at the same wind speeds.
+            s (float, optional): Availability factor. Defaults to 0.85.
 
         Returns:
-            float: _description_
+            float: Energy production per year, one value per column for 2D inputs.
         """
 
-        AEP_list = list()
-        for i, _ in enumerate(F):
-            if i == 0:
-                AEP_i = 8760 * F[i] * P[i]
-
-            else:
-                AEP_i = 8760 * (F[i] - F[i-1]) * ((P[i] + P[i-1])/2)
-            
-            AEP_list.append(AEP_i)
-
-        return sum(AEP_list) * s
+        return annual_energy_production(F=F, P=P, s=s)
 
     def weibull_aep(
         self, 
@@ -393,9 +438,143 @@ class _WeaPoint():
 
 
 
+class _WeaPointView(_WeaPoint):
+    """A `_WeaPoint` backed by one row of the columns of a `WeaPoints` collection.
+
+    The dataclass fields are properties on the columns: reading an attribute reads the columns
+    and setting it writes to them, so changes made through a view, e.g. by
+    `_WeaPoint.calculate_Hauptwindrichtung`, are seen by the collection and all of its methods.
+    `power_time_series` is a row of the `power` block. Setting a series of another length
+    only reallocates the block while it holds no power yet, otherwise it raises a ValueError
+    instead of dropping the series of the other points.
+
+    Args:
+        collection (WeaPoints): The collection holding the columns.
+        num (int): Position of the point in the collection.
+    """
+
+    def __init__(
+        self,
+        collection: "WeaPoints",
+        num: int,
+        ):
+        # the dataclass __init__ is not called, there is no state besides the row in the columns
+        self._collection = collection
+        self._num = num
+
+    @property
+    def lat_lon_coor(self) -> List[float]:
+        return [self._collection.lat[self._num].item(), self._collection.lon[self._num].item()]
+
+    @lat_lon_coor.setter
+    def lat_lon_coor(self, value: List[float]):
+        self._collection.lat[self._num], self._collection.lon[self._num] = value
+
+    @property
+    def x_y_coor(self) -> List[float]:
+        return [self._collection.x[self._num].item(), self._collection.y[self._num].item()]
+
+    @x_y_coor.setter
+    def x_y_coor(self, value: List[float]):
+        self._collection.x[self._num], self._collection.y[self._num] = value
+
+    @property
+    def level(self) -> float:
+        return self._collection.level[self._num].item()
+
+    @level.setter
+    def level(self, value: float):
+        self._collection.level[self._num] = value
+
+    @property
+    def wea_type(self) -> Optional[str]:
+        type_code = self._collection.type_codes[self._num]
+        return self._collection.wea_type_names[type_code] if type_code >= 0 else None
+
+    @wea_type.setter
+    def wea_type(self, value: Optional[str]):
+        names = self._collection.wea_type_names
+        if value is not None and value not in names:
+            self._collection.wea_type_names = names = np.append(names, np.asarray([value], dtype=object))
+        self._collection.type_codes[self._num] = -1 if value is None else list(names).index(value)
+
+    @property
+    def interpolation_method(self) -> InterpolationMethod:
+        return INTERPOLATION_METHODS[self._collection.interpolation_codes[self._num]]
+
+    @interpolation_method.setter
+    def interpolation_method(self, value: InterpolationMethod):
+        self._collection.interpolation_codes[self._num] = INTERPOLATION_METHODS.index(value)
+
+    @property
+    def EinheitMastrNummer(self) -> Optional[str]:
+        return str(self._collection.mastr_ids[self._num]) or None
+
+    @EinheitMastrNummer.setter
+    def EinheitMastrNummer(self, value: Optional[str]):
+        value = "" if value is None else str(value)
+        mastr_ids = self._collection.mastr_ids
+        # the fixed width string column is widened for longer numbers
+        if len(value) > mastr_ids.dtype.itemsize // np.dtype("U1").itemsize:
+            self._collection.mastr_ids = mastr_ids = mastr_ids.astype(f"<U{len(value)}")
+        mastr_ids[self._num] = value
+
+    @property
+    def Hauptwindrichtung(self) -> Optional[float]:
+        value = self._collection.Hauptwindrichtung[self._num]
+        return None if np.isnan(value) else value.item()
+
+    @Hauptwindrichtung.setter
+    def Hauptwindrichtung(self, value: Optional[float]):
+        self._collection.Hauptwindrichtung[self._num] = np.nan if value is None else value
+
+    @property
+    def mittlere_windgeschw_Hauptwindrichtung(self) -> Optional[float]:
+        value = self._collection.mittlere_windgeschw_Hauptwindrichtung[self._num]
+        return None if np.isnan(value) else value.item()
+
+    @mittlere_windgeschw_Hauptwindrichtung.setter
+    def mittlere_windgeschw_Hauptwindrichtung(self, value: Optional[float]):
+        self._collection.mittlere_windgeschw_Hauptwindrichtung[self._num] = np.nan if value is None else value
+
+    @property
+    def power_time_series(self) -> Optional[np.ndarray]:
+        if self._collection.power is None:
+            return None
+        return self._collection.power[self._num]
+
+    @power_time_series.setter
+    def power_time_series(self, value: Optional[np.ndarray]):
+        collection = self._collection
+        if value is None:
+            if collection.power is not None:
+                collection.power[self._num] = np.nan
+            return
+
+        value = np.ravel(value)
+        if collection.power is not None and collection.power.shape[1] != value.size:
+            if not np.isnan(collection.power).all():
+                raise ValueError(
+                    f"The power of the collection has {collection.power.shape[1]} time steps, not {value.size}. "
+                    "Set the power of the collection to None first to replace it."
+                    )
+            collection.power = None
+        if collection.power is None:
+            collection.power = np.full((collection.num_Points, value.size), np.nan, dtype=collection.dtype or "float64")
+        collection.power[self._num] = value
+
+
 class WeaPoints():
     """This is a collection class for the _Wea_point class.
 
+    The points are stored column wise in numpy arrays, one entry per point: `lat`, `lon`, `x`, `y`,
+    `level`, `type_codes` into `wea_type_names` (-1 without type), `interpolation_codes` into
+    `INTERPOLATION_METHODS`, `mastr_ids`, `Hauptwindrichtung` and
+    `mittlere_windgeschw_Hauptwindrichtung`. The power of all points is kept as one block `power`
+    with the dimensions (point, time). `point_list` holds one `_WeaPointView` per point, created
+    once on first access, whose attributes read and write these columns. Changing a point of
+    `point_list` therefore changes the collection, and `point_list` is the same list on every access.
+
     Instances of this class are ment for extractions of wind turbine power output on the bases of anemos wind data and wind turbine types. 
 
     The coordinates passed (`lat_lon_coor`) should be inside the anemos wind data region. 
@@ -407,10 +586,14 @@ class WeaPoints():
         level (float): A float value representing the hub hight of the represented wind turbine.
         wea_type (Optional[str]): A string with a valid manufacturer and unit name.
         interpolation_method (Optional[InterpolationMethod]): Interpolation method to be used in later data extraction processes, if the lat_lon_coor is located in between grid points of the anemos windatlas data.
+        dtype (Optional[str]): Floating point type of the wind data, the power curves and the resulting power time series, e.g. `"float32"` to fit
+            large fleets and long time frames into memory. See `TsNcWindData` and `Lkl_array` for the accuracy against float64. Defaults to None, which keeps float64.
+        mastr_ids (Optional[List[str]]): The MaStR unit numbers (`EinheitMastrNummer`) of the points. Defaults to None.
     """
 
     time = None
     time_frame = None
+    _power_curves_path = r"/uba/anemos_winddata/powercurves/single_netcdfs/wea_*.nc"
 
     def __init__(
             self, 
@@ -422,21 +605,81 @@ class WeaPoints():
             #num_Points:int = None,
             _xy_coord_path: str = r"./lambert_projection/xy_lamber_projection_values",
             _interpolated_power_curves: bool = True,
+            dtype: Optional[str] = None,
+            mastr_ids: Optional[List[str]] = None,
             ):
 
         self._xy_coord_path = _xy_coord_path
         self._interpolated_power_curves = _interpolated_power_curves
+        self.dtype = dtype
 
+        num_points = len(lat_lon_coor)
         if not wea_types:
-            wea_types = [None] * len(lat_lon_coor)
+            wea_types = [None] * num_points
+        if not interpolation_method:
+            interpolation_method = [InterpolationMethod.LINEAR] * num_points
+        if not mastr_ids:
+            mastr_ids = [None] * num_points
+
+        if not num_points == len(level) == len(wea_types) == len(interpolation_method) == len(mastr_ids):
+            raise ValueError("lat_lon_coor, level, wea_types, interpolation_method and mastr_ids must have the same length.")
+
+        lat_lon = np.asarray(lat_lon_coor, dtype="float64").reshape(-1, 2)
+        self.lat = lat_lon[:, 0].copy()
+        self.lon = lat_lon[:, 1].copy()
+        # all points are transformed in one vectorized call instead of once per point
+        self.x, self.y = geo_to_lambert(self.lat, self.lon)
+        self.level = np.asarray(level, dtype="float64")
+
+        codes, names = pandas.factorize(pandas.Series(wea_types, dtype=object))
+        self.type_codes = codes.astype("int32")
+        self.wea_type_names = np.asarray(names, dtype=object)
+
+        method_values = [method.value for method in INTERPOLATION_METHODS]
+        self.interpolation_codes = np.array([method_values.index(method.value) for method in interpolation_method], dtype="uint8")
+        self.mastr_ids = np.array(["" if mastr_id is None else mastr_id for mastr_id in mastr_ids], dtype=str)
+
+        self.Hauptwindrichtung = np.full(num_points, np.nan)
+        self.mittlere_windgeschw_Hauptwindrichtung = np.full(num_points, np.nan)
+        self.power = None
+
+        self.num_Points = num_points
+        self._point_list = None
+
+    def point(
+        self,
+        num: int,
+        ) -> _WeaPoint:
+        """Returns the `_WeaPointView` of one point from `point_list`.
 
-        if len(lat_lon_coor) == len(level) == len(wea_types):
-            if not interpolation_method:
-                self.point_list = [_WeaPoint(point, level, typ) for point, level, typ in zip(lat_lon_coor, level, wea_types)]
-            if interpolation_method:
-                self.point_list = [_WeaPoint(point, level, typ, interpolation_method = intm) for point, level, typ, intm in zip(lat_lon_coor, level, wea_types, interpolation_method)]
-        
-        self.num_Points = len(self.point_list)
+        Args:
+            num (int): Position of the point in the collection.
+
+        Returns:
+            _WeaPoint: The point, reading and writing the columns of this collection.
+        """
+        return self.point_list[num]
+
+    @property
+    def point_list(self) -> List[_WeaPoint]:
+        """`_WeaPointView` of all points, created once and kept in sync with the columns, see `_WeaPointView`.
+        """
+        if self._point_list is None:
+            self._point_list = [_WeaPointView(self, num) for num in range(self.num_Points)]
+
+        return self._point_list
+
+    @property
+    def wea_types(self) -> np.ndarray:
+        """The turbine type of every point, None for points without type.
+        """
+        return np.append(self.wea_type_names, None)[self.type_codes]
+
+    @property
+    def interpolation_methods(self) -> np.ndarray:
+        """The interpolation method values of every point, e.g. `"linear"`.
+        """
+        return np.array([method.value for method in INTERPOLATION_METHODS])[self.interpolation_codes]
 
     def transforme_date(self, date) -> np.datetime64:
         """Date input must be either an integer year like `2009`
@@ -478,24 +721,32 @@ class WeaPoints():
         wind_data_type: WindDataType,
         time_frame:List[int] = [2009, 2018],
         calculation_method: CalculationMethod = CalculationMethod.WEIBULL,
+        period: Optional[str] = "2009-2018",
+        derive_airdensity: Optional[bool] = False,
         ):
+        """Calculates the power output of all points.
 
-        self.time_frame = [self.transforme_date(date) if not isinstance(date, np.datetime64) else date for date in time_frame]
-
-        if any ([self.time_frame[0]<np.datetime64("2009-01-01"),self.time_frame[-1]>np.datetime64("2018-12-31")]):
-            raise ValueError("Input dates for time_frame must be in range of: '2009-01-01' to '2018-12-31'")
-
-        print("Passed time_frame valid.")
+        Args:
+            wind_data_type (WindDataType): The wind data to calculate the power output from.
+            time_frame (List[int], optional): First and last date of TSNETCDF data. Defaults to [2009, 2018].
+            calculation_method (CalculationMethod, optional): Calculation method for the statistics data. Defaults to CalculationMethod.WEIBULL.
+            period (Optional[str], optional): Period of the MEAN3KM10A parameter grids, e.g. of a custom period
+                written by `weibullFit.write_weibull_parameters`. Defaults to "2009-2018".
+            derive_airdensity (Optional[bool], optional): Derive the air density of TSNETCDF data from pressure,
+                relative humidity and temperature instead of reading the air density files, see `DerivedAirDensity`.
+                Defaults to False.
+        """
+        self.__set_time_frame(time_frame)
 
         if wind_data_type is WindDataType.TSNETCDF:
-            self.__tsnetcdf_out()
+            self.__tsnetcdf_out(derive_airdensity=derive_airdensity)
 
         elif wind_data_type is WindDataType.NETCDF:
             pass
 
         elif wind_data_type is WindDataType.MEAN3KM10A:
             self.time_frame = [np.datetime64("2009-01-01"), np.datetime64("2018-12-31")]
-            self.__mean3km10a_out(calculation_method=calculation_method)
+            self.__mean3km10a_out(calculation_method=calculation_method, period=period)
 
         elif wind_data_type is WindDataType.MEAN90M:
             self.time_frame = [np.datetime64("2009-01-01"), np.datetime64("2018-12-31")]
@@ -504,16 +755,143 @@ class WeaPoints():
         else:
             pass#print("")
 
+    def __set_time_frame(
+        self,
+        time_frame: List[int],
+        ):
+
+        self.time_frame = [self.transforme_date(date) if not isinstance(date, np.datetime64) else date for date in time_frame]
+
+        if any ([self.time_frame[0]<np.datetime64("2009-01-01"),self.time_frame[-1]>np.datetime64("2018-12-31")]):
+            raise ValueError("Input dates for time_frame must be in range of: '2009-01-01' to '2018-12-31'")
+
+        print("Passed time_frame valid.")
+
+    def iter_tsnetcdf_power(
+        self,
+        time_frame: List[int] = [2009, 2018],
+        block_freq: str = "YS",
+        wind_params: Optional[List[WindDataKind]] = [WindDataKind.WINDSPEED, WindDataKind.AIRDENSITY],
+        derive_airdensity: Optional[bool] = False,
+        ) -> Iterator[xarray.DataArray]:
+        """Yields the power of all points one time block after another, e.g. one year at a time.
+
+        Unlike `get_windpower_out` only the wind data of the current block is opened and the power
+        is neither stored in the points nor kept by this instance. Peak memory therefore only
+        depends on the block length and not on the `time_frame`, and writers or aggregators can
+        consume every block as soon as it is calculated.
+
+        Args:
+            time_frame (List[int], optional): First and last date, like for `get_windpower_out`. Defaults to [2009, 2018].
+            block_freq (str, optional): pandas frequency of the block starts, e.g. `"YS"` for years or
+                `"MS"` for months. Defaults to "YS".
+            wind_params (Optional[List[WindDataKind]], optional): Wind data to load per block.
+                Defaults to [WindDataKind.WINDSPEED, WindDataKind.AIRDENSITY].
+            derive_airdensity (Optional[bool], optional): Derive the air density from pressure, relative humidity
+                and temperature, like for `get_windpower_out`. Defaults to False.
+
+        Yields:
+            xarray.DataArray: Energy output per 10 min time step with the dimensions (point, time),
+                the points in the order of the collection.
+        """
+        self.__set_time_frame(time_frame)
+        start, end = self.time_frame[0], self.time_frame[-1]
+
+        # block edges: the start of the time frame, every block start after it and the end of the time frame
+        starts = pandas.date_range(start, end, freq=block_freq).to_numpy()
+        starts = np.unique(np.concatenate([[start], starts[starts > start]])).astype("datetime64[ns]")
+        ends = np.concatenate([starts[1:] - np.timedelta64(1, "ns"), [np.datetime64(end, "ns")]])
+
+        power_curves = self._load_power_curves()
+        extent = self.get_extent()
+
+        for block_start, block_end in zip(starts, ends):
+            wind_data = {}
+            try:
+                for param in wind_params:
+                    wind_data[param.value] = self._tsnetcdf_wind_data(param, [block_start, block_end], extent, derive_airdensity)
+
+                time = list(wind_data.values())[0].winddata.time.to_numpy()
+                if time.size == 0:
+                    continue
+
+                interp_wind_data = self._interp_wind_data(wind_data)
+                power = self._tsnetcdf_power(interp_wind_data, power_curves)
+                del interp_wind_data
+            finally:
+                # also closes the files of empty blocks and of blocks failing to load
+                for data in wind_data.values():
+                    data.close()
+                del wind_data
+
+            yield xarray.DataArray(
+                data=power,
+                dims=("point", "time"),
+                coords={"time": time},
+                name="power",
+                )
+
+    def get_wind_roses(
+        self,
+        time_frame: List[int] = [2009, 2018],
+        sectors: int = 12,
+        speed_bin_edges: Optional[np.ndarray] = None,
+        method: Optional[InterpolationMethod] = InterpolationMethod.LINEAR,
+        ) -> xarray.Dataset:
+        """Calculates the wind direction histograms of all points for any time window of the TSNC-Format data.
+
+        See `windRose.tsnc_wind_rose`, a single point can be plotted with `_circularHisto`, e.g.
+        `_circularHisto(roses.isel(point=0), "histo")`.
+
+        Args:
+            time_frame (List[int], optional): First and last date, like for `get_windpower_out`. Defaults to [2009, 2018].
+            sectors (int, optional): Number of direction sectors. Defaults to 12.
+            speed_bin_edges (Optional[np.ndarray], optional): Wind speed bin edges of a joint direction and speed histogram. Defaults to None.
+            method (Optional[InterpolationMethod], optional): Interpolation method of the wind speed. Defaults to InterpolationMethod.LINEAR.
+
+        Returns:
+            xarray.Dataset: Histograms with the dimensions (point, sector), the points in the order of the collection.
+        """
+        self.__set_time_frame(time_frame)
+
+        return tsnc_wind_rose(
+            xs=self.x,
+            ys=self.y,
+            levels=self.level,
+            time_frame=self.time_frame,
+            sectors=sectors,
+            speed_bin_edges=speed_bin_edges,
+            method=method,
+            )
+
     def calculate_Hauptwindrichtung (self):
+        # the views write the result to the Hauptwindrichtung column
         for point in self.point_list:
             point.calculate_Hauptwindrichtung()
 
+    def get_extent(
+        self,
+        lat_lon: bool = False,
+        ) -> List[float]:
+        """Returns the bounding box of all points, to crop wind data with before any computation.
+
+        Args:
+            lat_lon (bool, optional): Return the extent as `[lon_min, lat_min, lon_max, lat_max]` like
+                needed by `Mean90mWindData` instead of lambert x/y. Defaults to False.
+
+        Returns:
+            List[float]: The extent as `[x_min, y_min, x_max, y_max]`.
+        """
+        xs, ys = (self.lon, self.lat) if lat_lon else (self.x, self.y)
+
+        return [float(xs.min()), float(ys.min()), float(xs.max()), float(ys.max())]
+
     def _load_power_curves(
         self,
         ):
 
         if self._interpolated_power_curves:
-            path = "/uba/anemos_winddata/powercurves/single_netcdfs/wea_*.nc"
+            path = self._power_curves_path
             power_curves = xarray.open_mfdataset(path, parallel=True, engine="h5netcdf", combine="nested", concat_dim="wea_type")
 
         if not self._interpolated_power_curves:
@@ -525,17 +903,35 @@ class WeaPoints():
             power_curve = power_curve.assign_coords(rho=np.float64(power_curve.rho))
             power_curves = power_curve.to_dataset(name="test_wea")
 
+        # only the power values are cast, the wspd and rho coordinates stay float64 for the nearest selection
+        if self.dtype:
+            power_curves = power_curves.astype(self.dtype)
 
         return power_curves
 
+    def _tsnetcdf_wind_data(
+        self,
+        param: WindDataKind,
+        time_frame: List[np.datetime64],
+        extent: List[float],
+        derive_airdensity: Optional[bool] = False,
+        ) -> _WindData:
+        """Opens the TSNETCDF data of one wind parameter, the air density derived on the fly if `derive_airdensity` is set.
+        """
+        if derive_airdensity and param is WindDataKind.AIRDENSITY:
+            return DerivedAirDensity(time_frame=time_frame, extent=extent, dtype=self.dtype)
+
+        return TsNcWindData(wind_data_kind=param, time_frame=time_frame, extent=extent, dtype=self.dtype)
+
     def __tsnetcdf_out(
         self,
-        wind_params: Optional[List[WindDataKind]] = [WindDataKind.WINDSPEED, WindDataKind.AIRDENSITY]
+        wind_params: Optional[List[WindDataKind]] = [WindDataKind.WINDSPEED, WindDataKind.AIRDENSITY],
+        derive_airdensity: Optional[bool] = False,
         ):
 
         self.wind_data = {}
         for param in wind_params:
-            self.wind_data[param.value] = TsNcWindData(wind_data_kind=param, time_frame=self.time_frame)
+            self.wind_data[param.value] = self._tsnetcdf_wind_data(param, self.time_frame, self.get_extent(), derive_airdensity)
         print("TSnetCDF data loaded.")
 
         self.time_periode = list(self.wind_data.values())[0].winddata.time.to_numpy()
@@ -543,12 +939,115 @@ class WeaPoints():
 
         power_curves = self._load_power_curves()
 
-        for num, point in enumerate(self.point_list):
-            point.get_tsnetcdf_power_output(
-                wind_data=self.wind_data, 
-                power_curves=power_curves,
+        interp_wind_data = self._interp_wind_data(self.wind_data)
+        print("TSnetCDF data interpolated.")
+
+        self.power = self._tsnetcdf_power(interp_wind_data, power_curves)
+        print(f"Windpower of {self.num_Points} turbines complete")
+
+    def _tsnetcdf_power(
+        self,
+        interp_wind_data: Dict[str, xarray.Dataset],
+        power_curves: xarray.Dataset,
+        ) -> np.ndarray:
+        """Calculates the power of all points from their interpolated `wspd` and `rho` series.
+
+        The points are grouped by their turbine type, so every power curve is loaded once and all
+        samples of a group are looked up in a single call of `lookup_power`, the same as `_WeaPoint.tsnetcdf_power`
+        does for one point. Points without a turbine type get NaN.
+
+        Args:
+            interp_wind_data (Dict[str, xarray.Dataset]): Point data of `_interp_wind_data` with the dimensions (point, time).
+            power_curves (xarray.Dataset): Power curves with the dimension `wea_type`.
+
+        Returns:
+            np.ndarray: Energy output per 10 min time step with the dimensions (point, time).
+        """
+        wspd = interp_wind_data["wspd"].wspd.transpose("point", "time").to_numpy()
+        rho = interp_wind_data["rho"].rho.transpose("point", "time").to_numpy()
+
+        power = np.full(wspd.shape, np.nan, dtype=self.dtype or "float64")
+        for code, wea_type in enumerate(self.wea_type_names):
+            idx = np.flatnonzero(self.type_codes == code)
+            power_curve = power_curves.sel(wea_type=wea_type).load()
+            group_power = lookup_power(
+                power=power_curve.power.transpose("wspd", "rho").to_numpy(),
+                wspd_coords=power_curve.wspd.to_numpy(),
+                rho_coords=power_curve.rho.to_numpy(),
+                wspd=wspd[idx],
+                rho=rho[idx],
                 )
-            print(f"Windpower turbine {num+1} complete")
+            power[idx] = group_power / 6 # divided by 6 because 10 min resolution
+
+        return power
+
+    def _interp_wind_data(
+        self,
+        wind_data: Dict[str, _WindData],
+        lat_lon: bool = False,
+        ) -> Dict[str, xarray.Dataset]:
+        """Interpolates every entry of `wind_data` to all points of the collection.
+
+        Instead of one pass over the data per point, all points sharing an interpolation method
+        are extracted in a single vectorized `interp_points` call.
+
+        Args:
+            wind_data (Dict[str, _WindData]): Loaded wind data, keyed by the wind data kind.
+            lat_lon (bool, optional): Pass longitude and latitude as x and y, like needed by `Mean90mWindData`. Defaults to False.
+
+        Returns:
+            Dict[str, xarray.Dataset]: Loaded point data with the dimension `point` in the order of the collection.
+        """
+        xs, ys = (self.lon, self.lat) if lat_lon else (self.x, self.y)
+
+        interp_wind_data = {}
+        for key, value in wind_data.items():
+            method_data = []
+            for code in np.unique(self.interpolation_codes):
+                idx = np.flatnonzero(self.interpolation_codes == code)
+                data = value.interp_points(
+                    xs=xs[idx], 
+                    ys=ys[idx], 
+                    levels=self.level[idx], 
+                    method=INTERPOLATION_METHODS[code],
+                    )
+                method_data.append(data.assign_coords(point=idx))
+
+            interp_wind_data[key] = xarray.concat(method_data, dim="point").sortby("point").load()
+
+        return interp_wind_data
+
+    def build_extraction_operator(
+        self,
+        wind_data: _WindData,
+        method: Optional[InterpolationMethod] = InterpolationMethod.LINEAR,
+        cache_dir: Optional[str] = None,
+        ) -> ExtractionOperator:
+        """Builds the sparse extraction operator of all points for the grid of the passed wind data.
+
+        The operator only depends on the points and the grid, so it can be reused for every
+        variable and time block of the same grid. With `cache_dir` it is also reused across runs.
+
+        Args:
+            wind_data (_WindData): Loaded wind data on the anemos lambert grid, e.g. `TsNcWindData`.
+            method (Optional[InterpolationMethod], optional): Either NEAREST or LINEAR. Defaults to InterpolationMethod.LINEAR.
+            cache_dir (Optional[str], optional): Directory to cache the operator in. Defaults to None.
+
+        Returns:
+            ExtractionOperator: The operator for all points of the collection.
+        """
+        data = wind_data.winddata
+        if isinstance(data, list):
+            data = data[0]
+
+        return ExtractionOperator.from_wind_data(
+            wind_data=data,
+            xs=self.x,
+            ys=self.y,
+            levels=self.level,
+            method=method,
+            cache_dir=cache_dir,
+            )
 
     def __mean90m_out(
         self,
@@ -565,22 +1064,21 @@ class WeaPoints():
 
         self.wind_data = {}
         for param in wind_params:
-            self.wind_data[param.value] = Mean90mWindData(wind_data_kind=param)
+            self.wind_data[param.value] = Mean90mWindData(wind_data_kind=param, extent=self.get_extent(lat_lon=True))
         print("mean90m data loaded.")
 
         power_curves = self._load_power_curves()
 
-        for num, point in enumerate(self.point_list):
-            point.get_mean90m_power_output(
-                wind_data=self.wind_data, 
-                power_curves=power_curves,
-                calculation_method = calculation_method,
-                )
-            print(f"Windpower turbine {num+1} complete")
+        # the 3arcsecs grid is regular in lon/lat, so all points are extracted at once by index arithmetic
+        interp_wind_data = self._interp_wind_data(self.wind_data, lat_lon=True)
+
+        self.power = self._statistics_power(interp_wind_data, power_curves, calculation_method)
+        print(f"Windpower of {self.num_Points} turbines complete")
 
     def __mean3km10a_out(
         self,
         calculation_method: CalculationMethod,
+        period: Optional[str] = "2009-2018",
         ):
         
         if calculation_method is CalculationMethod.WEIBULL:
@@ -593,26 +1091,65 @@ class WeaPoints():
 
         self.wind_data = {}
         for param in wind_params:
-            self.wind_data[param.value] = Mean3km10aWindData(wind_data_kind=param)
+            self.wind_data[param.value] = Mean3km10aWindData(wind_data_kind=param, extent=self.get_extent(), period=period)
         print("mean3km10a data loaded.")
 
         power_curves = self._load_power_curves()
 
-        for num, point in enumerate(self.point_list):
-            point.get_mean3km10a_power_output(
-                wind_data=self.wind_data, 
-                power_curves=power_curves,
-                calculation_method=calculation_method,
-                )
-            print(f"Windpower turbine {num+1} complete")
+        interp_wind_data = self._interp_wind_data(self.wind_data)
+
+        self.power = self._statistics_power(interp_wind_data, power_curves, calculation_method)
+        print(f"Windpower of {self.num_Points} turbines complete")
+
+    def _statistics_power(
+        self,
+        interp_wind_data: Dict[str, xarray.Dataset],
+        power_curves: xarray.Dataset,
+        calculation_method: CalculationMethod,
+        years: int = 10,
+        s: float = 1,
+        ) -> np.ndarray:
+        """Calculates the energy production of all points from their interpolated Weibull parameters or mean wind speeds.
+
+        The points are grouped by their turbine type and every group is integrated in one call of
+        `energyProduction.weibull_aep_kernel`, the same as `_WeaPoint.weibull_aep` and
+        `_WeaPoint.rayleigh_aep` do for one point. The Rayleigh distribution of the mean wind speed
+        is the Weibull distribution with `k = 2` and `A = 2 * v_mean / sqrt(pi)`. Points without a
+        turbine type get NaN.
+
+        Args:
+            interp_wind_data (Dict[str, xarray.Dataset]): Point data of `_interp_wind_data` with the dimension point.
+            power_curves (xarray.Dataset): Power curves with the dimension `wea_type`.
+            calculation_method (CalculationMethod): Either WEIBULL or RAYLEIGH.
+            years (int, optional): Number of years the statistics cover. Defaults to 10.
+            s (float, optional): Availability factor. Defaults to 1.
+
+        Returns:
+            np.ndarray: Energy production of the `years` with the shape (point, 1).
+        """
+        values = {key: value[key].to_numpy().astype("float64").reshape(self.num_Points) for key, value in interp_wind_data.items()}
+        rho = values["rho"]
+
+        if calculation_method is CalculationMethod.WEIBULL:
+            A, k = values["wbA"], values["wbk"]
+
+        if calculation_method is CalculationMethod.RAYLEIGH:
+            A = 2 * values["wspd"] / np.sqrt(np.pi)
+            k = np.full(self.num_Points, 2.0)
+
+        power = np.full((self.num_Points, 1), np.nan)
+        for code, wea_type in enumerate(self.wea_type_names):
+            idx = np.flatnonzero(self.type_codes == code)
+            wspd, rho_grid, power_curve = power_curve_arrays(power_curves.sel(wea_type=wea_type))
+            power[idx, 0] = weibull_aep_kernel(A[idx], k[idx], rho[idx], wspd, rho_grid, power_curve, s=s) * years
+
+        return power
 
     def timeseries_to_pandas (self) -> pandas.DataFrame:
 
-        Eout = {}
-        for num, point in enumerate(self.point_list):
-            Eout[f"wea_{num+1}: {point.lat_lon_coor}"] = point.power_time_series
+        columns = [f"wea_{num+1}: {[lat, lon]}" for num, (lat, lon) in enumerate(zip(self.lat.tolist(), self.lon.tolist()))]
 
-        return pandas.DataFrame(data=Eout,index=self.time_periode)
+        return pandas.DataFrame(data=self.power.T, index=self.time_periode, columns=columns)
 
 
 
@@ -637,6 +1174,7 @@ def from_MaStR(
         lat_lon_coor = lat_lon_coor,
         level = level,
         wea_types = weaType,#["test_wea"] * size,
+        mastr_ids = mastrID,
         #interpolation_method = [InterpolationMethod.LINEAR] * size,
     )
 
@@ -21,11 +21,114 @@ class SelectMethod(Enum):
     QUDRATIC = "quadratic"
     CUBIC = "cubic"
 
-class Lkl_array():
-    """[summary]
+# relative deviation of the spacing, up to which a wspd or rho axis counts as regular
+REGULAR_AXIS_RTOL = 1e-6
+# margin for the float error of a calculated position, in units of the spacing
+POSITION_TOLERANCE = 1e-9
+
+
+def _pandas_nearest_indices(
+    targets: numpy.ndarray,
+    coords: numpy.ndarray,
+    ) -> numpy.ndarray:
+    return pandas.Index(coords).get_indexer(targets.ravel(), method="nearest").reshape(targets.shape)
+
+
+def nearest_indices(
+    targets: numpy.ndarray,
+    coords: numpy.ndarray,
+    ) -> numpy.ndarray:
+    """Returns the index of the nearest coordinate for every target, like `xarray.sel(..., method="nearest")`.
+
+    On a regular ascending axis, like the 0.001 m/s and 0.0001 kg/m³ axes of `create_lkl_from_xls`, the
+    index is the rounded position calculated from the spacing, so no pandas index is searched. Targets
+    about halfway between two coordinates, where the rounding of the stored coordinates decides, are
+    compared to both of them. The result equals `pandas.Index.get_indexer(method="nearest")` bit for bit,
+    i.e. ties go to the upper coordinate and targets outside of the axis get the first or last index.
+    Non finite targets and other axes are looked up by pandas.
+
+    Args:
+        targets (numpy.ndarray): Values to look up, of any shape.
+        coords (numpy.ndarray): Coordinates of the axis.
 
     Returns:
-        [type]: [description]
+        numpy.ndarray: Indices with the shape of `targets`.
+    """
+    targets = numpy.asarray(targets, dtype="float64")
+    coords = numpy.asarray(coords, dtype="float64")
+    last = coords.size - 1
+
+    spacing = numpy.diff(coords)
+    if coords.size < 2 or spacing[0] <= 0 or not numpy.allclose(spacing, spacing[0], rtol=REGULAR_AXIS_RTOL, atol=0):
+        return _pandas_nearest_indices(targets, coords)
+
+    # the mean spacing, so rounding of single coordinates does not add up over the axis
+    spacing = (coords[-1] - coords[0]) / last
+    # largest offset of a stored coordinate from the ideal regular axis, in units of the spacing
+    deviation = numpy.abs((coords - coords[0]) / spacing - numpy.arange(coords.size)).max()
+
+    position = (targets - coords[0]) / spacing
+    rounded = numpy.rint(position)
+    indices = numpy.fmin(numpy.fmax(rounded, 0), last).astype("int64")
+
+    # about halfway the distances to both stored coordinates are compared, ties go to the upper one like in pandas
+    with numpy.errstate(invalid="ignore"):
+        unsure = numpy.flatnonzero(~(numpy.abs(position - rounded) < 0.5 - deviation - POSITION_TOLERANCE))
+    if unsure.size:
+        unsure_targets = targets.ravel()[unsure]
+        lower = numpy.clip(numpy.floor(numpy.nan_to_num(position.ravel()[unsure])), 0, last - 1).astype("int64")
+        upper = lower + 1
+        indices.ravel()[unsure] = numpy.where(
+            numpy.abs(coords[lower] - unsure_targets) < numpy.abs(coords[upper] - unsure_targets), lower, upper)
+
+        missing = unsure[~numpy.isfinite(unsure_targets)]
+        if missing.size:
+            indices.ravel()[missing] = _pandas_nearest_indices(targets.ravel()[missing], coords)
+
+    return indices
+
+
+def lookup_power(
+    power: numpy.ndarray,
+    wspd_coords: numpy.ndarray,
+    rho_coords: numpy.ndarray,
+    wspd: numpy.ndarray,
+    rho: numpy.ndarray,
+    ) -> numpy.ndarray:
+    """Looks up the power of the nearest wspd and rho of a power curve, see `nearest_indices`.
+
+    Args:
+        power (numpy.ndarray): Power values of one curve with the dimensions (wspd, rho).
+        wspd_coords (numpy.ndarray): Wind speeds of the curve.
+        rho_coords (numpy.ndarray): Air densities of the curve.
+        wspd (numpy.ndarray): Wind speeds to look up, of any shape.
+        rho (numpy.ndarray): Air densities to look up, with the shape of `wspd`.
+
+    Returns:
+        numpy.ndarray: The power with the shape of `wspd`.
+
+    Raises:
+        KeyError: If pandas finds no index for a NaN target, like `xarray.sel` does.
+    """
+    wspd_indices = nearest_indices(wspd, wspd_coords)
+    rho_indices = nearest_indices(rho, rho_coords)
+    if (wspd_indices < 0).any() or (rho_indices < 0).any():
+        raise KeyError("not all values found in index 'wspd' or 'rho'")
+
+    return power[wspd_indices, rho_indices]
+
+class Lkl_array():
+    """A power curve (Leistungskennlinie) over wind speed and air density.
+
+    Args:
+        source_csv (str): csv file with the wind speeds as index and the air densities as columns.
+        xr_dataclass (Optional[XarrayDataType], optional): Build a DataArray or a Dataset. Defaults to XarrayDataType.DATAARRAY.
+        interpolated (Optional[bool], optional): Whether the curve is already interpolated. Defaults to False.
+        power_limiter (Optional[bool], optional): Whether the power is already limited. Defaults to False.
+        dtype (Optional[str], optional): Floating point type of the power values, e.g. `"float32"` to halve the
+            memory of the 0.001 m/s by 0.0001 kg/m³ curves. The wspd and rho coordinates stay float64, so the
+            selection in `get_power` is unchanged. float32 keeps about 7 significant digits, i.e. an error
+            below 1 W for turbines up to 10 MW. Defaults to None, which keeps float64.
     """
     def __init__(
         self,
@@ -33,17 +136,31 @@ class Lkl_array():
         xr_dataclass: Optional[XarrayDataType] = XarrayDataType.DATAARRAY,
         interpolated: Optional[bool] = False,
         power_limiter: Optional[bool] = False,
+        dtype: Optional[str] = None,
         #lkl_xarray = None,
         ):
         self.xr_dataclass = xr_dataclass
         self.interpolated = interpolated
         self.power_limiter = power_limiter
+        self.dtype = dtype
 
         self.lkl_pandas = self.__lkl_to_pandas(source_csv=source_csv)
         if self.xr_dataclass.value == "DataArray":
             self.lkl_xarray = self.__lkl_to_xarrayDataArray()
         if self.xr_dataclass.value == "Dataset":
             self.lkl_xarray = self.__lkl_to_xarrayDataset()
+        self.lkl_xarray = self.__apply_dtype(self.lkl_xarray)
+
+    def __apply_dtype(
+        self,
+        lkl,
+        ):
+        """Casts the power values to `dtype`, the wspd and rho coordinates are left untouched.
+        """
+        if not self.dtype:
+            return lkl
+
+        return lkl.astype(self.dtype)
 
     def __lkl_to_pandas(
         self,
@@ -137,6 +254,9 @@ class Lkl_array():
 
         if to_zero:
             self.lkl_xarray = self.wspd_to_zero()
+
+        # the cubic interpolation is done in float64
+        self.lkl_xarray = self.__apply_dtype(self.lkl_xarray)
         
         self.interpolated = True
 
@@ -170,7 +290,7 @@ class Lkl_array():
                 }
 
         zero_array = xarray.DataArray(
-            data=numpy.zeros((zero_wspd.size, zero_rho.size)),
+            data=numpy.zeros((zero_wspd.size, zero_rho.size), dtype=self.dtype or numpy.float64),
             coords=coords,
             attrs=None
         )
@@ -193,6 +313,18 @@ class Lkl_array():
         Returns:
             xarray.DataArray: [description]
         """
+        if sel_method is SelectMethod.NEAREST:
+            # the same integer selection xarray does after searching its pandas indexes
+            wspd_indices = nearest_indices(wspd, self.lkl_xarray.wspd.to_numpy())
+            rho_indices = nearest_indices(rho, self.lkl_xarray.rho.to_numpy())
+            if (wspd_indices < 0).any() or (rho_indices < 0).any():
+                raise KeyError("not all values found in index 'wspd' or 'rho'")
+
+            return self.lkl_xarray.isel(
+                wspd=xarray.DataArray(wspd_indices, dims='wea'),
+                rho=xarray.DataArray(rho_indices, dims='wea'),
+                )
+
         #### GOLDEN STEP ####
         data = self.lkl_xarray.sel(
                 wspd=xarray.DataArray(wspd, dims='wea'), 
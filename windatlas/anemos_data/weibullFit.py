@@ -0,0 +1,193 @@
+import argparse
+import os
+
+from typing import (
+                Optional,
+                List,
+                Tuple,
+                )
+
+import numpy
+import xarray
+from scipy.special import gammaln
+
+from anemosData import (
+                WindDataKind,
+                Mean3km10aWindData,
+                )
+from windStatistics import (
+                DEFAULT_TIME_BLOCK,
+                accumulate_tsnc_statistics,
+                )
+
+# range of the shape parameter k searched by the moment matching
+WEIBULL_K_BOUNDS = (0.1, 50.0)
+WEIBULL_K_ITERATIONS = 64
+
+
+def weibull_from_moments(
+    mean: numpy.ndarray,
+    variance: numpy.ndarray,
+    k_bounds: Tuple[float, float] = WEIBULL_K_BOUNDS,
+    iterations: int = WEIBULL_K_ITERATIONS,
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """Fits the Weibull scale A and shape k matching mean and variance of the wind speed exactly.
+
+    The squared coefficient of variation of a Weibull distribution only depends on k,
+    `1 + cv² = Γ(1 + 2/k) / Γ(1 + 1/k)²`, and decreases monotonically with k. It is solved for
+    every cell at once by bisection in log k, then `A = mean / Γ(1 + 1/k)`. Cells without
+    variance get the upper bound of k, cells without data NaN.
+
+    Args:
+        mean (numpy.ndarray): Mean wind speed per cell.
+        variance (numpy.ndarray): Variance of the wind speed per cell.
+        k_bounds (Tuple[float, float], optional): Search range of k. Defaults to WEIBULL_K_BOUNDS.
+        iterations (int, optional): Bisection steps, 64 reach float64 precision. Defaults to WEIBULL_K_ITERATIONS.
+
+    Returns:
+        Tuple[numpy.ndarray, numpy.ndarray]: A and k per cell.
+    """
+    mean = numpy.asarray(mean, dtype="float64")
+    variance = numpy.asarray(variance, dtype="float64")
+
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        target = numpy.log1p(variance / mean ** 2)
+
+    lower = numpy.full(mean.shape, numpy.log(k_bounds[0]))
+    upper = numpy.full(mean.shape, numpy.log(k_bounds[1]))
+    for _ in range(iterations):
+        middle = (lower + upper) / 2
+        k = numpy.exp(middle)
+        log_cv = gammaln(1 + 2 / k) - 2 * gammaln(1 + 1 / k)
+        # a too large coefficient of variation means k is still too small
+        too_small = log_cv > target
+        lower = numpy.where(too_small, middle, lower)
+        upper = numpy.where(too_small, upper, middle)
+
+    k = numpy.exp((lower + upper) / 2)
+    k = numpy.where(numpy.isnan(target), numpy.nan, k)
+    A = mean / numpy.exp(gammaln(1 + 1 / k))
+
+    return A, k
+
+
+def fit_tsnc_weibull(
+    time_frame: Optional[List[int]] = None,
+    months: Optional[List[int]] = None,
+    time_block: int = DEFAULT_TIME_BLOCK,
+    _wind_data_path: Optional[str] = None,
+    extent: Optional[List[float]] = None,
+    ) -> xarray.Dataset:
+    """Fits Weibull parameters for every grid cell and level from the TSNC-Format wind speed series.
+
+    The series are read in blocks of `time_block` time steps and only their moments are kept,
+    see `windStatistics.accumulate_tsnc_statistics`, so any period from a single month to all
+    ten years costs one pass over the data and the memory of a few grids.
+
+    Args:
+        time_frame (Optional[List[int]], optional): First and last year or date, like for `TsNcWindData`. Defaults to None.
+        months (Optional[List[int]], optional): Months to include, e.g. `[12, 1, 2]` for the winters. Defaults to None.
+        time_block (int, optional): Number of time steps loaded at once. Defaults to DEFAULT_TIME_BLOCK.
+        _wind_data_path (Optional[str], optional): Root path of the anemos data. Defaults to None.
+        extent (Optional[List[float]], optional): `[x_min, y_min, x_max, y_max]` in lambert coordinates. Defaults to None.
+
+    Returns:
+        xarray.Dataset: The variables `wbA`, `wbk` and the mean wind speed `wspd` on the grid of the series.
+    """
+    statistics, template = accumulate_tsnc_statistics(
+        wind_data_kind=WindDataKind.WINDSPEED,
+        time_frame=time_frame,
+        months=months,
+        time_block=time_block,
+        _wind_data_path=_wind_data_path,
+        extent=extent,
+        )
+
+    mean = numpy.where(statistics.count > 0, statistics.mean, numpy.nan)
+    A, k = weibull_from_moments(mean, statistics.variance(ddof=0))
+
+    return xarray.Dataset(
+        data_vars={
+            WindDataKind.WEIBULLA.value: (template.dims, A, {"long_name": "Weibull scale parameter A", "units": "m/s"}),
+            WindDataKind.WEIBULLK.value: (template.dims, k, {"long_name": "Weibull shape parameter k"}),
+            WindDataKind.WINDSPEED.value: (template.dims, mean, template.attrs),
+            },
+        coords=template.coords,
+        attrs={"time_frame": str(time_frame), "months": str(months)},
+        )
+
+
+def write_weibull_parameters(
+    output_path: str,
+    period: str,
+    time_frame: Optional[List[int]] = None,
+    months: Optional[List[int]] = None,
+    with_airdensity: bool = True,
+    time_block: int = DEFAULT_TIME_BLOCK,
+    _wind_data_path: Optional[str] = None,
+    ) -> List[str]:
+    """Fits and writes the Weibull parameter grids of a custom period for the Weibull AEP path.
+
+    The files are named like `Mean3km10aWindData._file_pattern`, so with `output_path` being the
+    `Statistics/10-Jahresmittel/` folder of a data root they are loaded by
+    `Mean3km10aWindData(..., period=period)`. With `with_airdensity` the mean air density of the
+    period is written as well, so `WeaPoints.get_windpower_out` finds all inputs of the Weibull AEP.
+
+    Args:
+        output_path (str): Directory to write the files to.
+        period (str): Label of the period used in the file names, e.g. "2015" or "2009-2018.DJF".
+        time_frame (Optional[List[int]], optional): First and last year or date. Defaults to None.
+        months (Optional[List[int]], optional): Months to include. Defaults to None.
+        with_airdensity (bool, optional): Also write the mean air density. Defaults to True.
+        time_block (int, optional): Number of time steps loaded at once. Defaults to DEFAULT_TIME_BLOCK.
+        _wind_data_path (Optional[str], optional): Root path of the anemos data. Defaults to None.
+
+    Returns:
+        List[str]: Paths of the written files.
+    """
+    os.makedirs(output_path, exist_ok=True)
+
+    parameters = fit_tsnc_weibull(
+        time_frame=time_frame,
+        months=months,
+        time_block=time_block,
+        _wind_data_path=_wind_data_path,
+        )
+
+    if with_airdensity:
+        statistics, template = accumulate_tsnc_statistics(
+            wind_data_kind=WindDataKind.AIRDENSITY,
+            time_frame=time_frame,
+            months=months,
+            time_block=time_block,
+            _wind_data_path=_wind_data_path,
+            )
+        rho = numpy.where(statistics.count > 0, statistics.mean, numpy.nan)
+        parameters[WindDataKind.AIRDENSITY.value] = (template.dims, rho, template.attrs)
+
+    paths = []
+    for name in parameters.data_vars:
+        path = os.path.join(output_path, Mean3km10aWindData._file_pattern.format(kind=name, period=period))
+        parameters[[name]].to_netcdf(path, mode="w")
+        paths.append(path)
+
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit Weibull parameter grids of a custom period from anemos TSNC-Format data.")
+    parser.add_argument("output_path", help="directory to write the parameter grids to")
+    parser.add_argument("period", help="period label used in the file names, e.g. 2015")
+    parser.add_argument("--time-frame", nargs=2, default=None, help="first and last year or date, e.g. 2015 2015")
+    parser.add_argument("--months", nargs="+", type=int, default=None, help="months to include, e.g. 12 1 2")
+    parser.add_argument("--data-path", default=None, help="root path of the anemos data")
+    args = parser.parse_args()
+
+    written = write_weibull_parameters(
+        output_path=args.output_path,
+        period=args.period,
+        time_frame=args.time_frame,
+        months=args.months,
+        _wind_data_path=args.data_path,
+        )
+    print(f"{len(written)} files written to {args.output_path}")
@@ -0,0 +1,173 @@
+from typing import (
+                Optional,
+                List,
+                )
+
+import numpy
+import xarray
+
+from anemosData import (
+                WindDataKind,
+                InterpolationMethod,
+                TsNcWindData,
+                )
+
+DEFAULT_SECTORS = 12
+# number of 10 min time steps extracted at once, one week, about 160 MB of wdir and wspd as float64 for 10000 points
+DEFAULT_TIME_BLOCK = 1008
+
+
+class WindRose():
+    """Online accumulator of direction and speed histograms for many points.
+
+    Every update bins all time steps of all points with one `numpy.bincount` over combined
+    (point, sector) and (point, sector, speed bin) indices, so the histograms of any time
+    window are built in a single pass over the series, one block after another.
+
+    Sector 0 is centered on north, e.g. covering -15° to 15° for 12 sectors.
+
+    Args:
+        num_points (int): Number of points.
+        sectors (int): Number of direction sectors. Defaults to DEFAULT_SECTORS.
+        speed_bin_edges (Optional[numpy.ndarray]): Wind speed bin edges of the joint direction and speed
+            histogram. Defaults to None, which keeps no speed histogram.
+    """
+
+    def __init__(
+        self,
+        num_points: int,
+        sectors: int = DEFAULT_SECTORS,
+        speed_bin_edges: Optional[numpy.ndarray] = None,
+        ):
+
+        self.num_points = num_points
+        self.sectors = sectors
+        self.sector_width = 360 / sectors
+
+        self.counts = numpy.zeros((num_points, sectors), dtype="int64")
+        self.wspd_sum = numpy.zeros((num_points, sectors), dtype="float64")
+
+        self.speed_bin_edges = None
+        self.speed_counts = None
+        if speed_bin_edges is not None:
+            self.speed_bin_edges = numpy.asarray(speed_bin_edges, dtype="float64")
+            self.speed_counts = numpy.zeros((num_points, sectors, self.speed_bin_edges.size - 1), dtype="int64")
+
+    def update(
+        self,
+        wdir: numpy.ndarray,
+        wspd: numpy.ndarray,
+        ):
+        """Adds a block of time steps with the shape (point, time) to the histograms. NaN values are skipped.
+        """
+        wdir = numpy.asarray(wdir, dtype="float64")
+        wspd = numpy.asarray(wspd, dtype="float64")
+        valid = ~(numpy.isnan(wdir) | numpy.isnan(wspd))
+
+        sector = (numpy.mod(numpy.where(valid, wdir, 0) + self.sector_width / 2, 360) // self.sector_width).astype("int64")
+        sector = numpy.minimum(sector, self.sectors - 1)
+        flat = (numpy.arange(self.num_points)[:, None] * self.sectors + sector)[valid]
+
+        self.counts += numpy.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+        self.wspd_sum += numpy.bincount(flat, weights=wspd[valid], minlength=self.counts.size).reshape(self.counts.shape)
+
+        if self.speed_counts is not None:
+            num_bins = self.speed_bin_edges.size - 1
+            speed_bin = numpy.clip(numpy.searchsorted(self.speed_bin_edges, wspd[valid], side="right") - 1, 0, num_bins - 1)
+            counts = numpy.bincount(flat * num_bins + speed_bin, minlength=self.speed_counts.size)
+            self.speed_counts += counts.reshape(self.speed_counts.shape)
+
+    def to_dataset(self) -> xarray.Dataset:
+        """Returns the histograms in the layout of the anemos `dirhistos` data.
+
+        The variables `histo` (share of the time steps per sector in %) and `wspd` (mean wind speed
+        per sector) can be plotted with `weaPoints._circularHisto` for a single point, e.g.
+        `_circularHisto(rose.isel(point=0), "histo")`. `klassengrenzen` holds the lower sector bounds.
+
+        Returns:
+            xarray.Dataset: Histograms with the dimensions (point, sector) and, with speed bins, `speed_histo`
+                with the dimensions (point, sector, speed_bin) in % of all time steps.
+        """
+        total = self.counts.sum(axis=1, keepdims=True)
+        histo = numpy.divide(self.counts * 100, total, out=numpy.full(self.counts.shape, numpy.nan), where=total > 0)
+        wspd = numpy.divide(self.wspd_sum, self.counts, out=numpy.full(self.counts.shape, numpy.nan), where=self.counts > 0)
+
+        centers = numpy.arange(self.sectors) * self.sector_width
+        data_vars = {
+            "histo": (["point", "sector"], histo, {"units": "%", "long_name": "Haeufigkeit der Windrichtung"}),
+            "wspd": (["point", "sector"], wspd, {"units": "m/s", "long_name": "mittlere Windgeschwindigkeit je Richtung"}),
+            "klassengrenzen": (["sector"], centers - self.sector_width / 2, {"units": "degree"}),
+            }
+        coords = {"sector": centers}
+
+        if self.speed_counts is not None:
+            speed_histo = numpy.divide(
+                self.speed_counts * 100,
+                total[:, :, None],
+                out=numpy.full(self.speed_counts.shape, numpy.nan),
+                where=total[:, :, None] > 0,
+                )
+            data_vars["speed_histo"] = (["point", "sector", "speed_bin"], speed_histo, {"units": "%"})
+            coords["speed_bin"] = self.speed_bin_edges[:-1]
+
+        return xarray.Dataset(data_vars, coords=coords)
+
+
+def tsnc_wind_rose(
+    xs: numpy.ndarray,
+    ys: numpy.ndarray,
+    levels: numpy.ndarray,
+    time_frame: Optional[List[int]] = None,
+    sectors: int = DEFAULT_SECTORS,
+    speed_bin_edges: Optional[numpy.ndarray] = None,
+    method: Optional[InterpolationMethod] = InterpolationMethod.LINEAR,
+    time_block: int = DEFAULT_TIME_BLOCK,
+    _wind_data_path: Optional[str] = None,
+    ) -> xarray.Dataset:
+    """Builds direction and speed histograms of many points from the TSNC-Format `wdir` and `wspd` series.
+
+    The series are extracted and binned one block of `time_block` time steps after another, so
+    memory stays bounded by one block of point series whatever the time frame. The wind direction
+    is always taken from the nearest grid point, since a linear interpolation of angles breaks at north.
+
+    Args:
+        xs (numpy.ndarray): x coordinates of the points in the anemos lambert projection.
+        ys (numpy.ndarray): y coordinates of the points in the anemos lambert projection.
+        levels (numpy.ndarray): Hub heights of the points.
+        time_frame (Optional[List[int]], optional): First and last year or date, like for `TsNcWindData`. Defaults to None.
+        sectors (int, optional): Number of direction sectors. Defaults to DEFAULT_SECTORS.
+        speed_bin_edges (Optional[numpy.ndarray], optional): Wind speed bin edges, see `WindRose`. Defaults to None.
+        method (Optional[InterpolationMethod], optional): Interpolation method of the wind speed. Defaults to InterpolationMethod.LINEAR.
+        time_block (int, optional): Number of time steps extracted at once. Defaults to DEFAULT_TIME_BLOCK.
+        _wind_data_path (Optional[str], optional): Root path of the anemos data. Defaults to None.
+
+    Returns:
+        xarray.Dataset: The histograms of `WindRose.to_dataset`.
+    """
+    xs = numpy.atleast_1d(xs)
+    method = InterpolationMethod(method.value)
+    rose = WindRose(xs.size, sectors=sectors, speed_bin_edges=speed_bin_edges)
+
+    # every year file is split into blocks of time_block time steps, each extracted with its exact time frame
+    years = TsNcWindData(wind_data_kind=WindDataKind.WINDSPEED, time_frame=time_frame, _wind_data_path=_wind_data_path, mfdataset=False)
+    try:
+        block_frames = [
+            [data.time.values[start], data.time.values[min(start + time_block, data.time.size) - 1]]
+            for data in years.winddata
+            for start in range(0, data.time.size, time_block)
+            ]
+    finally:
+        years.close()
+
+    for block_frame in block_frames:
+        blocks = {}
+        for kind, kind_method in [(WindDataKind.WINDDIRECTION, InterpolationMethod.NEAREST), (WindDataKind.WINDSPEED, method)]:
+            source = TsNcWindData(wind_data_kind=kind, time_frame=block_frame, _wind_data_path=_wind_data_path, mfdataset=False)
+            try:
+                blocks[kind] = source.interp_points(xs, ys, levels, method=kind_method)[kind.value].transpose("point", "time").to_numpy()
+            finally:
+                source.close()
+
+        rose.update(blocks[WindDataKind.WINDDIRECTION], blocks[WindDataKind.WINDSPEED])
+
+    return rose.to_dataset()
@@ -0,0 +1,387 @@
+import argparse
+import os
+
+from typing import (
+                Optional,
+                List,
+                Iterator,
+                Tuple,
+                )
+
+import numpy
+import pandas
+import xarray
+
+from anemosData import (
+                WindDataKind,
+                TsNcWindData,
+                Mean3km1aWindData,
+                )
+
+# number of 10 min time steps loaded at once, four hours, about 134 MB as float64 for the 310 x 225 x 10 grid
+DEFAULT_TIME_BLOCK = 24
+# number of grid cells binned at once, bounds the temporary memory of the histogram update and percentiles
+HISTOGRAM_CELL_CHUNK = 65536
+
+# bin edges of the histograms the percentiles are estimated from
+DEFAULT_BIN_EDGES = {
+    WindDataKind.WINDSPEED.value: numpy.arange(0, 40.25, 0.25),
+    WindDataKind.AIRDENSITY.value: numpy.arange(0.9, 1.455, 0.005),
+    }
+
+# file names of the written statistics per period frequency
+STATISTICS_FILE_PATTERNS = {
+    "Y": Mean3km1aWindData._file_pattern,
+    "M": "{kind}.10L.mm.{year}.nc",
+    }
+
+
+class StreamingStatistics():
+    """Online accumulator of per grid cell count, mean, variance and histogram.
+
+    Blocks of time steps are merged one after another with the parallel variant of Welford's
+    algorithm, so the statistics of a whole year never need more than one block and the
+    accumulators in memory. Percentiles are estimated from a fixed-bin histogram, filled with
+    `numpy.bincount`, and are exact up to the linear interpolation inside one bin. Values outside
+    of the bin edges are counted in the first or last bin. NaN values are ignored.
+
+    `update` holds the block as float64, one float64 working copy and a boolean mask, so with the
+    float32 values read from the files the peak memory is about 2.6 times the float64 block plus
+    the accumulators: 0.35 GB for a block of DEFAULT_TIME_BLOCK steps of the 310 x 225 x 10 grid,
+    2.1 GB for a whole day of 144 steps. The accumulators take 24 bytes per cell and the
+    histogram 4 bytes per cell and bin, 0.45 GB for the wind speed bins of that grid.
+
+    Args:
+        shape (Tuple[int, ...]): Shape of one time step, e.g. (y, x, level).
+        bin_edges (Optional[numpy.ndarray]): Monotonically increasing histogram bin edges. Defaults to None,
+            which keeps no histogram and therefore supports no percentiles.
+    """
+
+    def __init__(
+        self,
+        shape: Tuple[int, ...],
+        bin_edges: Optional[numpy.ndarray] = None,
+        ):
+
+        self.shape = tuple(shape)
+        self.count = numpy.zeros(self.shape, dtype="int64")
+        self.mean = numpy.zeros(self.shape, dtype="float64")
+        self.m2 = numpy.zeros(self.shape, dtype="float64")
+
+        self.bin_edges = None
+        self.histogram = None
+        if bin_edges is not None:
+            self.bin_edges = numpy.asarray(bin_edges, dtype="float64")
+            self.histogram = numpy.zeros((int(numpy.prod(self.shape)), self.bin_edges.size - 1), dtype="uint32")
+
+    def update(
+        self,
+        block: numpy.ndarray,
+        ):
+        """Merges a block of time steps with the shape (time, *shape) into the statistics.
+        """
+        block = numpy.asarray(block, dtype="float64")
+        valid = ~numpy.isnan(block)
+
+        # a single working copy, updated in place, bounds the temporaries of large blocks
+        deviation = numpy.where(valid, block, 0)
+        block_count = valid.sum(axis=0)
+        block_mean = numpy.divide(
+            deviation.sum(axis=0),
+            block_count,
+            out=numpy.zeros(self.shape),
+            where=block_count > 0,
+            )
+        deviation -= block_mean
+        deviation *= valid
+        deviation **= 2
+        block_m2 = deviation.sum(axis=0)
+        del deviation
+
+        total = self.count + block_count
+        delta = block_mean - self.mean
+        block_share = numpy.divide(block_count, total, out=numpy.zeros(self.shape), where=total > 0)
+
+        self.mean += delta * block_share
+        self.m2 += block_m2 + delta ** 2 * self.count * block_share
+        self.count = total
+
+        if self.histogram is not None:
+            self.__update_histogram(block, valid)
+
+    def __update_histogram(
+        self,
+        block: numpy.ndarray,
+        valid: numpy.ndarray,
+        ):
+
+        num_bins = self.bin_edges.size - 1
+        block = block.reshape(block.shape[0], -1)
+        valid = valid.reshape(block.shape[0], -1)
+
+        for start in range(0, block.shape[1], HISTOGRAM_CELL_CHUNK):
+            stop = min(start + HISTOGRAM_CELL_CHUNK, block.shape[1])
+            bins = numpy.clip(numpy.searchsorted(self.bin_edges, block[:, start:stop], side="right") - 1, 0, num_bins - 1)
+            # one bincount over (cell, bin) pairs of all time steps of the block
+            flat = (numpy.arange(stop - start) * num_bins + bins)[valid[:, start:stop]]
+            counts = numpy.bincount(flat, minlength=(stop - start) * num_bins)
+            self.histogram[start:stop] += counts.reshape(stop - start, num_bins).astype("uint32")
+
+    def variance(
+        self,
+        ddof: int = 1,
+        ) -> numpy.ndarray:
+        """Returns the variance per grid cell, NaN where less than `ddof` + 1 values were merged.
+        """
+        return numpy.divide(self.m2, self.count - ddof, out=numpy.full(self.shape, numpy.nan), where=self.count > ddof)
+
+    def percentiles(
+        self,
+        q: List[float],
+        ) -> numpy.ndarray:
+        """Estimates percentiles per grid cell from the histogram.
+
+        Args:
+            q (List[float]): Percentiles between 0 and 100.
+
+        Raises:
+            ValueError: If the statistics were created without bin edges.
+
+        Returns:
+            numpy.ndarray: Percentiles with the shape (len(q), *shape).
+        """
+        if self.histogram is None:
+            raise ValueError("Percentiles need a histogram, pass bin_edges to StreamingStatistics.")
+
+        q = numpy.atleast_1d(q)
+        result = numpy.full((q.size, self.histogram.shape[0]), numpy.nan)
+
+        for start in range(0, self.histogram.shape[0], HISTOGRAM_CELL_CHUNK):
+            histogram = self.histogram[start:start + HISTOGRAM_CELL_CHUNK]
+            cumulative = numpy.cumsum(histogram, axis=1, dtype="int64")
+            total = cumulative[:, -1]
+            cells = numpy.arange(cumulative.shape[0])
+
+            for i, percentile in enumerate(q):
+                target = percentile / 100 * total
+                idx = numpy.minimum((cumulative < target[:, None]).sum(axis=1), cumulative.shape[1] - 1)
+                below = numpy.where(idx > 0, cumulative[cells, numpy.maximum(idx - 1, 0)], 0)
+                in_bin = histogram[cells, idx]
+                share = numpy.divide(target - below, in_bin, out=numpy.zeros(total.shape), where=in_bin > 0)
+
+                value = self.bin_edges[idx] + share * (self.bin_edges[idx + 1] - self.bin_edges[idx])
+                result[i, start:start + HISTOGRAM_CELL_CHUNK] = numpy.where(total > 0, value, numpy.nan)
+
+        return result.reshape((q.size, *self.shape))
+
+
+def iter_tsnc_statistics(
+    wind_data_kind: WindDataKind,
+    time_frame: Optional[List[int]] = None,
+    freq: str = "Y",
+    percentiles: Optional[List[float]] = None,
+    bin_edges: Optional[numpy.ndarray] = None,
+    time_block: int = DEFAULT_TIME_BLOCK,
+    _wind_data_path: Optional[str] = None,
+    extent: Optional[List[float]] = None,
+    ) -> Iterator[Tuple[pandas.Period, xarray.Dataset]]:
+    """Calculates mean, variance and percentiles per grid cell and period in one streaming pass over the TSNC-Format files.
+
+    The year files are read `time_block` time steps at a time and merged into one
+    `StreamingStatistics` per period, so memory stays bounded by one block and the accumulators,
+    see `StreamingStatistics` for the peak memory per block.
+
+    Args:
+        wind_data_kind (WindDataKind): Variable to calculate the statistics of.
+        time_frame (Optional[List[int]], optional): First and last year or date, like for `TsNcWindData`. Defaults to None.
+        freq (str, optional): pandas period frequency, "Y" for annual or "M" for monthly statistics. Defaults to "Y".
+        percentiles (Optional[List[float]], optional): Percentiles between 0 and 100 to estimate. Defaults to None.
+        bin_edges (Optional[numpy.ndarray], optional): Histogram bin edges for the percentiles. Defaults to None,
+            which uses DEFAULT_BIN_EDGES of the variable.
+        time_block (int, optional): Number of time steps loaded at once. Defaults to DEFAULT_TIME_BLOCK.
+        _wind_data_path (Optional[str], optional): Root path of the anemos data. Defaults to None.
+        extent (Optional[List[float]], optional): `[x_min, y_min, x_max, y_max]` in lambert coordinates. Defaults to None.
+
+    Raises:
+        ValueError: If percentiles are requested for a variable without DEFAULT_BIN_EDGES and no bin_edges are passed.
+
+    Yields:
+        Tuple[pandas.Period, xarray.Dataset]: The period and its statistics with the variables `{kind}` (mean),
+            `{kind}_var`, `{kind}_count` and `{kind}_p{percentile}`.
+    """
+    kind = wind_data_kind.value
+    if percentiles and bin_edges is None:
+        if kind not in DEFAULT_BIN_EDGES:
+            raise ValueError(f"No default bin edges for '{kind}', pass bin_edges to calculate percentiles.")
+        bin_edges = DEFAULT_BIN_EDGES[kind]
+
+    source = TsNcWindData(
+        wind_data_kind=wind_data_kind,
+        time_frame=time_frame,
+        _wind_data_path=_wind_data_path,
+        mfdataset=False,
+        extent=extent,
+        )
+
+    # the files are also closed if a consumer stops iterating early or a block fails to load
+    try:
+        period, statistics, template = None, None, None
+        for data in source.winddata:
+            variable = data[kind]
+            periods = pandas.DatetimeIndex(data.time.values).to_period(freq)
+
+            for start in range(0, data.time.size, time_block):
+                # transposed to time first after loading, a lazily transposed read costs several blocks of memory
+                values = variable.isel(time=slice(start, start + time_block)).load().transpose("time", ...).to_numpy()
+                block_periods = periods[start:start + time_block]
+
+                for block_period in pandas.unique(block_periods):
+                    if block_period != period:
+                        if statistics is not None:
+                            yield period, _statistics_dataset(statistics, template, kind, percentiles)
+                        period = block_period
+                        template = variable.isel(time=0, drop=True)
+                        statistics = StreamingStatistics(template.shape, bin_edges=bin_edges if percentiles else None)
+
+                    statistics.update(values[block_periods == block_period])
+
+        if statistics is not None:
+            yield period, _statistics_dataset(statistics, template, kind, percentiles)
+
+    finally:
+        source.close()
+
+
+def accumulate_tsnc_statistics(
+    wind_data_kind: WindDataKind,
+    time_frame: Optional[List[int]] = None,
+    months: Optional[List[int]] = None,
+    bin_edges: Optional[numpy.ndarray] = None,
+    time_block: int = DEFAULT_TIME_BLOCK,
+    _wind_data_path: Optional[str] = None,
+    extent: Optional[List[float]] = None,
+    ) -> Tuple[StreamingStatistics, xarray.DataArray]:
+    """Merges all time steps of the time frame into a single `StreamingStatistics` in one streaming pass.
+
+    Unlike `iter_tsnc_statistics` the statistics are not split into periods, but can be restricted to
+    some months of every year, e.g. `[12, 1, 2]` for the winters of the time frame.
+
+    Args:
+        wind_data_kind (WindDataKind): Variable to calculate the statistics of.
+        time_frame (Optional[List[int]], optional): First and last year or date, like for `TsNcWindData`. Defaults to None.
+        months (Optional[List[int]], optional): Months to include. Defaults to None, which includes all months.
+        bin_edges (Optional[numpy.ndarray], optional): Histogram bin edges, see `StreamingStatistics`. Defaults to None.
+        time_block (int, optional): Number of time steps loaded at once. Defaults to DEFAULT_TIME_BLOCK.
+        _wind_data_path (Optional[str], optional): Root path of the anemos data. Defaults to None.
+        extent (Optional[List[float]], optional): `[x_min, y_min, x_max, y_max]` in lambert coordinates. Defaults to None.
+
+    Returns:
+        Tuple[StreamingStatistics, xarray.DataArray]: The statistics and a single time step of the variable
+            carrying the dimensions and coordinates of the grid.
+    """
+    kind = wind_data_kind.value
+    source = TsNcWindData(
+        wind_data_kind=wind_data_kind,
+        time_frame=time_frame,
+        _wind_data_path=_wind_data_path,
+        mfdataset=False,
+        extent=extent,
+        )
+
+    try:
+        statistics, template = None, None
+        for data in source.winddata:
+            variable = data[kind]
+            if months:
+                variable = variable.isel(time=numpy.flatnonzero(numpy.isin(data.time.dt.month.values, months)))
+
+            if statistics is None:
+                template = data[kind].isel(time=0, drop=True)
+                statistics = StreamingStatistics(template.shape, bin_edges=bin_edges)
+
+            for start in range(0, variable.time.size, time_block):
+                # transposed to time first after loading, a lazily transposed read costs several blocks of memory
+                statistics.update(variable.isel(time=slice(start, start + time_block)).load().transpose("time", ...).to_numpy())
+
+    finally:
+        source.close()
+
+    return statistics, template
+
+
+def _statistics_dataset(
+    statistics: StreamingStatistics,
+    template: xarray.DataArray,
+    kind: str,
+    percentiles: Optional[List[float]] = None,
+    ) -> xarray.Dataset:
+
+    data_vars = {
+        kind: (template.dims, statistics.mean, template.attrs),
+        f"{kind}_var": (template.dims, statistics.variance()),
+        f"{kind}_count": (template.dims, statistics.count),
+        }
+    if percentiles:
+        for percentile, values in zip(percentiles, statistics.percentiles(percentiles)):
+            data_vars[f"{kind}_p{percentile:g}"] = (template.dims, values)
+
+    return xarray.Dataset(data_vars, coords=template.coords)
+
+
+def write_tsnc_statistics(
+    wind_data_kind: WindDataKind,
+    output_path: str,
+    freq: str = "Y",
+    **statistics_kwargs,
+    ) -> List[str]:
+    """Writes the statistics of `iter_tsnc_statistics` to one netCDF file per period.
+
+    Annual files are named like `Mean3km1aWindData._file_pattern`, so they can be loaded with
+    `Mean3km1aWindData(..., _wind_data_path=...)` if `output_path` is its `Statistics/Jahresmittel/` folder.
+
+    Args:
+        wind_data_kind (WindDataKind): Variable to calculate the statistics of.
+        output_path (str): Directory to write the files to.
+        freq (str, optional): "Y" for annual or "M" for monthly statistics. Defaults to "Y".
+        **statistics_kwargs: Further arguments passed to `iter_tsnc_statistics`.
+
+    Raises:
+        NotImplementedError: If a frequency other than "Y" or "M" is passed.
+
+    Returns:
+        List[str]: Paths of the written files.
+    """
+    if freq not in STATISTICS_FILE_PATTERNS:
+        raise NotImplementedError(f"Statistics files can only be written for the frequencies {list(STATISTICS_FILE_PATTERNS)}.")
+
+    os.makedirs(output_path, exist_ok=True)
+
+    paths = []
+    for period, statistics in iter_tsnc_statistics(wind_data_kind, freq=freq, **statistics_kwargs):
+        path = os.path.join(output_path, STATISTICS_FILE_PATTERNS[freq].format(kind=wind_data_kind.value, year=period))
+        statistics.to_netcdf(path, mode="w")
+        paths.append(path)
+
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calculate annual or monthly statistics from anemos TSNC-Format data.")
+    parser.add_argument("output_path", help="directory to write the statistics files to")
+    parser.add_argument("--kinds", nargs="+", default=[WindDataKind.WINDSPEED.value], help="wind data kinds to process, e.g. wspd rho")
+    parser.add_argument("--years", nargs=2, type=int, default=None, help="first and last year to process")
+    parser.add_argument("--freq", default="Y", choices=list(STATISTICS_FILE_PATTERNS), help="Y for annual or M for monthly statistics")
+    parser.add_argument("--percentiles", nargs="+", type=float, default=None, help="percentiles to estimate, e.g. 10 50 90")
+    parser.add_argument("--data-path", default=None, help="root path of the anemos data")
+    args = parser.parse_args()
+
+    for kind in args.kinds:
+        written = write_tsnc_statistics(
+            wind_data_kind=WindDataKind(kind),
+            output_path=args.output_path,
+            freq=args.freq,
+            time_frame=args.years,
+            percentiles=args.percentiles,
+            _wind_data_path=args.data_path,
+            )
+        print(f"{kind}: {len(written)} files written to {args.output_path}")
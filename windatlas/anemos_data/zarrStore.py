@@ -0,0 +1,196 @@
+import argparse
+import os
+
+from typing import (
+                Optional,
+                List,
+                Tuple,
+                )
+
+import numpy
+import xarray
+
+from anemosData import (
+                WindDataKind,
+                TsNcWindData,
+                )
+
+# x and y grid cells per chunk, a 2 x 2 cell neighbourhood of a turbine lies in 1 to 4 tiles
+DEFAULT_TILE_SIZE = 2
+
+
+def _axis_passes(
+    size: int,
+    source_chunk: int,
+    tile_size: int,
+    ) -> List[Tuple[int, int, int]]:
+    """Splits one axis into passes reading one source chunk each, see `convert_tsnc_to_zarr`.
+
+    Returns:
+        List[Tuple[int, int, int]]: Start and stop of the read and stop of the write of every pass.
+            A pass writes the tiles up to the last tile boundary it reached, the last pass up to `size`.
+    """
+    passes = []
+    for start in range(0, size, source_chunk):
+        stop = min(start + source_chunk, size)
+        write_stop = size if stop == size else stop // tile_size * tile_size
+        passes.append((start, stop, write_stop))
+
+    return passes
+
+
+def _axis_slice(
+    values: numpy.ndarray,
+    axis: int,
+    start: Optional[int],
+    stop: Optional[int] = None,
+    ) -> numpy.ndarray:
+    index = [slice(None)] * values.ndim
+    index[axis] = slice(start, stop)
+
+    return values[tuple(index)]
+
+
+def _convert_year(
+    data: xarray.Dataset,
+    name: str,
+    path: str,
+    tile_size: int,
+    time_chunk: Optional[int],
+    ):
+    """Writes the variable `name` of the lazily opened data of one year file to the Zarr store `path`.
+    """
+    variable = data[name]
+    time_chunk = time_chunk or data.time.size
+    chunks = {"time": time_chunk, "y": tile_size, "x": tile_size}
+    if "level" in data.dims:
+        chunks["level"] = 1
+
+    # writing the metadata and coordinates, the data variable is filled pass by pass below
+    template = data.assign({name: variable.chunk(chunks)})
+    for template_variable in template.variables.values():
+        template_variable.encoding = {}
+    template.to_zarr(path, mode="w", compute=False)
+
+    # passes follow the chunks of the source file, of contiguous files the tiles
+    source_chunks = variable.encoding.get("preferred_chunks", {})
+    y_passes = _axis_passes(data.y.size, source_chunks.get("y", tile_size), tile_size)
+    x_passes = _axis_passes(data.x.size, source_chunks.get("x", tile_size), tile_size)
+    y_axis, x_axis = variable.get_axis_num("y"), variable.get_axis_num("x")
+
+    levels = range(data.level.size) if "level" in data.dims else [None]
+    for level in levels:
+        for time_start in range(0, data.time.size, time_chunk):
+            region = {"time": slice(time_start, time_start + time_chunk)}
+            if level is not None:
+                region["level"] = slice(level, level + 1)
+
+            # rows read but not written yet, over the full x axis
+            carried_rows = None
+            y_written = 0
+            for y_start, y_stop, y_write in y_passes:
+                # columns read but not written yet, of the rows of this pass
+                carried_columns = None
+                rows = []
+                x_written = 0
+                for x_start, x_stop, x_write in x_passes:
+                    box = variable.isel(dict(region, y=slice(y_start, y_stop), x=slice(x_start, x_stop))).to_numpy()
+                    if carried_rows is not None:
+                        box = numpy.concatenate([_axis_slice(carried_rows, x_axis, x_start, x_stop), box], axis=y_axis)
+                    if carried_columns is not None:
+                        box = numpy.concatenate([carried_columns, box], axis=x_axis)
+
+                    if y_write > y_written and x_write > x_written:
+                        tiles = _axis_slice(_axis_slice(box, y_axis, 0, y_write - y_written), x_axis, 0, x_write - x_written)
+                        xarray.Dataset({name: (variable.dims, tiles)}).to_zarr(
+                            path,
+                            region=dict(region, y=slice(y_written, y_write), x=slice(x_written, x_write)),
+                            )
+
+                    carried_columns = _axis_slice(box, x_axis, x_write - x_written)
+                    rows.append(_axis_slice(_axis_slice(box, y_axis, y_write - y_written), x_axis, 0, x_write - x_written))
+                    x_written = x_write
+
+                carried_rows = numpy.concatenate(rows, axis=x_axis) if y_write < y_stop else None
+                y_written = y_write
+
+
+def convert_tsnc_to_zarr(
+    wind_data_kind: WindDataKind,
+    store_path: str,
+    time_frame: Optional[List[int]] = None,
+    _wind_data_path: Optional[str] = None,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    time_chunk: Optional[int] = None,
+    ) -> List[str]:
+    """Rechunks the TSNC-Format files of one variable into Zarr stores made for point access.
+
+    The `{kind}.10L.{year}.ts.nc` files are chunked for whole-field access, so the time series
+    of a single point is spread over hundreds of chunks. Every year file is written to a store
+    `{kind}.10L.{year}.ts.zarr` holding the whole year, 52560 or 52704 time steps, of a
+    `tile_size` x `tile_size` tile of x/y and a single level per chunk, so the time series of
+    one turbine is a handful of chunk reads per year. The time chunk follows the length of every
+    file, which a single store with regular chunks could not do for leap years.
+
+    With the defaults one float32 chunk holds 2 x 2 x 52,560 values, about 0.84 MB. A linearly
+    interpolated turbine touches 1 to 4 tiles at both bracketing levels, i.e. 2 to 8 chunks or
+    1.7 to 6.7 MB per year and 17 to 67 MB for all ten years. `tile_size=1` reads exactly the
+    2 x 2 x 2 corner series, 8 chunks or 1.7 MB per year, at four times the number of chunks.
+
+    The stores are filled one box of the source file chunks at a time, e.g. 31 x 45 cells of one
+    level for the (31, 45, 1, 144) chunks of the anemos files, so every source chunk is
+    decompressed once. The box is split into tiles in memory, the rows and columns past its last
+    tile boundary are carried over to the next box. Memory use stays bounded by about one box
+    plus one carried row and column, about 310 MB for a year of float32 data.
+
+    Args:
+        wind_data_kind (WindDataKind): Variable to convert, one store is written per variable and year file.
+        store_path (str): Directory to write the stores `{kind}.10L.{year}.ts.zarr` to.
+        time_frame (Optional[List[int]], optional): First and last year to convert. Defaults to None, which converts all years.
+        _wind_data_path (Optional[str], optional): Root path of the anemos data. Defaults to None.
+        tile_size (int, optional): Number of x and y grid cells per chunk. Defaults to DEFAULT_TILE_SIZE.
+        time_chunk (Optional[int], optional): Number of time steps per chunk. Defaults to None, which
+            uses the time length of every year file.
+
+    Returns:
+        List[str]: Paths of the written stores.
+    """
+    source = TsNcWindData(
+        wind_data_kind=wind_data_kind,
+        time_frame=time_frame,
+        _wind_data_path=_wind_data_path,
+        mfdataset=False,
+        )
+
+    paths = []
+    try:
+        for data, year_path in zip(source.winddata, source._year_paths):
+            path = os.path.join(store_path, os.path.basename(year_path)[:-len("nc")] + "zarr")
+            _convert_year(data, wind_data_kind.value, path, tile_size, time_chunk)
+            paths.append(path)
+    finally:
+        source.close()
+
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rechunk anemos TSNC-Format data to point-access Zarr stores.")
+    parser.add_argument("store_path", help="directory to write the Zarr stores to")
+    parser.add_argument("--kinds", nargs="+", default=[WindDataKind.WINDSPEED.value, WindDataKind.AIRDENSITY.value], help="wind data kinds to convert, e.g. wspd rho")
+    parser.add_argument("--years", nargs=2, type=int, default=None, help="first and last year to convert")
+    parser.add_argument("--data-path", default=None, help="root path of the anemos data")
+    parser.add_argument("--tile-size", type=int, default=DEFAULT_TILE_SIZE, help="x/y grid cells per chunk")
+    parser.add_argument("--time-chunk", type=int, default=None, help="time steps per chunk, by default the time steps of every year file")
+    args = parser.parse_args()
+
+    for kind in args.kinds:
+        stores = convert_tsnc_to_zarr(
+            wind_data_kind=WindDataKind(kind),
+            store_path=args.store_path,
+            time_frame=args.years,
+            _wind_data_path=args.data_path,
+            tile_size=args.tile_size,
+            time_chunk=args.time_chunk,
+            )
+        print(f"{kind} written to {', '.join(stores)}")